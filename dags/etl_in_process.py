@@ -0,0 +1,53 @@
+"""ETL pipeline as a single in-process task (see src.pipeline.runner)"""
+from airflow.decorators import dag, task
+from airflow.operators.python import get_current_context
+from datetime import datetime
+
+from src.config.settings import setup_logging
+
+logger = setup_logging(__name__)
+
+
+@dag(
+    dag_id='etl_pipeline_in_process',
+    start_date=datetime(2025, 1, 1),
+    schedule_interval=None,
+    catchup=False,
+    description='ETL Pipeline for Energy Consumption Data (single task)',
+    tags=['etl', 'energy', 'in-process'],
+    params={'engine': 'c', 'chunk_size': None, 'parallelism': 4},
+    doc_md="""
+    # Energy Consumption ETL Pipeline (in-process)
+    
+    Same stages and targets as `etl_pipeline`, run by one task with
+    DataFrames kept in memory: no XCom or handoff files between stages.
+    Same runner as `python main.py`.
+    
+    Params: `engine` (CSV parser), `chunk_size`, `parallelism`.
+    """
+)
+def etl_pipeline_in_process():
+    
+    @task
+    def run_etl(params: dict = None) -> list[dict]:
+        """Run all stages and return the per-stage statistics"""
+        # Imported at run time: keeps DAG parsing free of pandas/pyarrow
+        from src.pipeline.runner import PipelineConfig, run_pipeline
+        
+        params = params or {}
+        result = run_pipeline(PipelineConfig(
+            engine=params.get('engine', 'c'),
+            chunk_size=params.get('chunk_size'),
+            parallelism=params.get('parallelism', 4),
+            run_id=get_current_context()['run_id'],
+        ))
+        
+        logger.info(f"Stage report:\n{result.report()}")
+        
+        return [s.to_dict() for s in result.stats]
+    
+    run_etl()
+
+
+# Instantiate the DAG
+dag_instance = etl_pipeline_in_process()
@@ -1,41 +1,37 @@
 """ETL Pipeline using TaskFlow API (Airflow 2.0+)"""
 from airflow.decorators import dag, task, task_group
+from airflow.operators.python import get_current_context
 from datetime import datetime
-import pandas as pd
 
-from src.config.settings import (
-    POPULATION_EVRY_FILE, 
-    POPULATION_PARIS_FILE, 
-    CONSOMMATION_EVRY_FILE, 
-    CONSOMMATION_PARIS_FILE, 
-    CSP_FILE, 
-    IRIS_FILE,
-    setup_logging
-)
-from src.extract.sources import read_csv_with_schema
-from src.config.schemas import (
-    POPULATION_SCHEMA,
-    CONSOMMATION_SCHEMA,
-    CSP_SCHEMA,
-    IRIS_SCHEMA
-)
-from src.transform.unions import union_population_sources, union_consommation_sources
-from src.transform.normalize import (
-    normalize_population_addresses,
-    normalize_consommation_addresses,
-    normalize_iris_streets_postalcodes
-)
-from src.transform.consumption_by_csp import build_consommation_csp
-from src.transform.consumption_by_iris import build_consommation_iris
-from src.load.targets import (
-    save_consommation_csp,
-    save_consommation_iris_paris,
-    save_consommation_iris_evry
-)
+# Only lightweight modules at the top level: the scheduler re-parses this file
+# constantly. pandas/pyarrow and the src.transform/src.load modules are
+# imported inside the tasks (see scripts/benchmark_dag_parse.py).
+from src.config.settings import ETL_PARTITIONS, LOAD_TARGETS_TO_DB, setup_logging
+from src.pipeline.telemetry import instrumented
 
 logger = setup_logging(__name__)
 
 
+def _run_id() -> str:
+    """Airflow run id of the current task (scopes the handoff files)"""
+    return get_current_context()['run_id']
+
+
+def _instrumented(stage: str = None):
+    """Record a task's wall/CPU time, peak memory and rows in data_quality.performance"""
+    return instrumented(stage, pipeline='etl_pipeline', run_id=_run_id, flush=True)
+
+
+def _extract(files: dict) -> dict:
+    """Extract sources; rows breaking the schema domain rules go to this run's quarantine files"""
+    from src.extract.validation import write_quarantine
+    from src.pipeline.stages import extract, split_quarantine
+
+    frames, quarantined = split_quarantine(extract(files))
+    write_quarantine(quarantined, _run_id())
+    return frames
+
+
 @dag(
     dag_id='etl_pipeline',
     start_date=datetime(2025, 1, 1),
@@ -49,10 +45,22 @@ logger = setup_logging(__name__)
     ## Architecture
     Union-first approach: merge Paris + Evry sources early, transform once.
     
+    Tasks exchange DataFrames as Arrow files on the data volume; XCom only
+    carries small references (path, row count, dtypes), see `src.pipeline.handoff`.
+    
     ## Stages
-    1. **Extract**: Read all sources (Population, Consommation, References)
-    2. **Transform**: Union, normalize, join, aggregate
-    3. **Load**: Save target tables to CSV
+    1. **Extract**: Read all sources (Population, Consommation, References); rows breaking
+       the schema domain rules are quarantined (`data/quarantine/run=<run_id>`)
+    2. **Quality**: Completeness, format and duplicate checks of every source file
+       (one process per file), metrics and issues saved to `data_quality`, violating
+       rows exported to `data/violations/run=<run_id>`; runs alongside the transform
+    3. **Transform**: Union, then fan out over postal-code partitions (dynamic task
+       mapping, `ETL_PARTITIONS`): each mapped task normalizes its slice and computes
+       partial CSP/IRIS aggregates, which two reduce tasks combine into the targets
+       (union, partition normalize and partial aggregates are checkpointed: unchanged
+       inputs are not recomputed, see `src.pipeline`)
+    4. **Load**: Publish target files atomically (Parquet + `_manifest.json`, unchanged
+       targets are skipped) and COPY them into PostgreSQL (`targets` schema)
     
     ## Targets
     - `Consommation_CSP`: Consumption by socio-professional category
@@ -71,62 +79,72 @@ def etl_pipeline():
         """Extract all data sources (parallel execution)"""
         
         @task
+        @_instrumented()
         def extract_population_sources() -> dict:
             """Extract Population from Paris and Evry"""
+            from src.config.settings import POPULATION_PARIS_FILE, POPULATION_EVRY_FILE
+            from src.pipeline import handoff
+            
             logger.info("Extracting population sources")
             
-            df_paris = read_csv_with_schema(POPULATION_PARIS_FILE, POPULATION_SCHEMA)
-            df_evry = read_csv_with_schema(POPULATION_EVRY_FILE, POPULATION_SCHEMA)
+            extracted = _extract({'population_paris': POPULATION_PARIS_FILE, 'population_evry': POPULATION_EVRY_FILE})
+            df_paris, df_evry = extracted['population_paris'], extracted['population_evry']
             
             logger.info("Extracted population sources", extra={
                 'paris_rows': len(df_paris),
                 'evry_rows': len(df_evry)
             })
             
-            return {
-                'paris': df_paris.to_dict('records'),
-                'evry': df_evry.to_dict('records')
-            }
+            return handoff.put_frames({'paris': df_paris, 'evry': df_evry}, _run_id(), 'population_')
         
         @task
+        @_instrumented()
         def extract_consommation_sources() -> dict:
             """Extract Consommation from Paris and Evry"""
+            from src.config.settings import CONSOMMATION_PARIS_FILE, CONSOMMATION_EVRY_FILE
+            from src.pipeline import handoff
+            
             logger.info("Extracting consommation sources")
             
-            df_paris = read_csv_with_schema(CONSOMMATION_PARIS_FILE, CONSOMMATION_SCHEMA)
-            df_evry = read_csv_with_schema(CONSOMMATION_EVRY_FILE, CONSOMMATION_SCHEMA)
+            extracted = _extract({'consommation_paris': CONSOMMATION_PARIS_FILE, 'consommation_evry': CONSOMMATION_EVRY_FILE})
+            df_paris, df_evry = extracted['consommation_paris'], extracted['consommation_evry']
             
             logger.info("Extracted consommation sources", extra={
                 'paris_rows': len(df_paris),
                 'evry_rows': len(df_evry)
             })
             
-            return {
-                'paris': df_paris.to_dict('records'),
-                'evry': df_evry.to_dict('records')
-            }
+            return handoff.put_frames({'paris': df_paris, 'evry': df_evry}, _run_id(), 'consommation_')
         
         @task
-        def extract_csp_reference() -> list[dict]:
+        @_instrumented()
+        def extract_csp_reference() -> dict:
             """Extract CSP reference data"""
+            from src.config.settings import CSP_FILE
+            from src.pipeline import handoff
+            
             logger.info("Extracting CSP reference")
             
-            df = read_csv_with_schema(CSP_FILE, CSP_SCHEMA)
+            df = _extract({'csp': CSP_FILE})['csp']
             
             logger.info("Extracted CSP reference", extra={'rows': len(df)})
             
-            return df.to_dict('records')
+            return handoff.put(df, 'csp', _run_id())
         
         @task
-        def extract_iris_reference() -> list[dict]:
+        @_instrumented()
+        def extract_iris_reference() -> dict:
             """Extract IRIS reference data"""
+            from src.config.settings import IRIS_FILE
+            from src.pipeline import handoff
+            
             logger.info("Extracting IRIS reference")
             
-            df = read_csv_with_schema(IRIS_FILE, IRIS_SCHEMA)
+            df = _extract({'iris': IRIS_FILE})['iris']
             
             logger.info("Extracted IRIS reference", extra={'rows': len(df)})
             
-            return df.to_dict('records')
+            return handoff.put(df, 'iris', _run_id())
         
         # ✅ Return individual tasks, not a dict
         return {
@@ -136,103 +154,147 @@ def etl_pipeline():
             'iris': extract_iris_reference()
         }
     
+    @task
+    @_instrumented()
+    def check_source_quality() -> dict:
+        """Run the quality checks on all source files and save the metrics once"""
+        from src.quality.runner import default_quality_jobs, run_quality_jobs
+        
+        logger.info("Checking source quality")
+        
+        results = run_quality_jobs(default_quality_jobs(), run_id=_run_id())
+        
+        # XCom keys must be strings
+        return {
+            f"{table_name}/{source}" if source else table_name: result
+            for (table_name, source), result in results.items()
+        }
+    
     # ============================================
     # TRANSFORM LAYER (TaskGroup for organization)
     # ============================================
     
     @task_group(group_id='transform')
     def transform_data(population: dict, consommation: dict, csp: dict, iris: dict):
-        """Transform: union, normalize, join, aggregate"""
+        """Transform: union, partition, normalize + partial aggregates (mapped), reduce"""
 
-        @task
-        def union(population: dict, consommation: dict) -> dict:
+        @task(task_id='union')
+        @_instrumented('union')
+        def union_sources(population: dict, consommation: dict) -> dict:
+            from src.pipeline import handoff
+            from src.pipeline.stages import union
+            
             logger.info("Starting staging: union")
-            # Reconstruct DataFrames
-            pop_paris = pd.DataFrame(population['paris'])
-            pop_evry = pd.DataFrame(population['evry'])
-            cons_paris = pd.DataFrame(consommation['paris'])
-            cons_evry = pd.DataFrame(consommation['evry'])
+            # Memory-map the extracted DataFrames
+            pop_paris = handoff.get(population['paris'])
+            pop_evry = handoff.get(population['evry'])
+            cons_paris = handoff.get(consommation['paris'])
+            cons_evry = handoff.get(consommation['evry'])
             
             # Union
             logger.info("Unioning sources")
-            population_df = union_population_sources(pop_paris, pop_evry)
-            consommation_df = union_consommation_sources(cons_paris, cons_evry)
+            unioned = union(pop_paris, pop_evry, cons_paris, cons_evry)
+            population_df, consommation_df = unioned['population'], unioned['consommation']
                         
             # Log the row counts as separate messages to ensure visibility
             logger.info(f"Union complete - Population rows: {len(population_df)}")
             logger.info(f"Union complete - Consommation rows: {len(consommation_df)}")
             
-            return {
-                'population': population_df.to_dict('records'),
-                'consommation': consommation_df.to_dict('records')
-            }
+            return handoff.put_frames({
+                'population': population_df,
+                'consommation': consommation_df
+            }, _run_id(), 'union_')
             
 
         @task
-        def normalize_addresses(population: dict, consommation: dict, iris: dict) -> dict:
-            """normalize addresses"""
-            logger.info("Starting staging: normalize addresses")
-
-            population_df = pd.DataFrame(population)
-            consommation_df = pd.DataFrame(consommation)
-            iris_df = pd.DataFrame(iris)
-
-            # Normalize addresses
-            population_df = normalize_population_addresses(population_df)
-            consommation_df = normalize_consommation_addresses(consommation_df)
-            iris_df = normalize_iris_streets_postalcodes(iris_df)
-
-            logger.info("Staging complete")
-            logger.info(f"Normalized addresses - Population rows: {len(population_df)}")
-            logger.info(f"Normalized addresses - Consumption rows: {len(consommation_df)}")
-            logger.info(f"Normalized addresses - IRIS rows: {len(iris_df)}")
+        @_instrumented()
+        def partition_sources_by_postal_code(union_refs: dict, iris: dict) -> list[dict]:
+            """Split the unioned sources and IRIS reference into postal-code partitions"""
+            from src.pipeline import handoff
+            from src.transform.partitioned import partition_sources
+            
+            logger.info("Partitioning sources by postal code")
+            
+            partitions = partition_sources(
+                handoff.get(union_refs['population']),
+                handoff.get(union_refs['consommation']),
+                handoff.get(iris),
+                ETL_PARTITIONS
+            )
+            
+            logger.info(f"Partitioned sources into {len(partitions)} partitions")
+            
+            # One mapped task per non-empty partition
+            return [
+                {'partition': label, **handoff.put_frames(frames, _run_id(), f"partition_{label}_")}
+                for label, frames in partitions.items()
+            ]
+        
+        @task(map_index_template="{{ partition_label }}")
+        @_instrumented()
+        def transform_partition(partition: dict, csp: dict) -> dict:
+            """Normalize one partition and compute its partial CSP/IRIS aggregates (checkpointed)"""
+            from src.config.settings import JOIN_CARDINALITY, JOIN_MAX_FANOUT, JOIN_ON_VIOLATION
+            from src.pipeline import handoff
+            from src.pipeline.stages import normalize_partition, partial_aggregates
+            
+            label = partition['partition']
+            get_current_context()['partition_label'] = label
+            logger.info(f"Transforming partition {label}")
+            
+            normalized = normalize_partition(handoff.get(partition['population']),
+                                             handoff.get(partition['consommation']),
+                                             handoff.get(partition['iris']))
+            
+            partials = partial_aggregates(normalized['population'], normalized['consommation'],
+                                          normalized['iris'], handoff.get(csp), validate=JOIN_CARDINALITY,
+                                          on_violation=JOIN_ON_VIOLATION, max_fanout=JOIN_MAX_FANOUT)
             
             return {
-                'population': population_df.to_dict('records'),
-                'consommation': consommation_df.to_dict('records'),
-                'iris': iris_df.to_dict('records')
+                'csp': handoff.put(partials['csp'], f"partial_csp_{label}", _run_id()),
+                'iris': handoff.put(partials['iris'], f"partial_iris_{label}", _run_id())
             }
-
+        
         @task
-        def build_csp_target(population: dict, consommation: dict, csp: dict) -> list[dict]:
-            """Build Consommation_CSP target"""
+        @_instrumented()
+        def build_csp_target(partials: list[dict]) -> dict:
+            """Reduce partial aggregates into Consommation_CSP"""
+            from src.pipeline import handoff
+            from src.transform.partitioned import reduce_csp
+            
             logger.info("Building Consommation_CSP target")
-
-            population = pd.DataFrame(population)
-            consommation = pd.DataFrame(consommation)
-            csp_df = pd.DataFrame(csp)
             
-            target = build_consommation_csp(population, consommation, csp_df)
+            target = reduce_csp([handoff.get(partial['csp']) for partial in partials])
             
             logger.info("Consommation_CSP complete")
             
-            return target.to_dict('records')
+            return handoff.put(target, 'target_csp', _run_id())
         
         @task
-        def build_iris_targets(consommation: dict, iris: dict) -> dict:
-            """Build Consommation_IRIS targets"""
+        @_instrumented()
+        def build_iris_targets(partials: list[dict]) -> dict:
+            """Reduce partial aggregates into Consommation_IRIS targets"""
+            from src.pipeline import handoff
+            from src.transform.partitioned import reduce_iris
+            
             logger.info("Building Consommation_IRIS targets")
-
-            consommation = pd.DataFrame(consommation)
-            iris_df = pd.DataFrame(iris)
             
-            targets = build_consommation_iris(consommation, iris_df)
+            targets = reduce_iris([handoff.get(partial['iris']) for partial in partials])
             
             logger.info("Consommation_IRIS complete", extra={
                 'paris_rows': len(targets['paris']),
                 'evry_rows': len(targets['evry'])
             })
             
-            return {
-                'paris': targets['paris'].to_dict('records'),
-                'evry': targets['evry'].to_dict('records')
-            }
+            return handoff.put_frames(targets, _run_id(), 'target_iris_')
         
         # ✅ Explicit dependencies within the group
-        staged = union(population, consommation)
-        staged = normalize_addresses(staged['population'], staged['consommation'], iris)
-        target_csp = build_csp_target(staged['population'], staged['consommation'], csp)
-        targets_iris = build_iris_targets(staged['consommation'], staged['iris'])
+        staged = union_sources(population, consommation)
+        partitions = partition_sources_by_postal_code(staged, iris)
+        # ✅ Fan out: one task per partition, run in parallel up to the executor's parallelism
+        partials = transform_partition.partial(csp=csp).expand(partition=partitions)
+        target_csp = build_csp_target(partials)
+        targets_iris = build_iris_targets(partials)
         
         return {
             'csp': target_csp,
@@ -245,37 +307,64 @@ def etl_pipeline():
     
     @task_group(group_id='load')
     def load_targets(target_csp: dict, targets_iris: dict):
-        """Save all target tables (parallel execution)"""
+        """Publish target files, then load them into PostgreSQL (parallel execution)"""
         
         @task
-        def load_csp_target(target: dict):
-            """Save Consommation_CSP"""
-            logger.info("Saving Consommation_CSP")
+        @_instrumented()
+        def publish_target_files(target_csp: dict, targets_iris: dict) -> dict:
+            """Write all targets concurrently and publish them atomically"""
+            from src.load.publish import publish_consommation_targets
+            from src.pipeline import handoff
+            
+            logger.info("Publishing target files")
+            
+            results = publish_consommation_targets(
+                handoff.get(target_csp),
+                handoff.get(targets_iris['paris']),
+                handoff.get(targets_iris['evry'])
+            )
             
-            df = pd.DataFrame(target)
-            path = save_consommation_csp(df)
+            logger.info("Published target files", extra={
+                name: entry['path'] for name, entry in results.items()
+            })
             
-            logger.info("Saved Consommation_CSP", extra={'path': str(path)})
+            return {name: entry['skipped'] for name, entry in results.items()}
         
         @task
-        def load_iris_targets(targets: dict):
-            """Save Consommation_IRIS targets"""
-            logger.info("Saving Consommation_IRIS targets")
-            
-            df_paris = pd.DataFrame(targets['paris'])
-            df_evry = pd.DataFrame(targets['evry'])
+        @_instrumented()
+        def load_csp_target(target: dict):
+            """Load Consommation_CSP into PostgreSQL"""
+            from src.config.settings import TARGET_LOAD_MODE
+            from src.load.postgres import load_consommation_csp
+            from src.pipeline import handoff
             
-            path_paris = save_consommation_iris_paris(df_paris)
-            path_evry = save_consommation_iris_evry(df_evry)
+            load_consommation_csp(handoff.get(target), mode=TARGET_LOAD_MODE)
+        
+        @task
+        @_instrumented()
+        def load_iris_targets(targets: dict):
+            """Load Consommation_IRIS targets into PostgreSQL"""
+            from src.config.settings import TARGET_LOAD_MODE
+            from src.load.postgres import load_consommation_iris_paris, load_consommation_iris_evry
+            from src.pipeline import handoff
             
-            logger.info("Saved Consommation_IRIS targets", extra={
-                'paris_path': str(path_paris),
-                'evry_path': str(path_evry)
-            })
+            load_consommation_iris_paris(handoff.get(targets['paris']), mode=TARGET_LOAD_MODE)
+            load_consommation_iris_evry(handoff.get(targets['evry']), mode=TARGET_LOAD_MODE)
         
-        # ✅ Both can run in parallel (no dependencies between them)
-        load_csp_target(target_csp)
-        load_iris_targets(targets_iris)
+        # ✅ File publishing and database loads run in parallel
+        publish_target_files(target_csp, targets_iris)
+        if LOAD_TARGETS_TO_DB:
+            load_csp_target(target_csp)
+            load_iris_targets(targets_iris)
+    
+    @task
+    def cleanup_handoff():
+        """Remove this run's handoff files (kept on failure for task retries)"""
+        from src.config.settings import HANDOFF_RETENTION_DAYS
+        from src.pipeline import handoff
+        
+        handoff.cleanup(_run_id())
+        handoff.cleanup_older_than(HANDOFF_RETENTION_DAYS)
     
     # ============================================
     # PIPELINE DEFINITION (Correct Dependencies)
@@ -284,6 +373,9 @@ def etl_pipeline():
     # Extract all sources (returns dict of individual task results)
     sources = extract_sources()
     
+    # Check source quality once extracted, in parallel with the transform
+    list(sources.values()) >> check_source_quality()
+    
     # Transform with explicit parameters (Airflow tracks dependencies correctly)
     targets = transform_data(
         population=sources['population'],
@@ -292,11 +384,11 @@ def etl_pipeline():
         iris=sources['iris']
     )
     
-    # Load targets (parallel)
+    # Load targets (parallel), then drop the intermediate files
     load_targets(
         target_csp=targets['csp'],
         targets_iris=targets['iris']
-    )
+    ) >> cleanup_handoff()
 
 
 # Instantiate the DAG
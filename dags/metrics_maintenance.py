@@ -0,0 +1,45 @@
+"""Scheduled upkeep of the metrics store (see MetricsStore.maintain)"""
+from airflow.decorators import dag, task
+from datetime import datetime
+
+from src.config.settings import METRICS_MAINTENANCE_SCHEDULE, setup_logging
+
+logger = setup_logging(__name__)
+
+
+@dag(
+    dag_id='metrics_maintenance',
+    start_date=datetime(2025, 1, 1),
+    schedule_interval=METRICS_MAINTENANCE_SCHEDULE,
+    catchup=False,
+    description='Metrics store partitions and retention',
+    tags=['quality', 'maintenance'],
+    doc_md="""
+    # Metrics Store Maintenance
+    
+    Creates the upcoming monthly partitions of `data_quality.metrics` and
+    `data_quality.issues`, drops the ones older than
+    `METRICS_RETENTION_MONTHS` and deletes `data_quality.performance`
+    records older than `PERFORMANCE_RETENTION_DAYS`.
+    
+    Runs on `METRICS_MAINTENANCE_SCHEDULE` (default `@daily`), outside the
+    quality checks.
+    """
+)
+def metrics_maintenance():
+    
+    @task
+    def maintain() -> dict:
+        """Run the store's partition and retention upkeep"""
+        # Imported at run time: keeps DAG parsing free of database drivers
+        from src.db.store import get_metrics_store
+        
+        counts = get_metrics_store().maintain()
+        logger.info(f"✅ Metrics store maintained: {counts}")
+        return counts
+    
+    maintain()
+
+
+# Instantiate the DAG
+dag_instance = metrics_maintenance()
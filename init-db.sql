@@ -4,31 +4,242 @@ CREATE SCHEMA IF NOT EXISTS data_quality;
 -- Grant permissions to airflow user
 GRANT ALL PRIVILEGES ON SCHEMA data_quality TO airflow;
 
--- Example table for quality metrics (modify as needed)
+-- Quality metrics, range-partitioned by month on timestamp.
+-- Partitions are created ahead by data_quality.create_monthly_partitions and
+-- dropped by data_quality.drop_partitions_older_than (retention).
 CREATE TABLE IF NOT EXISTS data_quality.metrics (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     table_name VARCHAR(100) NOT NULL,
     column_name VARCHAR(100),
     metric_type VARCHAR(50) NOT NULL,
     metric_value NUMERIC,
     source VARCHAR(50),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE INDEX idx_metrics_table ON data_quality.metrics(table_name, timestamp);
+CREATE INDEX idx_metrics_timestamp ON data_quality.metrics(timestamp, id);
+CREATE INDEX idx_metrics_source ON data_quality.metrics(source, timestamp);  -- Dashboard Source filter
 
-CREATE INDEX idx_metrics_table ON data_quality.metrics(table_name);
-CREATE INDEX idx_metrics_timestamp ON data_quality.metrics(timestamp);
+-- Rows outside every monthly partition land here until their month is created
+CREATE TABLE IF NOT EXISTS data_quality.metrics_default
+    PARTITION OF data_quality.metrics DEFAULT;
 
--- Example table for quality issues
+-- Quality issues, partitioned the same way
 CREATE TABLE IF NOT EXISTS data_quality.issues (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     table_name VARCHAR(100) NOT NULL,
     row_id VARCHAR(100),
     issue_type VARCHAR(50) NOT NULL,
     issue_description TEXT,
     severity VARCHAR(20),
     source VARCHAR(50),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE INDEX idx_issues_table ON data_quality.issues(table_name, timestamp);
+CREATE INDEX idx_issues_severity ON data_quality.issues(severity);
+CREATE INDEX idx_issues_timestamp ON data_quality.issues(timestamp, id);
+
+CREATE TABLE IF NOT EXISTS data_quality.issues_default
+    PARTITION OF data_quality.issues DEFAULT;
+
+-- Create monthly partitions <parent>_pYYYY_MM from the current month to
+-- months_ahead months later. Rows already parked in the default partition
+-- for a new month are moved into it.
+CREATE OR REPLACE FUNCTION data_quality.create_monthly_partitions(
+    parent TEXT, months_ahead INT DEFAULT 3
+) RETURNS INT AS $$
+DECLARE
+    month_start DATE;
+    month_end DATE;
+    partition_name TEXT;
+    created INT := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::DATE;
+        month_end := (month_start + INTERVAL '1 month')::DATE;
+        partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+
+        IF to_regclass(format('data_quality.%I', partition_name)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE data_quality.%I (LIKE data_quality.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                partition_name, parent);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM data_quality.%I WHERE timestamp >= %L AND timestamp < %L RETURNING *) '
+                'INSERT INTO data_quality.%I SELECT * FROM moved',
+                parent || '_default', month_start, month_end, partition_name);
+            EXECUTE format(
+                'ALTER TABLE data_quality.%I ATTACH PARTITION data_quality.%I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, month_start, month_end);
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention: drop monthly partitions whose whole month is older than keep,
+-- and purge expired rows parked in the default partition
+CREATE OR REPLACE FUNCTION data_quality.drop_partitions_older_than(
+    parent TEXT, keep INTERVAL
+) RETURNS INT AS $$
+DECLARE
+    partition RECORD;
+    dropped INT := 0;
+BEGIN
+    FOR partition IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent_table ON parent_table.oid = pg_inherits.inhparent
+        JOIN pg_namespace ns ON ns.oid = parent_table.relnamespace
+        WHERE ns.nspname = 'data_quality'
+          AND parent_table.relname = parent
+          AND child.relname ~ '_p[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF to_date(right(partition.relname, 7), 'YYYY_MM') + INTERVAL '1 month'
+                <= CURRENT_TIMESTAMP - keep THEN
+            EXECUTE format('DROP TABLE data_quality.%I', partition.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    EXECUTE format('DELETE FROM data_quality.%I WHERE timestamp < %L',
+                   parent || '_default', CURRENT_TIMESTAMP - keep);
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT data_quality.create_monthly_partitions('metrics', 3);
+SELECT data_quality.create_monthly_partitions('issues', 3);
+
+-- Rollup: latest value per table / column / metric / source.
+-- NULL column/source are stored as '' so they can be part of the key.
+CREATE TABLE IF NOT EXISTS data_quality.metrics_latest (
+    table_name VARCHAR(100) NOT NULL,
+    column_name VARCHAR(100) NOT NULL DEFAULT '',
+    metric_type VARCHAR(50) NOT NULL,
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    metric_value NUMERIC,
+    metric_id BIGINT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (table_name, column_name, metric_type, source)
+);
+
+CREATE INDEX idx_metrics_latest_timestamp ON data_quality.metrics_latest(timestamp);
+
+-- Rollup: daily metric counts per table / source (dashboard summary without scanning metrics)
+CREATE TABLE IF NOT EXISTS data_quality.metrics_daily (
+    day DATE NOT NULL,
+    table_name VARCHAR(100) NOT NULL,
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    metric_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, source)
+);
+
+-- Rollup: daily issue counts per table / issue type / severity / source
+CREATE TABLE IF NOT EXISTS data_quality.issues_daily (
+    day DATE NOT NULL,
+    table_name VARCHAR(100) NOT NULL,
+    issue_type VARCHAR(50) NOT NULL,
+    severity VARCHAR(20) NOT NULL DEFAULT '',
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    issue_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, issue_type, severity, source)
+);
+
+-- Rollups are maintained incrementally, once per INSERT statement
+CREATE OR REPLACE FUNCTION data_quality.rollup_metrics() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO data_quality.metrics_latest AS latest
+        (table_name, column_name, metric_type, source, metric_value, metric_id, timestamp)
+    SELECT DISTINCT ON (table_name, COALESCE(column_name, ''), metric_type, COALESCE(source, ''))
+        table_name, COALESCE(column_name, ''), metric_type, COALESCE(source, ''),
+        metric_value, id, timestamp
+    FROM new_rows
+    ORDER BY table_name, COALESCE(column_name, ''), metric_type, COALESCE(source, ''),
+             timestamp DESC, id DESC
+    ON CONFLICT (table_name, column_name, metric_type, source) DO UPDATE
+        SET metric_value = EXCLUDED.metric_value,
+            metric_id = EXCLUDED.metric_id,
+            timestamp = EXCLUDED.timestamp
+        WHERE (latest.timestamp, latest.metric_id) <= (EXCLUDED.timestamp, EXCLUDED.metric_id);
+
+    INSERT INTO data_quality.metrics_daily AS daily (day, table_name, source, metric_count)
+    SELECT timestamp::DATE, table_name, COALESCE(source, ''), COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, table_name, source) DO UPDATE
+        SET metric_count = daily.metric_count + EXCLUDED.metric_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_metrics_rollup
+    AFTER INSERT ON data_quality.metrics
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION data_quality.rollup_metrics();
+
+CREATE OR REPLACE FUNCTION data_quality.rollup_issues() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO data_quality.issues_daily AS daily
+        (day, table_name, issue_type, severity, source, issue_count)
+    SELECT timestamp::DATE, table_name, issue_type, COALESCE(severity, ''), COALESCE(source, ''), COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (day, table_name, issue_type, severity, source) DO UPDATE
+        SET issue_count = daily.issue_count + EXCLUDED.issue_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_issues_rollup
+    AFTER INSERT ON data_quality.issues
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION data_quality.rollup_issues();
+
+-- Per-stage performance telemetry (src/pipeline/telemetry.py), one row per stage run.
+-- Rows older than PERFORMANCE_RETENTION_DAYS are deleted by the metrics_maintenance DAG.
+CREATE TABLE IF NOT EXISTS data_quality.performance (
+    id BIGSERIAL PRIMARY KEY,
+    run_id VARCHAR(250),
+    pipeline VARCHAR(100),
+    stage VARCHAR(100) NOT NULL,
+    wall_seconds DOUBLE PRECISION,
+    cpu_seconds DOUBLE PRECISION,
+    peak_rss_mb DOUBLE PRECISION,
+    rows_in BIGINT,
+    rows_out BIGINT,
+    rows_per_second DOUBLE PRECISION,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_issues_table ON data_quality.issues(table_name);
-CREATE INDEX idx_issues_severity ON data_quality.issues(severity);
\ No newline at end of file
+CREATE INDEX idx_performance_stage ON data_quality.performance(stage, timestamp);
+CREATE INDEX idx_performance_timestamp ON data_quality.performance(timestamp);
+
+
+-- Target tables, bulk loaded with COPY by src/load/postgres.py
+CREATE SCHEMA IF NOT EXISTS targets;
+
+GRANT ALL PRIVILEGES ON SCHEMA targets TO airflow;
+
+CREATE TABLE IF NOT EXISTS targets.consommation_csp (
+    id_csp VARCHAR(10) PRIMARY KEY,
+    conso_moyenne_annuelle DOUBLE PRECISION,
+    salaire_moyen DOUBLE PRECISION,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS targets.consommation_iris_paris (
+    id_iris VARCHAR(20) PRIMARY KEY,
+    conso_moyenne_annuelle DOUBLE PRECISION,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS targets.consommation_iris_evry (
+    id_iris VARCHAR(20) PRIMARY KEY,
+    conso_moyenne_annuelle DOUBLE PRECISION,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
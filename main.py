@@ -1,6 +1,98 @@
-def main():
-    print("Hello from data-quality-project-m2ds!")
+"""Run the ETL pipeline in a single process (no Airflow)
+
+Usage:
+    python main.py
+    python main.py --data-dir data/raw --engine pyarrow --parallelism 8 --no-db
+    python main.py --chunk-size 500000 --no-checkpoints --json stats.json
+    python main.py --memory-profile --memory-json memory.json
+    python main.py --quality
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.config.settings import (
+    COMPACT_SOURCES,
+    LOAD_TARGETS_TO_DB,
+    TARGET_LOAD_MODE,
+    TELEMETRY_ENABLED,
+    VALIDATE_SOURCES,
+    ensure_directories
+)
+from src.pipeline.memory import TOP_ALLOCATIONS
+from src.pipeline.runner import ENGINES, PipelineConfig, run_pipeline
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline in a single process")
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help="Source CSV directory (default: mock or raw data, see USE_MOCK_DATA)")
+    parser.add_argument('--output-dir', type=Path, default=None,
+                        help="Target files directory (default: data/output)")
+    parser.add_argument('--engine', choices=ENGINES, default='c',
+                        help="pandas CSV parser (default: c)")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Parse source CSVs in chunks of this many rows")
+    parser.add_argument('--compact', action=argparse.BooleanOptionalAction, default=COMPACT_SOURCES,
+                        help="Categorical / small integer encodings of source columns (schema domains)")
+    parser.add_argument('--validate', action=argparse.BooleanOptionalAction, default=VALIDATE_SOURCES,
+                        help="Quarantine source rows breaking the schema domain rules")
+    parser.add_argument('--quarantine-dir', type=Path, default=None,
+                        help="Quarantine files directory (default: data/quarantine)")
+    parser.add_argument('--parallelism', type=int, default=min(4, os.cpu_count() or 1),
+                        help="Threads for extract and load (default: min(4, CPUs))")
+    parser.add_argument('--no-checkpoints', action='store_true',
+                        help="Recompute every stage instead of reusing checkpoints")
+    parser.add_argument('--db', dest='load_db', action=argparse.BooleanOptionalAction,
+                        default=LOAD_TARGETS_TO_DB, help="Load targets into PostgreSQL")
+    parser.add_argument('--load-mode', choices=['replace', 'upsert'], default=TARGET_LOAD_MODE)
+    parser.add_argument('--quality', action='store_true',
+                        help="Also run the quality checks on the source files (metrics store, data/violations)")
+    parser.add_argument('--telemetry', action=argparse.BooleanOptionalAction, default=TELEMETRY_ENABLED,
+                        help="Save stage stats to data_quality.performance")
+    parser.add_argument('--json', type=Path, default=None, help="Also write stage stats to this JSON file")
+    parser.add_argument('--memory-profile', action='store_true',
+                        help="Record peak/retained memory per stage and function (tracemalloc, slower, "
+                             "single-threaded, no checkpoints)")
+    parser.add_argument('--memory-json', type=Path, default=None,
+                        help="Write the memory profile to this JSON file (implies --memory-profile)")
+    parser.add_argument('--memory-top', type=int, default=TOP_ALLOCATIONS,
+                        help="Allocation sites per stage; 0 skips the tracemalloc snapshots, "
+                             f"which dominate profiling time on large data (default: {TOP_ALLOCATIONS})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = PipelineConfig(
+        data_dir=args.data_dir,
+        output_dir=args.output_dir,
+        engine=args.engine,
+        chunk_size=args.chunk_size,
+        compact=args.compact,
+        validate_sources=args.validate,
+        quarantine_dir=args.quarantine_dir,
+        parallelism=args.parallelism,
+        checkpoints=not args.no_checkpoints,
+        load_db=args.load_db,
+        load_mode=args.load_mode,
+        quality=args.quality,
+        telemetry=args.telemetry,
+        memory_profile=args.memory_profile or args.memory_json is not None,
+        memory_top=args.memory_top,
+    )
+    ensure_directories()
+    result = run_pipeline(config)
+
+    print(result.report())
+    if args.json:
+        args.json.write_text(json.dumps([s.to_dict() for s in result.stats], indent=2))
+    if args.memory_json:
+        args.memory_json.write_text(json.dumps([m.to_dict() for m in result.memory], indent=2))
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Per-stage and end-to-end pipeline benchmarks
+
+`run` generates a dataset per scale (scripts/generate_mock_data.py, cached
+in --data-dir), times each stage function on it and saves the results with
+environment info as JSON. `compare` flags benchmarks that got slower than a
+threshold between two result files (exit code 1).
+
+Usage:
+    python scripts/benchmark.py run --scales 1e3 1e4 1e5 --output bench/baseline.json
+    python scripts/benchmark.py run --scales 1e6 1e7 --repeat 1 --only read_csv end_to_end
+    python scripts/benchmark.py compare bench/baseline.json bench/new.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # Before importing src: stage logs would dominate the output
+
+import generate_mock_data  # noqa: E402
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+MIN_SECONDS = 0.005  # compare: changes below this are noise
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable  # Timed
+    setup: Callable = lambda: ()  # Untimed, returns the arguments of func (fresh copies)
+    rows: Callable = lambda args: None  # Rows processed, from the arguments
+
+
+def environment() -> dict:
+    """Machine, interpreter, library versions and git revision of a run"""
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, cwd=PROJECT_ROOT,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pa.__version__,
+        'git_commit': git('rev-parse', 'HEAD'),
+        'git_dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def dataset(data_dir: Path, rows: int, seed: int, street_skew: float) -> Path:
+    """Generated source files for a scale (reused if already generated)"""
+    path = data_dir / f"rows={rows}-seed={seed}-skew={street_skew:g}"
+    if not (path / "iris_reference.csv").exists():
+        # Default streets / postal codes scale with the rows (~1 Population row per address),
+        # so the address join grows linearly with the scale
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_mock_data.main([
+                '--output-dir', str(path), '--rows', str(rows), '--seed', str(seed),
+                '--street-skew', str(street_skew),
+            ])
+    return path
+
+
+def stage_benchmarks(data_path: Path, work_dir: Path) -> list:
+    """Benchmarks of every stage on one dataset; inputs come from the previous stages"""
+    from src.config.schemas import (
+        POPULATION_SCHEMA, CONSOMMATION_SCHEMA, CSP_SCHEMA, IRIS_SCHEMA,
+        CONSOMMATION_CSP_SCHEMA, CONSOMMATION_IRIS_SCHEMA
+    )
+    from src.extract.sources import read_csv_with_schema
+    from src.load.targets import FORMAT_EXTENSIONS, save_target
+    from src.pipeline.runner import PipelineConfig, run_pipeline
+    from src.quality.checks import BufferedRecorder, run_quality_checks
+    from src.quality.violations import ViolationWriter
+    from src.transform import normalize, unions
+    from src.transform.consumption_by_csp import build_consommation_csp
+    from src.transform.consumption_by_iris import build_consommation_iris
+
+    files = {
+        'population_paris': POPULATION_SCHEMA, 'population_evry': POPULATION_SCHEMA,
+        'consommation_paris': CONSOMMATION_SCHEMA, 'consommation_evry': CONSOMMATION_SCHEMA,
+        'csp_reference': CSP_SCHEMA, 'iris_reference': IRIS_SCHEMA,
+    }
+    raw = {name: read_csv_with_schema(data_path / f"{name}.csv", schema) for name, schema in files.items()}
+    population = unions.union_population_sources(raw['population_paris'].copy(), raw['population_evry'].copy())
+    consommation = unions.union_consommation_sources(raw['consommation_paris'].copy(),
+                                                     raw['consommation_evry'].copy())
+    population_norm = normalize.normalize_population_addresses(population)
+    consommation_norm = normalize.normalize_consommation_addresses(consommation)
+    iris_norm = normalize.normalize_iris_streets_postalcodes(raw['iris_reference'])
+    target_csp = build_consommation_csp(population_norm, consommation_norm, raw['csp_reference'])
+    targets_iris = build_consommation_iris(consommation_norm, iris_norm)
+
+    def first_len(args):
+        return len(args[0])
+
+    def csv_rows(args):
+        with open(args[0], 'rb') as f:
+            return sum(1 for _ in f) - 1
+
+    def quality_checks(df):
+        with contextlib.redirect_stdout(io.StringIO()), \
+                ViolationWriter(output_dir=work_dir / "violations") as violations:
+            run_quality_checks(df, 'Population', recorder=BufferedRecorder(), violations=violations)
+
+    def write_targets(fmt):
+        def write():
+            save_target(target_csp, 'consommation_csp', CONSOMMATION_CSP_SCHEMA, fmt=fmt,
+                        output_dir=work_dir / "targets")
+            for source, df in targets_iris.items():
+                save_target(df, f"consommation_iris_{source}", CONSOMMATION_IRIS_SCHEMA, fmt=fmt,
+                            output_dir=work_dir / "targets")
+        return write
+
+    def end_to_end():
+        run_pipeline(PipelineConfig(data_dir=data_path, output_dir=work_dir / "pipeline", checkpoints=False,
+                                    load_db=False, telemetry=False))
+
+    benchmarks = []
+    for name in ('population_paris', 'consommation_paris', 'iris_reference'):
+        benchmarks.append(Benchmark(
+            f"read_csv[{name}]", read_csv_with_schema,
+            setup=lambda name=name: (data_path / f"{name}.csv", files[name]),
+            rows=csv_rows,
+        ))
+    benchmarks += [
+        Benchmark('union_population_sources', unions.union_population_sources,
+                  setup=lambda: (raw['population_paris'].copy(), raw['population_evry'].copy()),
+                  rows=lambda args: len(args[0]) + len(args[1])),
+        Benchmark('union_consommation_sources', unions.union_consommation_sources,
+                  setup=lambda: (raw['consommation_paris'].copy(), raw['consommation_evry'].copy()),
+                  rows=lambda args: len(args[0]) + len(args[1])),
+        Benchmark('normalize_population_addresses', normalize.normalize_population_addresses,
+                  setup=lambda: (population,), rows=first_len),
+        Benchmark('normalize_consommation_addresses', normalize.normalize_consommation_addresses,
+                  setup=lambda: (consommation,), rows=first_len),
+        Benchmark('normalize_iris_streets_postalcodes', normalize.normalize_iris_streets_postalcodes,
+                  setup=lambda: (raw['iris_reference'],), rows=first_len),
+        Benchmark('build_consommation_csp', build_consommation_csp,
+                  setup=lambda: (population_norm, consommation_norm, raw['csp_reference']),
+                  rows=lambda args: len(args[0]) + len(args[1])),
+        Benchmark('build_consommation_iris', build_consommation_iris,
+                  setup=lambda: (consommation_norm, iris_norm), rows=first_len),
+        Benchmark('run_quality_checks[population]', quality_checks, setup=lambda: (population,), rows=first_len),
+    ]
+    for fmt in FORMAT_EXTENSIONS:
+        benchmarks.append(Benchmark(f"save_target[{fmt}]", write_targets(fmt),
+                                    rows=lambda args: len(target_csp) + sum(map(len, targets_iris.values()))))
+    benchmarks.append(Benchmark('end_to_end', end_to_end,
+                                rows=lambda args: sum(len(raw[name]) for name in files)))
+    return benchmarks
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int) -> dict:
+    """Run a benchmark `repeat` times (fresh setup each time); wall and CPU seconds"""
+    wall, cpu, rows = [], [], None
+    for _ in range(repeat):
+        args = benchmark.setup()
+        rows = benchmark.rows(args)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        benchmark.func(*args)
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+
+    median = statistics.median(wall)
+    return {
+        'rows': rows,
+        'repeat': repeat,
+        'min_seconds': min(wall),
+        'median_seconds': median,
+        'mean_seconds': statistics.fmean(wall),
+        'stdev_seconds': statistics.stdev(wall) if repeat > 1 else 0.0,
+        'cpu_seconds': statistics.median(cpu),
+        'rows_per_second': rows / median if rows and median > 0 else None,
+    }
+
+
+def run(args) -> int:
+    results = []
+    for scale in args.scales:
+        print(f"📊 Scale {scale:,} rows per source file")
+        data_path = dataset(args.data_dir, scale, args.seed, args.street_skew)
+        with tempfile.TemporaryDirectory(prefix='benchmark-') as work_dir:
+            for benchmark in stage_benchmarks(data_path, Path(work_dir)):
+                if args.only and not any(pattern in benchmark.name for pattern in args.only):
+                    continue
+                result = {'benchmark': benchmark.name, 'scale': scale,
+                          **time_benchmark(benchmark, args.repeat)}
+                results.append(result)
+                print(f"  {benchmark.name:<40} {result['median_seconds']:>10.4f}s  "
+                      f"{result['rows_per_second'] or 0:>14,.0f} rows/s")
+
+    report = {
+        'environment': environment(),
+        'config': {'scales': args.scales, 'repeat': args.repeat, 'seed': args.seed,
+                   'street_skew': args.street_skew},
+        'results': results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"✅ Saved {len(results)} results to {args.output}")
+    return 0
+
+
+def compare(args) -> int:
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+
+    for key in ('python', 'pandas', 'numpy', 'pyarrow', 'cpu_count', 'machine'):
+        before, after = baseline['environment'].get(key), current['environment'].get(key)
+        if before != after:
+            print(f"⚠️  Environment differs: {key} {before} -> {after}")
+
+    baseline_results = {(r['benchmark'], r['scale']): r for r in baseline['results']}
+    regressions = 0
+    print(f"{'Benchmark':<40} {'Scale':>10} {'Before (s)':>11} {'After (s)':>11} {'Change':>8}")
+    for result in current['results']:
+        key = (result['benchmark'], result['scale'])
+        if key not in baseline_results:
+            continue
+        before, after = baseline_results[key]['median_seconds'], result['median_seconds']
+        change = (after - before) / before if before > 0 else 0.0
+        regressed = change > args.threshold and after - before > args.min_seconds
+        regressions += regressed
+        flag = "❌" if regressed else ("🚀" if change < -args.threshold else "")
+        print(f"{key[0]:<40} {key[1]:>10,} {before:>11.4f} {after:>11.4f} {change:>+8.1%} {flag}")
+
+    missing = sorted(set(baseline_results) - {(r['benchmark'], r['scale']) for r in current['results']})
+    if missing:
+        print(f"⚠️  {len(missing)} baseline benchmark(s) not in the current results")
+    if regressions:
+        print(f"❌ {regressions} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"✅ No regression beyond {args.threshold:.0%}")
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pipeline benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the benchmarks and save the results as JSON")
+    run_parser.add_argument('--scales', nargs='+', type=lambda value: int(float(value)), default=DEFAULT_SCALES,
+                            help="Rows per source file, e.g. 1e3 1e5 1e7 (default: 1e3 1e4 1e5)")
+    run_parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark, median kept (default: 3)")
+    run_parser.add_argument('--only', nargs='+', default=None, help="Only benchmarks whose name contains one of these")
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--street-skew', type=float, default=0.0,
+                            help="Zipf exponent of street popularity in the generated data (default: 0, uniform)")
+    run_parser.add_argument('--data-dir', type=Path, default=PROJECT_ROOT / "data" / "bench",
+                            help="Generated datasets, reused across runs (default: data/bench)")
+    run_parser.add_argument('--output', type=Path,
+                            default=Path(f"benchmark-{datetime.now():%Y%m%dT%H%M%S}.json"))
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two result files")
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('current', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="Relative slowdown counted as a regression (default: 0.10)")
+    compare_parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS,
+                                help=f"Ignore absolute slowdowns below this (default: {MIN_SECONDS})")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'repeat', 1) < 1:
+        parser.error("--repeat must be >= 1")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
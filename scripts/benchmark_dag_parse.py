@@ -0,0 +1,124 @@
+"""Benchmark DAG parse time and guard against heavy top-level imports
+
+Each target is imported in a fresh interpreter with `python -X importtime`,
+after Airflow itself, so only the cost the DAG file adds is counted (what the
+scheduler pays on every parse). Fails if a target imports a heavy module at
+the top level or exceeds the time budget.
+
+Usage:
+    python scripts/benchmark_dag_parse.py                      # all DAG files
+    python scripts/benchmark_dag_parse.py dags/etl_pipeline.py --max-ms 150
+    python scripts/benchmark_dag_parse.py src.config.settings  # a module (no Airflow needed)
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DAGS_DIR = PROJECT_ROOT / "dags"
+
+# Must only be imported inside tasks, never while parsing a DAG file
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'psycopg2', 'sqlalchemy',
+                 'src.extract', 'src.transform', 'src.load', 'src.db', 'src.quality']
+
+MARKER = '-- benchmark target --'
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+CHILD_CODE = '''
+import runpy, sys, time
+sys.path.insert(0, {root!r})
+try:
+    import airflow  # Baseline: the scheduler has it loaded already
+except ImportError:
+    pass
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+if {is_file!r}:
+    runpy.run_path({target!r}, run_name="benchmark_dag")
+else:
+    __import__({target!r})
+print(time.perf_counter() - start)
+'''
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, cumulative µs, nesting level) of every import after the marker"""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+    return imports
+
+
+def measure(target: str) -> dict:
+    """Import a DAG file or module once in a fresh interpreter"""
+    is_file = target.endswith('.py')
+    code = CHILD_CODE.format(root=str(PROJECT_ROOT), marker=MARKER, is_file=is_file,
+                             target=str(Path(target).resolve()) if is_file else target)
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.getenv('PYTHONPATH')]))}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=PROJECT_ROOT, env=env)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'unknown error'
+        return {'target': target, 'error': error}
+
+    imports = parse_importtime(proc.stderr)
+    top_level = min((level for *_, level in imports), default=0)
+    # A module target is a single top-level import: report its direct imports instead
+    detail_level = top_level + 1 if not is_file else top_level
+    heavy = sorted({module for module in HEAVY_MODULES
+                    for name, *_ in imports if name == module or name.startswith(module + '.')})
+    return {
+        'target': target,
+        'seconds': float(proc.stdout.strip().splitlines()[-1]),
+        'import_us': sum(cumulative for _, cumulative, level in imports if level == top_level),
+        'slowest': sorted(((name, cumulative) for name, cumulative, level in imports if level == detail_level),
+                          key=lambda item: item[1], reverse=True)[:5],
+        'heavy': heavy,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DAG parse time (python -X importtime)")
+    parser.add_argument('targets', nargs='*', help="DAG files or module names (default: dags/*.py)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per target, best one is kept (default: 5)")
+    parser.add_argument('--max-ms', type=float, default=200.0,
+                        help="Fail if a target takes longer to import (default: 200)")
+    args = parser.parse_args(argv)
+
+    targets = args.targets or [str(path) for path in sorted(DAGS_DIR.glob('*.py'))]
+    failed = False
+    for target in targets:
+        runs = [measure(target) for _ in range(args.repeat)]
+        if 'error' in runs[0]:
+            print(f"❌ {target}: import failed ({runs[0]['error']})")
+            failed = True
+            continue
+
+        best = min(runs, key=lambda run: run['seconds'])
+        ms = best['seconds'] * 1000
+        print(f"{target}: {ms:.1f} ms (imports {best['import_us'] / 1000:.1f} ms, best of {args.repeat})")
+        for name, cumulative in best['slowest']:
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+        if best['heavy']:
+            print(f"❌ {target}: heavy modules imported at parse time: {best['heavy']}")
+            failed = True
+        if ms > args.max_ms:
+            print(f"❌ {target}: {ms:.1f} ms exceeds the {args.max_ms:.0f} ms budget")
+            failed = True
+
+    if not failed:
+        print("✅ DAG parse within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
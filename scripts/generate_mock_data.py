@@ -1,15 +1,39 @@
-"""Generate mock CSV data for all sources"""
+"""Generate mock CSV data for all sources
+
+Rows are generated vectorized (numpy/pyarrow) from a seed, so the same
+arguments always produce the same files, and streamed to CSV in chunks, so
+benchmark-sized files (10M+ rows) never have to fit in memory at once.
+
+Usage:
+    python scripts/generate_mock_data.py                               # 50 rows per file in data/mock
+    python scripts/generate_mock_data.py --rows 10000000 --workers 4 --output-dir data/bench
+    python scripts/generate_mock_data.py --streets 500 --postal-codes 20 --iris-zones 400
+    python scripts/generate_mock_data.py --cities Paris Evry Lyon --missing-nom 0.2 --seed 7
+    python scripts/generate_mock_data.py --no-issues
+
+The pipeline reads the Paris (S1) and Evry (S2) files; other cities get
+their own population_<city>.csv / consommation_<city>.csv.
+"""
+import argparse
 import csv
-import random
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
 # Mock data constants
 FIRST_NAMES = ["Jean", "Marie", "Pierre", "Sophie", "Luc", "Claire", "Thomas", "Emma", "Nicolas", "Julie"]
 LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau"]
 
 STREETS_PARIS = [
     "Rue de Rivoli",
-    "Avenue des Champs-Élysées", 
+    "Avenue des Champs-Élysées",
     "Rue Victor Hugo",
     "Boulevard Haussmann",
     "Rue de la Paix"
@@ -38,212 +62,358 @@ CSP_REFERENCE = [
     {"ID_CSP": "6", "Desc": "Ouvriers", "Salaire_Moyen": 26000, "Salaire_Min": 19000, "Salaire_Max": 35000},
 ]
 
+# Known cities: population ID prefix, consommation ID prefix, department, streets, postal codes
+KNOWN_CITIES = {
+    "Paris": ("P", "A", "75", STREETS_PARIS, POSTAL_CODES_PARIS),
+    "Evry": ("E", "B", "91", STREETS_EVRY, POSTAL_CODES_EVRY),
+}
+# INSEE-style IRIS code prefix (ID_Iris = prefix + last 2 postal code digits + zone)
+IRIS_PREFIXES = {"Paris": "751", "Evry": "910"}
+
+# Default streets / postal codes scale with the row count: ~1 row per address
+# (200 street numbers each), so the address join does not fan out on large files
+ROWS_PER_STREET = 4000
+ROWS_PER_POSTAL_CODE = 5000
+MAX_DEFAULT_POSTAL_CODES = 20
+
+# Extra street names when a city needs more than its known streets
+STREET_TYPES = ["Rue", "Avenue", "Boulevard", "Place", "Allée", "Impasse", "Chemin", "Quai"]
+STREET_NAMES = ["Victor Hugo", "Jean Jaurès", "de la Paix", "Pasteur", "de la République", "Gambetta",
+                "du Général de Gaulle", "de la Gare", "des Écoles", "du Moulin", "Voltaire", "Émile Zola",
+                "du Lac", "des Lilas", "de Verdun", "de la Liberté", "du Château", "des Tilleuls"]
+
+INVALID_CSP = "99"  # Not in the CSP reference
+INVALID_POSTAL_CODE = "999"  # Invalid format
+
+# Quality issue rates (fraction of rows)
+DEFAULT_ISSUE_RATES = {
+    'missing_nom': 0.10,
+    'missing_csp': 0.05,
+    'invalid_csp': 0.03,
+    'missing_adresse': 0.08,
+    'missing_street': 0.05,
+    'bad_postal': 0.03,
+}
+
+# Population / Consommation column order
+POPULATION_COLUMNS = ["ID", "Nom", "Prenom", "Adresse", "CSP"]
+CONSOMMATION_COLUMNS = ["ID_Adr", "N", "Nom_Rue", "Code_Postal", "NB_KW_Jour"]
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+@dataclass
+class City:
+    name: str
+    population_prefix: str
+    consommation_prefix: str
+    streets: list
+    postal_codes: list
+    iris_prefix: str
+    iris_zones: int | None = None  # None: one IRIS zone per street / postal code pair
+
+    @property
+    def slug(self) -> str:
+        return self.name.lower()
+
+
+def extend_streets(streets: list, count: int) -> list:
+    """Known streets first, then generated names ('Rue Pasteur', ...) up to count"""
+    result = list(dict.fromkeys(streets))[:count]
+    for name in STREET_NAMES:
+        for street_type in STREET_TYPES:
+            if len(result) >= count:
+                return result
+            street = f"{street_type} {name}"
+            if street not in result:
+                result.append(street)
+    result.extend(f"Rue du Secteur {i}" for i in range(1, count - len(result) + 1))
+    return result
+
+
+def extend_postal_codes(postal_codes: list, department: str, count: int) -> list:
+    """Known postal codes first, then <department>001, <department>002, ... up to count"""
+    if count > 999:
+        raise ValueError(f"At most 999 postal codes per city, got {count}")
+    result = list(dict.fromkeys(postal_codes))[:count]
+    for number in range(1, 1000):
+        if len(result) >= count:
+            break
+        code = f"{department}{number:03d}"
+        if code not in result:
+            result.append(code)
+    return result
+
+
+def default_streets(rows: int) -> int:
+    return max(5, rows // ROWS_PER_STREET)
+
+
+def default_postal_codes(rows: int) -> int:
+    return max(2, min(MAX_DEFAULT_POSTAL_CODES, rows // ROWS_PER_POSTAL_CODE))
+
+
+def make_cities(names: list, streets: int = None, postal_codes: int = None, iris_zones: int = None) -> list:
+    """
+    City profiles. Known cities (Paris, Evry) keep their streets, postal codes
+    and ID prefixes; others get a free department and prefixes from their name.
+    """
+    used_departments = {department for _, _, department, _, _ in KNOWN_CITIES.values()}
+    free_departments = (f"{d:02d}" for d in range(1, 96) if f"{d:02d}" not in used_departments)
+
+    cities = []
+    for name in names:
+        if name in KNOWN_CITIES:
+            population_prefix, consommation_prefix, department, known_streets, known_postal = KNOWN_CITIES[name]
+        else:
+            population_prefix, consommation_prefix = f"{name[:3].upper()}P", f"{name[:3].upper()}C"
+            department, known_streets, known_postal = next(free_departments), [], []
+        cities.append(City(
+            name=name,
+            population_prefix=population_prefix,
+            consommation_prefix=consommation_prefix,
+            streets=extend_streets(known_streets, streets or max(len(known_streets), 5)),
+            postal_codes=extend_postal_codes(known_postal, department, postal_codes or max(len(known_postal), 2)),
+            iris_prefix=IRIS_PREFIXES.get(name, f"{department}0"),
+            iris_zones=iris_zones,
+        ))
+    return cities
+
+
+def street_weights(count: int, skew: float) -> np.ndarray:
+    """Zipf-like street popularity: weight of the k-th street ~ 1 / k**skew (0: uniform)"""
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -skew
+    return weights / weights.sum()
+
+
+def _ids(prefix: str, start: int, size: int, width: int) -> pa.Array:
+    """prefix + zero-padded 1-based row number: P0001, P0002, ..."""
+    numbers = pc.cast(pa.array(np.arange(start + 1, start + size + 1)), pa.string())
+    return pc.binary_join_element_wise(prefix, pc.utf8_lpad(numbers, width, '0'), '')
+
+
+def _null_where(values: pa.Array, mask: np.ndarray) -> pa.Array:
+    return pc.if_else(pa.array(mask), pa.scalar(None, values.type), values)
+
+
+def population_chunk(city: City, start: int, size: int, width: int, rng: np.random.Generator,
+                     rates: dict, skew: float) -> pa.Table:
+    """
+    Population rows [start, start + size) of a city (Source S1/S2).
+
+    Quality issues: missing Nom, missing CSP, invalid CSP (99), missing Adresse
+    """
+    streets = pa.array(city.streets).take(rng.choice(len(city.streets), size, p=street_weights(len(city.streets), skew)))
+    postal_codes = pa.array(city.postal_codes).take(rng.integers(len(city.postal_codes), size=size))
+    street_numbers = pc.cast(pa.array(rng.integers(1, 201, size=size)), pa.string())
+    address = pc.binary_join_element_wise(pc.binary_join_element_wise(street_numbers, streets, ' '),
+                                          postal_codes, ', ')
+
+    csp = pa.array(CSP_CODES).take(rng.integers(len(CSP_CODES), size=size))
+    csp_draw = rng.random(size)
+    invalid_csp = (csp_draw >= rates['missing_csp']) & (csp_draw < rates['missing_csp'] + rates['invalid_csp'])
+    csp = pc.if_else(pa.array(invalid_csp), INVALID_CSP, csp)
+
+    return pa.table({
+        "ID": _ids(city.population_prefix, start, size, width),
+        "Nom": _null_where(pa.array(LAST_NAMES).take(rng.integers(len(LAST_NAMES), size=size)),
+                           rng.random(size) < rates['missing_nom']),
+        "Prenom": pa.array(FIRST_NAMES).take(rng.integers(len(FIRST_NAMES), size=size)),
+        "Adresse": _null_where(address, rng.random(size) < rates['missing_adresse']),
+        "CSP": _null_where(csp, csp_draw < rates['missing_csp']),
+    })
+
+
+def consommation_chunk(city: City, start: int, size: int, width: int, rng: np.random.Generator,
+                       rates: dict, skew: float) -> pa.Table:
+    """
+    Consommation rows [start, start + size) of a city (Source S1/S2).
 
-def generate_iris_reference(output_path: Path):
+    Quality issues: missing Nom_Rue, invalid Code_Postal (999).
+    Consumption values: 5-50 kWh/day (realistic household)
+    """
+    streets = pa.array(city.streets).take(rng.choice(len(city.streets), size, p=street_weights(len(city.streets), skew)))
+    postal_codes = pa.array(city.postal_codes).take(rng.integers(len(city.postal_codes), size=size))
+
+    return pa.table({
+        "ID_Adr": _ids(city.consommation_prefix, start, size, width),
+        "N": rng.integers(1, 201, size=size),
+        "Nom_Rue": _null_where(streets, rng.random(size) < rates['missing_street']),
+        "Code_Postal": pc.if_else(pa.array(rng.random(size) < rates['bad_postal']), INVALID_POSTAL_CODE, postal_codes),
+        "NB_KW_Jour": np.round(rng.uniform(5, 50, size=size), 2),
+    })
+
+
+CHUNK_BUILDERS = {
+    'population': (population_chunk, POPULATION_COLUMNS),
+    'consommation': (consommation_chunk, CONSOMMATION_COLUMNS),
+}
+
+
+def generate_source_csv(output_path: Path, kind: str, city: City, num_rows: int, seed: int, city_index: int,
+                        rates: dict, skew: float, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Stream a Population or Consommation CSV in chunks of chunk_size rows.
+
+    Each chunk has its own generator seeded from (seed, city, kind, chunk), so
+    the output depends only on the arguments, not on the number of workers.
+    """
+    build_chunk, columns = CHUNK_BUILDERS[kind]
+    width = max(4, len(str(num_rows)))  # src.config.schemas.POPULATION_ID_PATTERNS accept 4+ digits
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(columns)
+    with open(output_path, 'ab') as f:
+        write_options = pacsv.WriteOptions(include_header=False, quoting_style='needed')
+        writer = None
+        for chunk_index, start in enumerate(range(0, num_rows, chunk_size)):
+            rng = np.random.default_rng([seed, city_index, list(CHUNK_BUILDERS).index(kind), chunk_index])
+            table = build_chunk(city, start, min(chunk_size, num_rows - start), width, rng, rates, skew)
+            if writer is None:
+                writer = pacsv.CSVWriter(f, table.schema, write_options=write_options)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+
+    print(f"✅ Generated {output_path} with {num_rows:,} rows ({city.name})")
+    return num_rows
+
+
+def _generate_source_job(job: tuple) -> int:
+    return generate_source_csv(*job)
+
+
+def generate_iris_reference(output_path: Path, cities: list):
     """
     Generate IRIS reference CSV (Source S4).
     Maps street names and postal codes to IRIS zones.
     """
-    output_path.parent.mkdir(exist_ok=True)
-    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
     iris_data = []
-    iris_counter = 1
-    
-    # Paris IRIS zones
-    for postal_code in POSTAL_CODES_PARIS:
-        for street in STREETS_PARIS:
+    for city in cities:
+        pairs = [(postal_code, street) for postal_code in city.postal_codes for street in city.streets]
+        zones = city.iris_zones or len(pairs)
+        for i, (postal_code, street) in enumerate(pairs):
+            # Consecutive streets of a postal code share a zone
+            zone = i * zones // len(pairs) + 1
             iris_data.append({
                 "ID_Rue": street.lower(),  # Normalized street name
                 "ID_Ville": postal_code,
-                "ID_Iris": f"751{postal_code[-2:]}{iris_counter:04d}"
+                "ID_Iris": f"{city.iris_prefix}{postal_code[-2:]}{zone:04d}"
             })
-            iris_counter += 1
-    
-    # Evry IRIS zones
-    iris_counter = 1
-    for postal_code in POSTAL_CODES_EVRY:
-        for street in STREETS_EVRY:
-            iris_data.append({
-                "ID_Rue": street.lower(),  # Normalized street name
-                "ID_Ville": postal_code,
-                "ID_Iris": f"910{postal_code[-2:]}{iris_counter:04d}"
-            })
-            iris_counter += 1
-    
+
     # Write CSV
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=["ID_Rue", "ID_Ville", "ID_Iris"])
         writer.writeheader()
         writer.writerows(iris_data)
-    
-    print(f"✅ Generated {output_path} with {len(iris_data)} IRIS zones")
+
+    print(f"✅ Generated {output_path} with {len(iris_data)} street/postal code mappings")
 
 
 def generate_csp_reference(output_path: Path):
     """Generate CSP reference CSV (Source S3)"""
-    output_path.parent.mkdir(exist_ok=True)
-    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=["ID_CSP", "Desc", "Salaire_Moyen", "Salaire_Min", "Salaire_Max"])
         writer.writeheader()
         writer.writerows(CSP_REFERENCE)
-    
+
     print(f"✅ Generated {output_path} with {len(CSP_REFERENCE)} CSP categories")
 
 
-def generate_population_csv(output_path: Path, city: str, num_rows: int = 50, add_quality_issues: bool = True):
-    """
-    Generate Population CSV for Paris or Evry (Source S1/S2).
-    
-    Quality issues included:
-    - 10% missing Nom
-    - 5% missing CSP
-    - 3% invalid CSP (code 99)
-    - 8% missing Adresse
-    """
-    output_path.parent.mkdir(exist_ok=True)
-    
-    streets = STREETS_PARIS if city == "Paris" else STREETS_EVRY
-    postal_codes = POSTAL_CODES_PARIS if city == "Paris" else POSTAL_CODES_EVRY
-    
-    prefix = "P" if city == "Paris" else "E"
-    
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID", "Nom", "Prenom", "Adresse", "CSP"])
-        
-        for i in range(1, num_rows + 1):
-            # Generate address
-            street_num = random.randint(1, 200)
-            street_name = random.choice(streets)
-            postal_code = random.choice(postal_codes)
-            address = f"{street_num} {street_name}, {postal_code}"
-            
-            # Add quality issues
-            if add_quality_issues:
-                # 10% missing Nom
-                nom = "" if random.random() < 0.1 else random.choice(LAST_NAMES)
-                
-                # 5% missing CSP
-                if random.random() < 0.05:
-                    csp = ""
-                # 3% invalid CSP (not in reference)
-                elif random.random() < 0.03:
-                    csp = "99"  # Invalid code
-                else:
-                    csp = random.choice(CSP_CODES)
-                
-                # 8% missing Adresse
-                if random.random() < 0.08:
-                    address = ""
-                
-                prenom = random.choice(FIRST_NAMES)
-            else:
-                nom = random.choice(LAST_NAMES)
-                prenom = random.choice(FIRST_NAMES)
-                csp = random.choice(CSP_CODES)
-            
-            writer.writerow([
-                f"{prefix}{i:04d}",  # P0001 or E0001
-                nom,
-                prenom,
-                address,
-                csp
-            ])
-    
-    print(f"✅ Generated {output_path} with {num_rows} rows ({city})")
-
-
-def generate_consommation_csv(output_path: Path, city: str, num_rows: int = 50, add_quality_issues: bool = True):
-    """
-    Generate Consommation CSV for Paris or Evry (Source S1/S2).
-    
-    Quality issues included:
-    - 5% missing Nom_Rue
-    - 3% invalid Code_Postal format
-    - Consumption values: 5-50 kWh/day
-    """
-    output_path.parent.mkdir(exist_ok=True)
-    
-    streets = STREETS_PARIS if city == "Paris" else STREETS_EVRY
-    postal_codes = POSTAL_CODES_PARIS if city == "Paris" else POSTAL_CODES_EVRY
-    
-    prefix = "A" if city == "Paris" else "B"
-    
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID_Adr", "N", "Nom_Rue", "Code_Postal", "NB_KW_Jour"])
-        
-        for i in range(1, num_rows + 1):
-            street_num = random.randint(1, 200)
-            street_name = random.choice(streets)
-            postal_code = random.choice(postal_codes)
-            
-            # Consumption: 5-50 kWh per day (realistic household)
-            consumption = round(random.uniform(5, 50), 2)
-            
-            # Add quality issues
-            if add_quality_issues:
-                # 5% missing Nom_Rue
-                if random.random() < 0.05:
-                    street_name = ""
-                
-                # 3% invalid postal code format
-                if random.random() < 0.03:
-                    postal_code = "999"  # Invalid format
-            
-            writer.writerow([
-                f"{prefix}{i:04d}",  # A0001 or B0001
-                street_num,
-                street_name,
-                postal_code,
-                consumption
-            ])
-    
-    print(f"✅ Generated {output_path} with {num_rows} rows ({city})")
-
-
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate mock CSV data for all sources")
+    parser.add_argument('--output-dir', type=Path, default=Path("data/mock"))
+    parser.add_argument('--rows', type=int, default=50, help="Rows per Population and Consommation file (default: 50)")
+    parser.add_argument('--population-rows', type=int, default=None, help="Override --rows for Population")
+    parser.add_argument('--consommation-rows', type=int, default=None, help="Override --rows for Consommation")
+    parser.add_argument('--cities', nargs='+', default=list(KNOWN_CITIES), help="Default: Paris Evry")
+    parser.add_argument('--streets', type=int, default=None,
+                        help=f"Streets per city (default: rows / {ROWS_PER_STREET}, at least 5)")
+    parser.add_argument('--postal-codes', type=int, default=None,
+                        help=f"Postal codes per city (default: rows / {ROWS_PER_POSTAL_CODE}, "
+                             f"between 2 and {MAX_DEFAULT_POSTAL_CODES})")
+    parser.add_argument('--iris-zones', type=int, default=None,
+                        help="IRIS zones per city (default: one per street / postal code pair)")
+    parser.add_argument('--street-skew', type=float, default=1.0,
+                        help="Zipf exponent of street popularity, 0 for uniform (default: 1.0)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows generated and written at a time")
+    parser.add_argument('--workers', type=int, default=1, help="Processes, one file at a time each (default: 1)")
+    parser.add_argument('--no-issues', action='store_true', help="Generate clean data (all issue rates 0)")
+    for issue, rate in DEFAULT_ISSUE_RATES.items():
+        parser.add_argument(f"--{issue.replace('_', '-')}", type=float, default=rate,
+                            help=f"Fraction of rows with this issue (default: {rate})")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1 or args.workers < 1:
+        parser.error("--chunk-size and --workers must be >= 1")
+    for issue in DEFAULT_ISSUE_RATES:
+        if not 0 <= getattr(args, issue) <= 1:
+            parser.error(f"--{issue.replace('_', '-')} must be between 0 and 1")
+    return args
+
+
+def main(argv=None):
     """Generate all mock data files"""
-    mock_dir = Path("data/mock")
+    args = parse_args(argv)
+    mock_dir = args.output_dir
     mock_dir.mkdir(parents=True, exist_ok=True)
-    
+
+    rates = {issue: 0.0 if args.no_issues else getattr(args, issue) for issue in DEFAULT_ISSUE_RATES}
+    population_rows = args.population_rows if args.population_rows is not None else args.rows
+    consommation_rows = args.consommation_rows if args.consommation_rows is not None else args.rows
+    rows = max(population_rows, consommation_rows)
+    cities = make_cities(args.cities, args.streets or default_streets(rows),
+                         args.postal_codes or default_postal_codes(rows), args.iris_zones)
+
     print("🎲 Generating mock data for ETL pipeline...\n")
-    
-    # Source S1 - Paris
-    print("📍 Source S1 - Paris")
-    generate_population_csv(mock_dir / "population_paris.csv", city="Paris", num_rows=50)
-    generate_consommation_csv(mock_dir / "consommation_paris.csv", city="Paris", num_rows=50)
-    
-    # Source S2 - Evry
-    print("\n📍 Source S2 - Evry")
-    generate_population_csv(mock_dir / "population_evry.csv", city="Evry", num_rows=50)
-    generate_consommation_csv(mock_dir / "consommation_evry.csv", city="Evry", num_rows=50)
-    
+    start = time.perf_counter()
+
+    # Sources S1, S2, ... - Population and Consommation per city
+    print(f"📍 Sources - {', '.join(city.name for city in cities)}")
+    jobs = []
+    for city_index, city in enumerate(cities):
+        jobs.append((mock_dir / f"population_{city.slug}.csv", 'population', city, population_rows,
+                     args.seed, city_index, rates, args.street_skew, args.chunk_size))
+        jobs.append((mock_dir / f"consommation_{city.slug}.csv", 'consommation', city, consommation_rows,
+                     args.seed, city_index, rates, args.street_skew, args.chunk_size))
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs), os.cpu_count() or 1)) as executor:
+            total_rows = sum(executor.map(_generate_source_job, jobs))
+    else:
+        total_rows = sum(map(_generate_source_job, jobs))
+
     # Source S3 - CSP Reference
     print("\n📚 Source S3 - CSP Reference")
     generate_csp_reference(mock_dir / "csp_reference.csv")
-    
+
     # Source S4 - IRIS Reference
     print("\n📚 Source S4 - IRIS Reference")
-    generate_iris_reference(mock_dir / "iris_reference.csv")
-    
+    generate_iris_reference(mock_dir / "iris_reference.csv", cities)
+
+    elapsed = time.perf_counter() - start
     print("\n" + "="*60)
     print("🎉 Mock data generation complete!")
     print("="*60)
-    print("\n📁 Generated files in data/mock/:")
-    print("  - population_paris.csv (50 rows)")
-    print("  - population_evry.csv (50 rows)")
-    print("  - consommation_paris.csv (50 rows)")
-    print("  - consommation_evry.csv (50 rows)")
-    print("  - csp_reference.csv (6 CSP categories)")
+    print(f"\n📁 Generated {total_rows:,} source rows in {mock_dir}/ in {elapsed:.1f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    for city in cities:
+        print(f"  - population_{city.slug}.csv ({population_rows:,} rows)")
+        print(f"  - consommation_{city.slug}.csv ({consommation_rows:,} rows)")
+    print(f"  - csp_reference.csv ({len(CSP_REFERENCE)} CSP categories)")
     print("  - iris_reference.csv (IRIS zones)")
-    print("\n⚠️  Quality issues included for testing:")
-    print("  - Missing values (Nom, CSP, Adresse, Nom_Rue)")
-    print("  - Invalid CSP codes (99)")
-    print("  - Invalid postal codes (999)")
+    if not args.no_issues:
+        print("\n⚠️  Quality issues included for testing:")
+        print("  - Missing values (Nom, CSP, Adresse, Nom_Rue)")
+        print(f"  - Invalid CSP codes ({INVALID_CSP})")
+        print(f"  - Invalid postal codes ({INVALID_POSTAL_CODE})")
     print("\n🚀 Ready to test ETL pipeline!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,163 @@
+"""Memory profile of the pipeline on generated data, comparable across commits
+
+`run` generates a dataset (cached like scripts/benchmark.py), runs the
+in-process pipeline in memory profiling mode (src.pipeline.memory) and
+saves peak/retained memory per stage and function, top allocation sites and
+DataFrame deep memory usage as JSON with environment info. `compare` flags
+records whose peak memory grew beyond a threshold (exit code 1).
+`compaction` reports the memory saved per table by the schema domain
+encodings (src.transform.compact) on sources and unions.
+
+Usage:
+    python scripts/memory_profile.py run --rows 1e5 --output memory-baseline.json
+    python scripts/memory_profile.py run --rows 1e7 --top 0 --output memory-large.json
+    python scripts/memory_profile.py compare memory-baseline.json memory-new.json --threshold 0.1
+    python scripts/memory_profile.py compaction --rows 1e6
+"""
+import argparse
+import json
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from benchmark import PROJECT_ROOT, dataset, environment
+
+MIN_MB = 1.0  # compare: changes below this are noise
+
+
+def run(args) -> int:
+    from src.pipeline.memory import format_memory_report
+    from src.pipeline.runner import PipelineConfig, run_pipeline
+
+    data_path = dataset(args.data_dir, args.rows, args.seed, args.street_skew)
+    with tempfile.TemporaryDirectory(prefix='memory-profile-') as output_dir:
+        result = run_pipeline(PipelineConfig(data_dir=data_path, output_dir=Path(output_dir), load_db=False,
+                                             telemetry=False, memory_profile=True, memory_top=args.top))
+
+    print(format_memory_report(result.memory))
+    report = {
+        'environment': environment(),
+        'config': {'rows': args.rows, 'seed': args.seed, 'street_skew': args.street_skew, 'top': args.top},
+        'stages': [s.to_dict() for s in result.stats],
+        'memory': [m.to_dict() for m in result.memory],
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"✅ Saved {len(result.memory)} memory records to {args.output}")
+    return 0
+
+
+def compaction(args) -> int:
+    from src.extract.sources import read_csv_with_schema
+    from src.pipeline.stages import SOURCE_FILES
+    from src.transform.compact import compact, compaction_stats, format_compaction_report
+    from src.transform.unions import union_consommation_sources, union_population_sources
+
+    data_path = dataset(args.data_dir, args.rows, args.seed, args.street_skew)
+    raw = {name: read_csv_with_schema(data_path / path.name, schema) for name, (path, schema) in SOURCE_FILES.items()}
+    compacted = {name: compact(df, SOURCE_FILES[name][1]) for name, df in raw.items()}
+    stats = [compaction_stats(name, raw[name], compacted[name]) for name in raw]
+
+    # Unions of plain vs compacted sources (Source itself is categorical in both)
+    for table, union, kind in [('population_union', union_population_sources, 'population'),
+                               ('consommation_union', union_consommation_sources, 'consommation')]:
+        frames = [f"{kind}_paris", f"{kind}_evry"]
+        stats.append(compaction_stats(table, union(*(raw[name].copy() for name in frames)),
+                                      union(*(compacted[name].copy() for name in frames))))
+
+    print(format_compaction_report(stats))
+    saved = sum(table.saved_mb for table in stats)
+    print(f"✅ Saved {saved:.1f} MB of {sum(table.before_mb for table in stats):.1f} MB")
+    if args.output:
+        args.output.write_text(json.dumps({'environment': environment(), 'rows': args.rows,
+                                           'tables': [table.to_dict() for table in stats]}, indent=2))
+    return 0
+
+
+def _keyed(records: list) -> dict:
+    """Records keyed by parent/name#call, so repeated calls of a function line up"""
+    calls = Counter()
+    keyed = {}
+    for record in records:
+        name = f"{record['parent']}/{record['name']}" if record['parent'] else record['name']
+        keyed[f"{name}#{calls[name]}" if calls[name] else name] = record
+        calls[name] += 1
+    return keyed
+
+
+def compare(args) -> int:
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    if baseline['config'].get('rows') != current['config'].get('rows'):
+        print(f"⚠️  Different dataset sizes: {baseline['config'].get('rows')} -> {current['config'].get('rows')} rows")
+
+    baseline_records = _keyed(baseline['memory'])
+    regressions = 0
+    print(f"{'Stage / function':<60} {'Metric':<12} {'Before':>9} {'After':>9} {'Change':>8}  (MB)")
+    for key, record in _keyed(current['memory']).items():
+        if key not in baseline_records:
+            continue
+        for metric in ('traced_peak_mb', 'rss_peak_mb'):
+            before, after = baseline_records[key][metric], record[metric]
+            change = (after - before) / before if before > 0 else 0.0
+            regressed = change > args.threshold and after - before > args.min_mb
+            regressions += regressed
+            if regressed or abs(change) > args.threshold or args.verbose:
+                flag = "❌" if regressed else ("🚀" if change < -args.threshold else "")
+                print(f"{key:<60} {metric.removesuffix('_mb'):<12} {before:>9.1f} {after:>9.1f} "
+                      f"{change:>+8.1%} {flag}")
+
+    if regressions:
+        print(f"❌ {regressions} memory regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"✅ No memory regression beyond {args.threshold:.0%}")
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pipeline memory profile")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Profile the pipeline and save the report as JSON")
+    run_parser.add_argument('--rows', type=lambda value: int(float(value)), default=100_000,
+                            help="Rows per source file, e.g. 1e5 (default: 1e5)")
+    run_parser.add_argument('--top', type=int, default=10,
+                            help="Allocation sites per stage, 0 to skip (much faster on large data)")
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--street-skew', type=float, default=0.0)
+    run_parser.add_argument('--data-dir', type=Path, default=PROJECT_ROOT / "data" / "bench",
+                            help="Generated datasets, shared with scripts/benchmark.py (default: data/bench)")
+    run_parser.add_argument('--output', type=Path,
+                            default=Path(f"memory-{datetime.now():%Y%m%dT%H%M%S}.json"))
+    run_parser.set_defaults(handler=run)
+
+    compaction_parser = commands.add_parser('compaction', help="Memory saved per table by the schema domains")
+    compaction_parser.add_argument('--rows', type=lambda value: int(float(value)), default=100_000,
+                                   help="Rows per source file, e.g. 1e5 (default: 1e5)")
+    compaction_parser.add_argument('--seed', type=int, default=42)
+    compaction_parser.add_argument('--street-skew', type=float, default=0.0)
+    compaction_parser.add_argument('--data-dir', type=Path, default=PROJECT_ROOT / "data" / "bench")
+    compaction_parser.add_argument('--output', type=Path, default=None, help="Also write the report as JSON")
+    compaction_parser.set_defaults(handler=compaction)
+
+    compare_parser = commands.add_parser('compare', help="Flag peak memory regressions between two reports")
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('current', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="Relative growth counted as a regression (default: 0.10)")
+    compare_parser.add_argument('--min-mb', type=float, default=MIN_MB,
+                                help=f"Ignore absolute growth below this (default: {MIN_MB})")
+    compare_parser.add_argument('--verbose', action='store_true', help="Show unchanged records too")
+    compare_parser.set_defaults(handler=compare)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,43 @@
 """CSV schema definitions for source and target tables"""
-from typing import Dict, List
-from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+
+# Logical types of a Domain, see src.transform.compact for their encodings
+LOGICAL_TYPES = ['string', 'category', 'small_int', 'nullable_int']
+
+CSP_CODES = ("1", "2", "3", "4", "5", "6")  # CSP reference codes
+SOURCES = ("Paris", "Evry")
+POSTAL_CODE_PATTERN = r'^\d{5}$'
+ADDRESS_PATTERN = r'^[^,]+,\s*\d{5}$'  # Population address: "12 Rue Victor Hugo, 75001"
+# Population IDs: city letter + zero-padded number, at least 4 digits (P0001, P0000001 on 1M+ rows)
+POPULATION_ID_PATTERNS = {'Paris': r'^P\d{4,}$', 'Evry': r'^E\d{4,}$'}
+
+
+@dataclass(frozen=True)
+class Domain:
+    """
+    Logical type and allowed values of a column.
+
+    - string: kept as parsed (validation rules only)
+    - category: few distinct values (dictionary encoded); `values` lists the
+      expected ones, None to take them from the data
+    - small_int: integers without missing values (smallest numpy int)
+    - nullable_int: integers with missing values (smallest pandas IntXX)
+
+    Rows breaking the rules (`nullable`, `values`, `pattern`, bounds) are
+    quarantined at extract, see src.extract.validation.
+    """
+    logical_type: str
+    values: Tuple[str, ...] | None = None
+    pattern: str | None = None  # Regex of valid values, e.g. 5-digit postal codes
+    min_value: int | None = None
+    max_value: int | None = None
+    nullable: bool = True  # False: missing or blank values are invalid
+
+    def __post_init__(self):
+        if self.logical_type not in LOGICAL_TYPES:
+            raise ValueError(f"Unknown logical type: {self.logical_type}. Available: {LOGICAL_TYPES}")
+
 
 @dataclass
 class TableSchema:
@@ -10,6 +47,14 @@ class TableSchema:
     dtypes: Dict[str, str]
     required_columns: List[str]
     primary_key: str
+    domains: Dict[str, Domain] = field(default_factory=dict)  # Compact encodings, see compact()
+
+
+CSP_DOMAIN = Domain('category', values=CSP_CODES, nullable=False)
+POSTAL_CODE_DOMAIN = Domain('category', pattern=POSTAL_CODE_PATTERN, nullable=False)
+SOURCE_DOMAIN = Domain('category', values=SOURCES)
+STREET_NUMBER_DOMAIN = Domain('small_int', min_value=0, nullable=False)
+KEY_DOMAIN = Domain('string', nullable=False)
 
 # Source S1 & S2 - Population (Paris & Evry)
 POPULATION_SCHEMA = TableSchema(
@@ -23,7 +68,14 @@ POPULATION_SCHEMA = TableSchema(
         "CSP": "string"  # String to handle missing values
     },
     required_columns=["ID"],
-    primary_key="ID"
+    primary_key="ID",
+    domains={
+        "ID": KEY_DOMAIN,
+        "Nom": Domain("category"),
+        "Prenom": Domain("category"),
+        "Adresse": Domain("string", pattern=ADDRESS_PATTERN, nullable=False),
+        "CSP": CSP_DOMAIN,
+    }
 )
 
 # Source S1 & S2 - Consommation (Paris & Evry)
@@ -38,7 +90,13 @@ CONSOMMATION_SCHEMA = TableSchema(
         "NB_KW_Jour": "float64"
     },
     required_columns=["ID_Adr", "N", "Nom_Rue", "Code_Postal", "NB_KW_Jour"],
-    primary_key="ID_Adr"
+    primary_key="ID_Adr",
+    domains={
+        "ID_Adr": KEY_DOMAIN,
+        "N": STREET_NUMBER_DOMAIN,
+        "Nom_Rue": Domain("category", nullable=False),
+        "Code_Postal": POSTAL_CODE_DOMAIN,
+    }
 )
 
 # Source S3 - CSP Reference
@@ -53,7 +111,8 @@ CSP_SCHEMA = TableSchema(
         "Salaire_Max": "float64"
     },
     required_columns=["ID_CSP", "Salaire_Moyen"],
-    primary_key="ID_CSP"
+    primary_key="ID_CSP",
+    domains={"ID_CSP": CSP_DOMAIN}
 )
 
 # Source S4 - IRIS Reference
@@ -66,7 +125,12 @@ IRIS_SCHEMA = TableSchema(
         "ID_Iris": "string"
     },
     required_columns=["ID_Rue", "ID_Ville", "ID_Iris"],
-    primary_key=["ID_Rue", "ID_Ville"]  # Composite key
+    primary_key=["ID_Rue", "ID_Ville"],  # Composite key
+    domains={
+        "ID_Rue": Domain("category", nullable=False),
+        "ID_Ville": POSTAL_CODE_DOMAIN,
+        "ID_Iris": KEY_DOMAIN,
+    }
 )
 
 # Target - Consommation_CSP
@@ -107,7 +171,8 @@ POPULATION_UNION_SCHEMA = TableSchema(
         "Source": "string"
     },
     required_columns=["ID_Source", "Source"],
-    primary_key="ID_Source"
+    primary_key="ID_Source",
+    domains={**POPULATION_SCHEMA.domains, "Source": SOURCE_DOMAIN}
 )
 
 # Intermediate - Consommation enriched with Source
@@ -123,7 +188,8 @@ CONSOMMATION_UNION_SCHEMA = TableSchema(
         "Source": "string"
     },
     required_columns=["ID_Adr_Source", "NB_KW_Jour", "Source"],
-    primary_key="ID_Adr_Source"
+    primary_key="ID_Adr_Source",
+    domains={**CONSOMMATION_SCHEMA.domains, "Source": SOURCE_DOMAIN}
 )
 
 # Schema registry for easy access
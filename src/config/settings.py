@@ -3,41 +3,111 @@ from pathlib import Path
 import os
 import logging
 
-# Project paths
+# Project paths (pure path arithmetic, nothing touches the filesystem at import:
+# this module is imported on every Airflow DAG parse; entry points call ensure_directories)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 MOCK_DATA_DIR = DATA_DIR / "mock"
 RAW_DATA_DIR = DATA_DIR / "raw"
 OUTPUT_DIR = DATA_DIR / "output"
+VIOLATIONS_DIR = DATA_DIR / "violations"  # Full quality violation exports
+QUARANTINE_DIR = DATA_DIR / "quarantine"  # Source rows failing schema domain rules
 LOGS_DIR = PROJECT_ROOT / "logs"
 
-# Create directories if they don't exist
-for directory in [MOCK_DATA_DIR, RAW_DATA_DIR, OUTPUT_DIR, LOGS_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
-
 # Environment variable to switch between mock and real data
 USE_MOCK_DATA = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
-DATA_SOURCE_DIR = MOCK_DATA_DIR if USE_MOCK_DATA else RAW_DATA_DIR
 
-# Data files - Paris (Source S1)
-POPULATION_PARIS_FILE = DATA_SOURCE_DIR / "population_paris.csv"
-CONSOMMATION_PARIS_FILE = DATA_SOURCE_DIR / "consommation_paris.csv"
+# Source and working paths are resolved on first access (module __getattr__)
+_LAZY_SETTINGS = {
+    'DATA_SOURCE_DIR': lambda: MOCK_DATA_DIR if USE_MOCK_DATA else RAW_DATA_DIR,
+    # Data files - Paris (Source S1)
+    'POPULATION_PARIS_FILE': lambda: _setting('DATA_SOURCE_DIR') / "population_paris.csv",
+    'CONSOMMATION_PARIS_FILE': lambda: _setting('DATA_SOURCE_DIR') / "consommation_paris.csv",
+    # Data files - Evry (Source S2)
+    'POPULATION_EVRY_FILE': lambda: _setting('DATA_SOURCE_DIR') / "population_evry.csv",
+    'CONSOMMATION_EVRY_FILE': lambda: _setting('DATA_SOURCE_DIR') / "consommation_evry.csv",
+    # Reference files (Source S3, S4)
+    'CSP_FILE': lambda: _setting('DATA_SOURCE_DIR') / "csp_reference.csv",
+    'IRIS_FILE': lambda: _setting('DATA_SOURCE_DIR') / "iris_reference.csv",
+    # Stage checkpoints, DataFrame handoff between DAG tasks, SQLite metrics store
+    'CHECKPOINT_DIR': lambda: Path(os.getenv('CHECKPOINT_DIR', str(DATA_DIR / "checkpoints"))),
+    'HANDOFF_DIR': lambda: Path(os.getenv('HANDOFF_DIR', str(DATA_DIR / "handoff"))),
+    'METRICS_SQLITE_PATH': lambda: Path(os.getenv('METRICS_SQLITE_PATH', str(DATA_DIR / "metrics.db"))),
+}
+
+
+def _setting(name: str):
+    return globals()[name] if name in globals() else __getattr__(name)
+
 
-# Data files - Evry (Source S2)
-POPULATION_EVRY_FILE = DATA_SOURCE_DIR / "population_evry.csv"
-CONSOMMATION_EVRY_FILE = DATA_SOURCE_DIR / "consommation_evry.csv"
+def __getattr__(name: str):
+    """Resolve a lazy setting on first access and cache it as a module attribute"""
+    if name not in _LAZY_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = _LAZY_SETTINGS[name]()
+    return value
 
-# Reference files (Source S3, S4)
-CSP_FILE = DATA_SOURCE_DIR / "csp_reference.csv"
-IRIS_FILE = DATA_SOURCE_DIR / "iris_reference.csv"
 
-# Target file paths
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SETTINGS))
+
+
+def ensure_directories():
+    """Create the data, output and logs directories (no-op if they exist)"""
+    for directory in [MOCK_DATA_DIR, RAW_DATA_DIR, OUTPUT_DIR, LOGS_DIR]:
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+# Target file names (extension added from TARGET_FORMAT)
 TARGET_FILES = {
-    'csp': "consommation_csp.csv",
-    'iris_paris': "consommation_iris_paris.csv",
-    'iris_evry': "consommation_iris_evry.csv",
+    'csp': "consommation_csp",
+    'iris_paris': "consommation_iris_paris",
+    'iris_evry': "consommation_iris_evry",
 }
 
+# Target output format: parquet, arrow (IPC) or csv
+TARGET_FORMAT = os.getenv('TARGET_FORMAT', 'parquet')
+TARGET_COMPRESSION = os.getenv('TARGET_COMPRESSION', 'zstd')
+
+# Load targets into PostgreSQL (targets schema) in addition to the output files
+LOAD_TARGETS_TO_DB = os.getenv('LOAD_TARGETS_TO_DB', 'true').lower() == 'true'
+TARGET_LOAD_MODE = os.getenv('TARGET_LOAD_MODE', 'replace')  # replace or upsert
+
+# Postal-code partitions the etl_pipeline DAG fans out over (dynamic task mapping)
+ETL_PARTITIONS = int(os.getenv('ETL_PARTITIONS', '8'))
+
+# Re-encode source columns with their schema domains at extract (categorical, small integers)
+COMPACT_SOURCES = os.getenv('COMPACT_SOURCES', 'true').lower() == 'true'
+
+# Quarantine source rows breaking their schema domain rules at extract (QUARANTINE_DIR)
+VALIDATE_SOURCES = os.getenv('VALIDATE_SOURCES', 'true').lower() == 'true'
+
+# Population x Consommation join guard (src.transform.joins): expected cardinality
+# (one_to_one, many_to_one, many_to_many), on violation (raise, dedupe, warn), and the
+# most output rows per input row before failing fast (0: no limit)
+JOIN_CARDINALITY = os.getenv('JOIN_CARDINALITY', 'many_to_one')
+JOIN_ON_VIOLATION = os.getenv('JOIN_ON_VIOLATION', 'warn')
+JOIN_MAX_FANOUT = float(os.getenv('JOIN_MAX_FANOUT', '100')) or None
+
+# Stage checkpoints (memoized stage outputs in CHECKPOINT_DIR, LRU-evicted above CHECKPOINT_MAX_MB)
+CHECKPOINTS_ENABLED = os.getenv('CHECKPOINTS_ENABLED', 'true').lower() == 'true'
+CHECKPOINT_MAX_MB = int(os.getenv('CHECKPOINT_MAX_MB', '2048'))
+
+# DataFrame handoff between DAG tasks (Arrow files in HANDOFF_DIR on the shared data volume)
+HANDOFF_RETENTION_DAYS = float(os.getenv('HANDOFF_RETENTION_DAYS', '7'))  # Files of failed runs
+
+# Per-stage performance telemetry (data_quality.performance)
+TELEMETRY_ENABLED = os.getenv('TELEMETRY_ENABLED', 'true').lower() == 'true'
+
+# Metrics store backend: postgres, or sqlite (METRICS_SQLITE_PATH) for DB-less local/CI runs
+METRICS_BACKEND = os.getenv('METRICS_BACKEND', 'postgres')
+
+# Metrics store partition maintenance (see init-db.sql)
+METRICS_PARTITIONS_AHEAD = int(os.getenv('METRICS_PARTITIONS_AHEAD', '3'))  # Months
+METRICS_RETENTION_MONTHS = int(os.getenv('METRICS_RETENTION_MONTHS', '12'))
+PERFORMANCE_RETENTION_DAYS = int(os.getenv('PERFORMANCE_RETENTION_DAYS', '90'))  # data_quality.performance rows
+METRICS_MAINTENANCE_SCHEDULE = os.getenv('METRICS_MAINTENANCE_SCHEDULE', '@daily')  # metrics_maintenance DAG
+
 # Logging configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
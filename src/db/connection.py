@@ -1,7 +1,10 @@
 """Database connection utilities"""
 import os
+import threading
+import time
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 
 def get_db_url():
@@ -11,12 +14,131 @@ def get_db_url():
     user = os.getenv('POSTGRES_USER', 'airflow')
     password = os.getenv('POSTGRES_PASSWORD', 'airflow')
     database = os.getenv('POSTGRES_DB', 'airflow')
-    
+
     return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
 
+def get_pool_settings():
+    """Get connection pool settings from environment variables"""
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),  # Seconds, -1 disables
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+
+class _AcquireStats:
+    """Connection-acquisition timings of the process-wide pool"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float):
+        with self.lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+
+_acquire_stats = _AcquireStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each connection checkout takes"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _acquire_stats.observe(time.perf_counter() - start)
+
+
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
 def get_engine():
-    """Create SQLAlchemy engine"""
-    return create_engine(get_db_url())
+    """
+    Get the process-wide pooled SQLAlchemy engine.
+
+    The engine is created lazily on first use and reused afterwards, so
+    connections are pooled across calls. A forked child (e.g. Airflow
+    LocalExecutor workers) gets its own engine instead of the parent's
+    sockets.
+    """
+    global _engine, _engine_pid
+
+    if _engine is None or _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine_pid != os.getpid():
+                if _engine is not None:
+                    # Inherited from the parent: drop the pool without closing its sockets
+                    _engine.dispose(close=False)
+                _engine = create_engine(get_db_url(), poolclass=TimedQueuePool, **get_pool_settings())
+                _engine_pid = os.getpid()
+    return _engine
+
+def dispose_engine():
+    """Close all pooled connections; the next get_engine() creates a new pool"""
+    global _engine, _engine_pid
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _engine_pid = None
+
+def _reinit_after_fork():
+    """Forget the parent's engine and lock in a forked child"""
+    global _engine, _engine_pid, _engine_lock
+
+    _engine_lock = threading.Lock()
+    _acquire_stats.lock = threading.Lock()
+    _acquire_stats.reset()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _engine = None
+    _engine_pid = None
+
+os.register_at_fork(after_in_child=_reinit_after_fork)
+
+def get_pool_metrics(reset: bool = False):
+    """
+    Connection pool metrics of this process.
+
+    Returns dict with acquisition count, total, average and max acquisition
+    time (milliseconds) and the current pool occupancy. With `reset`, the
+    acquisition timings restart from zero.
+    """
+    with _acquire_stats.lock:
+        count = _acquire_stats.count
+        total = _acquire_stats.total_seconds
+        maximum = _acquire_stats.max_seconds
+        if reset:
+            _acquire_stats.reset()
+
+    metrics = {
+        'acquire_count': count,
+        'acquire_total_ms': total * 1000,
+        'acquire_avg_ms': (total / count) * 1000 if count else 0.0,
+        'acquire_max_ms': maximum * 1000,
+    }
+    if _engine is not None:
+        pool = _engine.pool
+        metrics.update({
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    return metrics
 
 @contextmanager
 def get_session():
@@ -31,4 +153,4 @@ def get_session():
         session.rollback()
         raise
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
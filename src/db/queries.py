@@ -1,6 +1,9 @@
 """Database query utilities for quality metrics"""
-from datetime import datetime
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import pandas as pd
 from sqlalchemy import text
+from src.config.settings import METRICS_PARTITIONS_AHEAD, METRICS_RETENTION_MONTHS, PERFORMANCE_RETENTION_DAYS
 from .connection import get_engine
 
 def save_quality_metric(table_name: str, column_name: str, metric_type: str, 
@@ -47,26 +50,276 @@ def save_quality_issue(table_name: str, row_id: str, issue_type: str,
             'timestamp': datetime.now()
         })
 
+def save_quality_metrics(records: List[Dict]):
+    """
+    Save many quality metrics in a single transaction.
+    
+    Each record has the keyword arguments of save_quality_metric, plus an
+    optional 'timestamp' (defaults to now).
+    """
+    if not records:
+        return
+    engine = get_engine()
+    
+    query = text("""
+        INSERT INTO data_quality.metrics 
+        (table_name, column_name, metric_type, metric_value, source, timestamp)
+        VALUES (:table_name, :column_name, :metric_type, :metric_value, :source, :timestamp)
+    """)
+    
+    now = datetime.now()
+    params = [{
+        'table_name': record['table_name'],
+        'column_name': record.get('column_name'),
+        'metric_type': record['metric_type'],
+        'metric_value': record.get('metric_value'),
+        'source': record.get('source'),
+        'timestamp': record.get('timestamp') or now
+    } for record in records]
+    
+    with engine.begin() as conn:
+        conn.execute(query, params)
+
+def save_quality_issues(records: List[Dict]):
+    """
+    Save many quality issues in a single transaction.
+    
+    Each record has the keyword arguments of save_quality_issue, plus an
+    optional 'timestamp' (defaults to now).
+    """
+    if not records:
+        return
+    engine = get_engine()
+    
+    query = text("""
+        INSERT INTO data_quality.issues 
+        (table_name, row_id, issue_type, issue_description, severity, source, timestamp)
+        VALUES (:table_name, :row_id, :issue_type, :issue_description, :severity, :source, :timestamp)
+    """)
+    
+    now = datetime.now()
+    params = [{
+        'table_name': record['table_name'],
+        'row_id': record.get('row_id'),
+        'issue_type': record['issue_type'],
+        'issue_description': record.get('issue_description'),
+        'severity': record.get('severity', 'medium'),
+        'source': record.get('source'),
+        'timestamp': record.get('timestamp') or now
+    } for record in records]
+    
+    with engine.begin() as conn:
+        conn.execute(query, params)
+
+PERFORMANCE_COLUMNS = ['run_id', 'pipeline', 'stage', 'wall_seconds', 'cpu_seconds', 'peak_rss_mb',
+                       'rows_in', 'rows_out', 'rows_per_second', 'timestamp']
+
+def save_performance_records(records: List[Dict]):
+    """
+    Save many stage performance records in a single transaction.
+    
+    Each record has the PERFORMANCE_COLUMNS keys ('timestamp' defaults to now).
+    """
+    if not records:
+        return
+    engine = get_engine()
+    
+    query = text(f"""
+        INSERT INTO data_quality.performance ({', '.join(PERFORMANCE_COLUMNS)})
+        VALUES ({', '.join(':' + column for column in PERFORMANCE_COLUMNS)})
+    """)
+    
+    now = datetime.now()
+    params = [{
+        **{column: record.get(column) for column in PERFORMANCE_COLUMNS},
+        'timestamp': record.get('timestamp') or now
+    } for record in records]
+    
+    with engine.begin() as conn:
+        conn.execute(query, params)
+
+def get_performance(stage: str = None, pipeline: str = None, since: datetime = None,
+                    limit: int = 10_000):
+    """Retrieve stage performance records, most recent first"""
+    engine = get_engine()
+    
+    query = f"""
+        SELECT id, {', '.join(PERFORMANCE_COLUMNS)}
+        FROM data_quality.performance
+        WHERE (CAST(:stage AS VARCHAR) IS NULL OR stage = :stage)
+          AND (CAST(:pipeline AS VARCHAR) IS NULL OR pipeline = :pipeline)
+          AND (CAST(:since AS TIMESTAMP) IS NULL OR timestamp >= :since)
+        ORDER BY timestamp DESC, id DESC
+        LIMIT :limit
+    """
+    
+    with engine.connect() as conn:
+        result = conn.execute(text(query), {'stage': stage, 'pipeline': pipeline,
+                                            'since': since, 'limit': limit})
+        return result.fetchall()
+
 def get_latest_metrics(table_name: str = None, limit: int = 100):
-    """Retrieve latest quality metrics"""
+    """
+    Retrieve latest quality metrics.
+    
+    Reads the metrics_latest rollup (one row per table/column/metric/source)
+    instead of sorting the full metrics history.
+    """
     engine = get_engine()
     
+    query = """
+        SELECT metric_id AS id, table_name, NULLIF(column_name, '') AS column_name,
+               metric_type, metric_value, NULLIF(source, '') AS source, timestamp
+        FROM data_quality.metrics_latest
+    """
+    params = {'limit': limit}
     if table_name:
-        query = text("""
-            SELECT * FROM data_quality.metrics 
-            WHERE table_name = :table_name
-            ORDER BY timestamp DESC 
-            LIMIT :limit
-        """)
-        params = {'table_name': table_name, 'limit': limit}
-    else:
-        query = text("""
-            SELECT * FROM data_quality.metrics 
-            ORDER BY timestamp DESC 
-            LIMIT :limit
-        """)
-        params = {'limit': limit}
+        query += " WHERE table_name = :table_name"
+        params['table_name'] = table_name
+    query += " ORDER BY timestamp DESC LIMIT :limit"
+    
+    with engine.connect() as conn:
+        result = conn.execute(text(query), params)
+        return result.fetchall()
+
+# Keyset cursor: (timestamp, id) of the last row of a page
+MetricsCursor = Tuple[datetime, int]
+
+METRIC_COLUMNS = "id, table_name, column_name, metric_type, metric_value, source, timestamp"
+
+def _metrics_filters(table_name: str = None, source: str = None, metric_type: str = None,
+                     start: datetime = None, end: datetime = None) -> Tuple[List[str], Dict]:
+    """WHERE clauses and parameters shared by the metric history queries"""
+    clauses = []
+    params = {}
+    for column, value in (('table_name', table_name), ('source', source), ('metric_type', metric_type)):
+        if value is not None:
+            clauses.append(f"{column} = :{column}")
+            params[column] = value
+    if start is not None:
+        clauses.append("timestamp >= :start")
+        params['start'] = start
+    if end is not None:
+        clauses.append("timestamp < :end")
+        params['end'] = end
+    return clauses, params
+
+def get_metrics_page(table_name: str = None, source: str = None, metric_type: str = None,
+                     start: datetime = None, end: datetime = None,
+                     after: MetricsCursor = None, limit: int = 1000
+                     ) -> Tuple[pd.DataFrame, Optional[MetricsCursor]]:
+    """
+    Retrieve one page of metric history, newest first.
+    
+    Keyset pagination on (timestamp, id): pass the returned cursor as
+    `after` to get the next page. Each page is an index range scan, however
+    deep into the history it is.
+    
+    Returns:
+        (page, next_cursor) - next_cursor is None on the last page
+    """
+    engine = get_engine()
+    
+    clauses, params = _metrics_filters(table_name, source, metric_type, start, end)
+    if after is not None:
+        clauses.append("(timestamp, id) < (:after_timestamp, :after_id)")
+        params['after_timestamp'], params['after_id'] = after
+    params['limit'] = limit
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = text(f"""
+        SELECT {METRIC_COLUMNS}
+        FROM data_quality.metrics
+        {where}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT :limit
+    """)
     
     with engine.connect() as conn:
         result = conn.execute(query, params)
-        return result.fetchall()
\ No newline at end of file
+        page = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    
+    next_cursor = None
+    if len(page) == limit:
+        last = page.iloc[-1]
+        next_cursor = (last['timestamp'].to_pydatetime(), int(last['id']))
+    return page, next_cursor
+
+def iter_metrics(table_name: str = None, source: str = None, metric_type: str = None,
+                 start: datetime = None, end: datetime = None,
+                 batch_size: int = 10_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream metric history as DataFrames of at most `batch_size` rows.
+    
+    Rows come from a server-side cursor in (timestamp, id) order, so reader
+    memory stays at one batch however much history matches.
+    """
+    engine = get_engine()
+    
+    clauses, params = _metrics_filters(table_name, source, metric_type, start, end)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = text(f"""
+        SELECT {METRIC_COLUMNS}
+        FROM data_quality.metrics
+        {where}
+        ORDER BY timestamp, id
+    """)
+    
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=batch_size)
+        result = conn.execute(query, params)
+        columns = list(result.keys())
+        for rows in result.partitions(batch_size):
+            yield pd.DataFrame(rows, columns=columns)
+
+def get_issue_summary(table_name: str = None, since: date = None):
+    """
+    Retrieve issue counts per table, issue type and severity.
+    
+    Reads the issues_daily rollup; `since` restricts to days on or after it.
+    """
+    engine = get_engine()
+    
+    query = """
+        SELECT table_name, issue_type, NULLIF(severity, '') AS severity,
+               SUM(issue_count) AS count
+        FROM data_quality.issues_daily
+        WHERE (CAST(:table_name AS VARCHAR) IS NULL OR table_name = :table_name)
+          AND (CAST(:since AS DATE) IS NULL OR day >= :since)
+        GROUP BY table_name, issue_type, severity
+        ORDER BY count DESC
+    """
+    
+    with engine.connect() as conn:
+        result = conn.execute(text(query), {'table_name': table_name, 'since': since})
+        return result.fetchall()
+
+def maintain_metrics_storage(months_ahead: int = METRICS_PARTITIONS_AHEAD,
+                             retention_months: int = METRICS_RETENTION_MONTHS,
+                             performance_retention_days: int = PERFORMANCE_RETENTION_DAYS) -> Dict[str, int]:
+    """
+    Create upcoming monthly partitions and drop expired ones.
+    
+    Applies to data_quality.metrics and data_quality.issues; rollups are
+    kept. Performance records older than `performance_retention_days` are
+    deleted. Returns the number of partitions created and dropped and of
+    performance records deleted.
+    """
+    engine = get_engine()
+    
+    counts = {'created': 0, 'dropped': 0}
+    with engine.begin() as conn:
+        for parent in ('metrics', 'issues'):
+            counts['created'] += conn.execute(
+                text("SELECT data_quality.create_monthly_partitions(:parent, :months_ahead)"),
+                {'parent': parent, 'months_ahead': months_ahead}
+            ).scalar()
+            counts['dropped'] += conn.execute(
+                text("SELECT data_quality.drop_partitions_older_than(:parent, make_interval(months => :months))"),
+                {'parent': parent, 'months': retention_months}
+            ).scalar()
+        counts['performance_deleted'] = conn.execute(
+            text("DELETE FROM data_quality.performance WHERE timestamp < now() - make_interval(days => :days)"),
+            {'days': performance_retention_days}
+        ).rowcount
+    return counts
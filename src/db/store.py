@@ -0,0 +1,448 @@
+"""Pluggable metrics store: PostgreSQL or embedded SQLite
+
+The backend is selected with the METRICS_BACKEND environment variable:
+
+- `postgres` (default): the data_quality schema of init-db.sql, through
+  `src.db.queries`
+- `sqlite`: a local file (METRICS_SQLITE_PATH) with the same tables and
+  rollups, for DB-less local and CI runs. Its rows can later be pushed to
+  PostgreSQL in bulk with `sync_to_postgres`.
+"""
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from src.config.settings import METRICS_BACKEND, METRICS_SQLITE_PATH, PERFORMANCE_RETENTION_DAYS, setup_logging
+from src.db import queries
+
+logger = setup_logging(__name__)
+
+
+class MetricsStore(ABC):
+    """Where quality metrics, issues and performance records are written and read back"""
+
+    @abstractmethod
+    def save_quality_metrics(self, records: List[Dict]):
+        """Save many metrics (keyword arguments of save_quality_metric)"""
+
+    @abstractmethod
+    def save_quality_issues(self, records: List[Dict]):
+        """Save many issues (keyword arguments of save_quality_issue)"""
+
+    @abstractmethod
+    def get_latest_metrics(self, table_name: str = None, limit: int = 100) -> list:
+        """Latest value per table/column/metric/source"""
+
+    @abstractmethod
+    def get_issue_summary(self, table_name: str = None, since: date = None) -> list:
+        """Issue counts per table, issue type and severity"""
+
+    @abstractmethod
+    def save_performance(self, records: List[Dict]):
+        """Save many stage performance records (see queries.PERFORMANCE_COLUMNS)"""
+
+    @abstractmethod
+    def get_performance(self, stage: str = None, pipeline: str = None,
+                        since: datetime = None, limit: int = 10_000) -> list:
+        """Stage performance records, most recent first"""
+
+    def save_quality_metric(self, table_name: str, column_name: str, metric_type: str,
+                            metric_value: float, source: str = None):
+        """Save a quality metric"""
+        self.save_quality_metrics([{
+            'table_name': table_name,
+            'column_name': column_name,
+            'metric_type': metric_type,
+            'metric_value': metric_value,
+            'source': source
+        }])
+
+    def save_quality_issue(self, table_name: str, row_id: str, issue_type: str,
+                           issue_description: str, severity: str = 'medium',
+                           source: str = None):
+        """Save a quality issue"""
+        self.save_quality_issues([{
+            'table_name': table_name,
+            'row_id': row_id,
+            'issue_type': issue_type,
+            'issue_description': issue_description,
+            'severity': severity,
+            'source': source
+        }])
+
+    def maintain(self) -> Dict[str, int]:
+        """Storage upkeep (partitions, retention), run on a schedule; returns what was done"""
+        return {}
+
+
+class PostgresMetricsStore(MetricsStore):
+    """The data_quality schema in PostgreSQL"""
+
+    def save_quality_metric(self, table_name: str, column_name: str, metric_type: str,
+                            metric_value: float, source: str = None):
+        queries.save_quality_metric(table_name, column_name, metric_type, metric_value, source)
+
+    def save_quality_issue(self, table_name: str, row_id: str, issue_type: str,
+                           issue_description: str, severity: str = 'medium',
+                           source: str = None):
+        queries.save_quality_issue(table_name, row_id, issue_type, issue_description, severity, source)
+
+    def save_quality_metrics(self, records: List[Dict]):
+        queries.save_quality_metrics(records)
+
+    def save_quality_issues(self, records: List[Dict]):
+        queries.save_quality_issues(records)
+
+    def get_latest_metrics(self, table_name: str = None, limit: int = 100) -> list:
+        return queries.get_latest_metrics(table_name, limit)
+
+    def get_issue_summary(self, table_name: str = None, since: date = None) -> list:
+        return queries.get_issue_summary(table_name, since)
+
+    def save_performance(self, records: List[Dict]):
+        queries.save_performance_records(records)
+
+    def get_performance(self, stage: str = None, pipeline: str = None,
+                        since: datetime = None, limit: int = 10_000) -> list:
+        return queries.get_performance(stage, pipeline, since, limit)
+
+    def maintain(self) -> Dict[str, int]:
+        return queries.maintain_metrics_storage()
+
+
+# Same tables as init-db.sql (without partitioning); the file is attached
+# as "data_quality" so table names match the PostgreSQL ones.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_quality.metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(100) NOT NULL,
+    column_name VARCHAR(100),
+    metric_type VARCHAR(50) NOT NULL,
+    metric_value NUMERIC,
+    source VARCHAR(50),
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS data_quality.idx_metrics_table ON metrics(table_name, timestamp);
+CREATE INDEX IF NOT EXISTS data_quality.idx_metrics_timestamp ON metrics(timestamp, id);
+
+CREATE TABLE IF NOT EXISTS data_quality.issues (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(100) NOT NULL,
+    row_id VARCHAR(100),
+    issue_type VARCHAR(50) NOT NULL,
+    issue_description TEXT,
+    severity VARCHAR(20),
+    source VARCHAR(50),
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS data_quality.idx_issues_table ON issues(table_name, timestamp);
+CREATE INDEX IF NOT EXISTS data_quality.idx_issues_severity ON issues(severity);
+
+CREATE TABLE IF NOT EXISTS data_quality.metrics_latest (
+    table_name VARCHAR(100) NOT NULL,
+    column_name VARCHAR(100) NOT NULL DEFAULT '',
+    metric_type VARCHAR(50) NOT NULL,
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    metric_value NUMERIC,
+    metric_id BIGINT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (table_name, column_name, metric_type, source)
+);
+
+CREATE TABLE IF NOT EXISTS data_quality.metrics_daily (
+    day DATE NOT NULL,
+    table_name VARCHAR(100) NOT NULL,
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    metric_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, source)
+);
+
+CREATE TABLE IF NOT EXISTS data_quality.issues_daily (
+    day DATE NOT NULL,
+    table_name VARCHAR(100) NOT NULL,
+    issue_type VARCHAR(50) NOT NULL,
+    severity VARCHAR(20) NOT NULL DEFAULT '',
+    source VARCHAR(50) NOT NULL DEFAULT '',
+    issue_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, table_name, issue_type, severity, source)
+);
+
+CREATE TRIGGER IF NOT EXISTS data_quality.trg_metrics_rollup
+AFTER INSERT ON metrics
+BEGIN
+    INSERT INTO metrics_latest
+        (table_name, column_name, metric_type, source, metric_value, metric_id, timestamp)
+    VALUES (NEW.table_name, COALESCE(NEW.column_name, ''), NEW.metric_type, COALESCE(NEW.source, ''),
+            NEW.metric_value, NEW.id, NEW.timestamp)
+    ON CONFLICT (table_name, column_name, metric_type, source) DO UPDATE
+        SET metric_value = excluded.metric_value,
+            metric_id = excluded.metric_id,
+            timestamp = excluded.timestamp
+        WHERE (metrics_latest.timestamp, metrics_latest.metric_id) <= (excluded.timestamp, excluded.metric_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_quality.trg_metrics_daily_rollup
+AFTER INSERT ON metrics
+BEGIN
+    INSERT INTO metrics_daily (day, table_name, source, metric_count)
+    VALUES (DATE(NEW.timestamp), NEW.table_name, COALESCE(NEW.source, ''), 1)
+    ON CONFLICT (day, table_name, source) DO UPDATE
+        SET metric_count = metrics_daily.metric_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS data_quality.trg_issues_rollup
+AFTER INSERT ON issues
+BEGIN
+    INSERT INTO issues_daily (day, table_name, issue_type, severity, source, issue_count)
+    VALUES (DATE(NEW.timestamp), NEW.table_name, NEW.issue_type,
+            COALESCE(NEW.severity, ''), COALESCE(NEW.source, ''), 1)
+    ON CONFLICT (day, table_name, issue_type, severity, source) DO UPDATE
+        SET issue_count = issues_daily.issue_count + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS data_quality.performance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id VARCHAR(250),
+    pipeline VARCHAR(100),
+    stage VARCHAR(100) NOT NULL,
+    wall_seconds DOUBLE PRECISION,
+    cpu_seconds DOUBLE PRECISION,
+    peak_rss_mb DOUBLE PRECISION,
+    rows_in BIGINT,
+    rows_out BIGINT,
+    rows_per_second DOUBLE PRECISION,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS data_quality.idx_performance_stage ON performance(stage, timestamp);
+
+-- Highest ids already pushed to PostgreSQL by sync_to_postgres
+CREATE TABLE IF NOT EXISTS data_quality.sync_state (
+    table_name VARCHAR(100) PRIMARY KEY,
+    last_id BIGINT NOT NULL
+);
+"""
+
+
+def _timestamp(value: datetime | str | None) -> str:
+    """SQLite stores timestamps as ISO text, like CURRENT_TIMESTAMP"""
+    if value is None:
+        value = datetime.now()
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else str(value)
+
+
+def _float(value) -> float | None:
+    return None if value is None else float(value)
+
+
+class SQLiteMetricsStore(MetricsStore):
+    """Embedded file-based store with the PostgreSQL schema, for DB-less runs"""
+
+    def __init__(self, path: str | Path = None):
+        self.path = Path(path or METRICS_SQLITE_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def connection(self) -> sqlite3.Connection:
+        """Per-process connection, schema created on first use"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(':memory:', timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("ATTACH DATABASE ? AS data_quality", (str(self.path),))
+            conn.execute("PRAGMA data_quality.journal_mode=WAL")
+            conn.executescript(SQLITE_SCHEMA)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _executemany(self, query: str, params: List[tuple]):
+        with self._lock:
+            conn = self.connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(query, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, query: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self.connection().execute(query, params).fetchall()
+
+    def save_quality_metrics(self, records: List[Dict]):
+        if not records:
+            return
+        self._executemany("""
+            INSERT INTO data_quality.metrics
+            (table_name, column_name, metric_type, metric_value, source, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(
+            record['table_name'],
+            record.get('column_name'),
+            record['metric_type'],
+            _float(record.get('metric_value')),
+            record.get('source'),
+            _timestamp(record.get('timestamp'))
+        ) for record in records])
+
+    def save_quality_issues(self, records: List[Dict]):
+        if not records:
+            return
+        self._executemany("""
+            INSERT INTO data_quality.issues
+            (table_name, row_id, issue_type, issue_description, severity, source, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            record['table_name'],
+            record.get('row_id'),
+            record['issue_type'],
+            record.get('issue_description'),
+            record.get('severity', 'medium'),
+            record.get('source'),
+            _timestamp(record.get('timestamp'))
+        ) for record in records])
+
+    def get_latest_metrics(self, table_name: str = None, limit: int = 100) -> list:
+        query = """
+            SELECT metric_id AS id, table_name, NULLIF(column_name, '') AS column_name,
+                   metric_type, metric_value, NULLIF(source, '') AS source, timestamp
+            FROM data_quality.metrics_latest
+            WHERE (? IS NULL OR table_name = ?)
+            ORDER BY timestamp DESC
+            LIMIT ?
+        """
+        rows = self._query(query, (table_name, table_name, limit))
+        return [row[:-1] + (datetime.fromisoformat(row[-1]),) for row in rows]
+
+    def get_issue_summary(self, table_name: str = None, since: date = None) -> list:
+        query = """
+            SELECT table_name, issue_type, NULLIF(severity, '') AS severity,
+                   SUM(issue_count) AS count
+            FROM data_quality.issues_daily
+            WHERE (? IS NULL OR table_name = ?)
+              AND (? IS NULL OR day >= ?)
+            GROUP BY table_name, issue_type, severity
+            ORDER BY count DESC
+        """
+        since = since.isoformat() if since is not None else None
+        return self._query(query, (table_name, table_name, since, since))
+
+    def save_performance(self, records: List[Dict]):
+        if not records:
+            return
+        columns = queries.PERFORMANCE_COLUMNS
+        self._executemany(f"""
+            INSERT INTO data_quality.performance ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+        """, [tuple(
+            _timestamp(record.get(column)) if column == 'timestamp' else record.get(column)
+            for column in columns
+        ) for record in records])
+
+    def get_performance(self, stage: str = None, pipeline: str = None,
+                        since: datetime = None, limit: int = 10_000) -> list:
+        query = f"""
+            SELECT id, {', '.join(queries.PERFORMANCE_COLUMNS)}
+            FROM data_quality.performance
+            WHERE (? IS NULL OR stage = ?)
+              AND (? IS NULL OR pipeline = ?)
+              AND (? IS NULL OR timestamp >= ?)
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        """
+        since = _timestamp(since) if since is not None else None
+        rows = self._query(query, (stage, stage, pipeline, pipeline, since, since, limit))
+        return [row[:-1] + (datetime.fromisoformat(row[-1]),) for row in rows]
+
+    def maintain(self) -> Dict[str, int]:
+        """No partitions here: only expired performance records are deleted"""
+        cutoff = _timestamp(datetime.now() - timedelta(days=PERFORMANCE_RETENTION_DAYS))
+        with self._lock:
+            deleted = self.connection().execute(
+                "DELETE FROM data_quality.performance WHERE timestamp < ?", (cutoff,)).rowcount
+        return {'performance_deleted': deleted}
+
+
+def sync_to_postgres(source: SQLiteMetricsStore, target: MetricsStore = None,
+                     batch_size: int = 10_000) -> Dict[str, int]:
+    """
+    Push rows recorded locally to PostgreSQL in bulk.
+
+    Only rows above the last synced id are sent, so the sync can be rerun
+    after each local run. Timestamps are preserved.
+
+    Returns:
+        Number of metrics, issues and performance records pushed
+    """
+    target = target or PostgresMetricsStore()
+    columns = {
+        'metrics': ['table_name', 'column_name', 'metric_type', 'metric_value', 'source', 'timestamp'],
+        'issues': ['table_name', 'row_id', 'issue_type', 'issue_description', 'severity', 'source', 'timestamp'],
+        'performance': queries.PERFORMANCE_COLUMNS,
+    }
+    writers = {'metrics': target.save_quality_metrics, 'issues': target.save_quality_issues,
+               'performance': target.save_performance}
+
+    pushed = {}
+    for table_name, table_columns in columns.items():
+        state = source._query("SELECT last_id FROM data_quality.sync_state WHERE table_name = ?",
+                              (table_name,))
+        last_id = state[0][0] if state else 0
+        pushed[table_name] = 0
+
+        while True:
+            rows = source._query(
+                f"SELECT id, {', '.join(table_columns)} FROM data_quality.{table_name} "
+                f"WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            )
+            if not rows:
+                break
+            records = []
+            for row in rows:
+                record = dict(zip(table_columns, row[1:]))
+                record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+                records.append(record)
+            writers[table_name](records)
+
+            last_id = rows[-1][0]
+            pushed[table_name] += len(rows)
+            source._executemany(
+                "INSERT INTO data_quality.sync_state (table_name, last_id) VALUES (?, ?) "
+                "ON CONFLICT (table_name) DO UPDATE SET last_id = excluded.last_id",
+                [(table_name, last_id)]
+            )
+
+    logger.info(f"✅ Synced {pushed['metrics']} metrics, {pushed['issues']} issues and "
+                f"{pushed['performance']} performance records to PostgreSQL")
+    return pushed
+
+
+_stores: Dict[str, MetricsStore] = {}
+
+
+def get_metrics_store(backend: str = None) -> MetricsStore:
+    """
+    Get the metrics store for `backend` (default: METRICS_BACKEND).
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = (backend or METRICS_BACKEND).lower()
+    if backend not in _stores:
+        if backend == 'postgres':
+            _stores[backend] = PostgresMetricsStore()
+        elif backend == 'sqlite':
+            _stores[backend] = SQLiteMetricsStore()
+        else:
+            raise ValueError(f"Unknown metrics backend: {backend}. Available: ['postgres', 'sqlite']")
+    return _stores[backend]
@@ -1,6 +1,8 @@
 """Data extraction functions"""
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
+from typing import Iterator
 from src.config.schemas import TableSchema, validate_required_columns
 from src.config.settings import setup_logging
 
@@ -10,13 +12,14 @@ from src.config.schemas import POPULATION_SCHEMA, CONSOMMATION_SCHEMA, CSP_SCHEM
 logger = setup_logging(__name__)
 
 
-def read_csv_with_schema(filepath: str | Path, schema: TableSchema) -> pd.DataFrame:
+def read_csv_with_schema(filepath: str | Path, schema: TableSchema, engine: str = None) -> pd.DataFrame:
     """
     Generic CSV reader with schema validation.
     
     Args:
         filepath: Path to CSV file
         schema: TableSchema defining expected structure
+        engine: pandas CSV parser ('c', 'python' or 'pyarrow'), default 'c'
         
     Returns:
         DataFrame with validated schema
@@ -38,7 +41,15 @@ def read_csv_with_schema(filepath: str | Path, schema: TableSchema) -> pd.DataFr
         raise FileNotFoundError(f"CSV file not found: {filepath}")
     
     # Read with correct dtypes from schema
-    df = pd.read_csv(path, dtype=schema.dtypes)
+    if engine == 'pyarrow':
+        # pyarrow infers numbers before casting to 'string' ("5" -> "5.0"):
+        # declare string columns to the parser, then convert to schema dtypes
+        parse_dtypes = {column: pd.ArrowDtype(pa.string()) if dtype == 'string' else dtype
+                        for column, dtype in schema.dtypes.items()}
+        df = pd.read_csv(path, dtype=parse_dtypes, engine=engine)
+        df = df.astype({column: dtype for column, dtype in schema.dtypes.items() if column in df.columns})
+    else:
+        df = pd.read_csv(path, dtype=schema.dtypes, engine=engine)
     logger.debug(f"Read {len(df)} rows, {len(df.columns)} columns")
     
     # Validate required columns exist
@@ -52,6 +63,30 @@ def read_csv_with_schema(filepath: str | Path, schema: TableSchema) -> pd.DataFr
     return df
 
 
+def iter_csv_with_schema(filepath: str | Path, schema: TableSchema,
+                         chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Chunked variant of read_csv_with_schema.
+    
+    Yields DataFrames of at most `chunksize` rows with the schema dtypes.
+    Required columns are validated on the first chunk. The row index keeps
+    counting across chunks, so row positions stay global.
+    """
+    path = Path(filepath)
+    
+    logger.info(f"Streaming {schema.name} from {path} in chunks of {chunksize}")
+    
+    if not path.exists():
+        logger.error(f"File not found: {filepath}")
+        raise FileNotFoundError(f"CSV file not found: {filepath}")
+    
+    with pd.read_csv(path, dtype=schema.dtypes, chunksize=chunksize) as reader:
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                validate_required_columns(chunk.columns.tolist(), schema)
+            yield chunk
+
+
 def read_population_csv(filepath: str | Path) -> pd.DataFrame:
     """Read population CSV with predefined schema"""
     return read_csv_with_schema(filepath, POPULATION_SCHEMA)
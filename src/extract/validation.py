@@ -0,0 +1,138 @@
+"""Row-level validation of sources against their schema domains
+
+One vectorized pass per table at extract time. Each Domain rule of the
+TableSchema is evaluated on the distinct values of its column (pyarrow
+compute for patterns) and mapped back to the rows through the factorized
+codes. Failing rows are split off with one reason code per broken rule,
+e.g. 'CSP:not_in_domain;Adresse:missing', and written to a quarantine file,
+so only clean rows reach the transforms:
+
+    QUARANTINE_DIR/run=<run_id>/<source>.parquet
+
+Quarantined rows keep their source columns, plus `row_index` (0-based data
+row in the source file) and `reason`.
+"""
+from functools import reduce
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.config.schemas import Domain, TableSchema
+from src.config.settings import QUARANTINE_DIR, setup_logging
+
+logger = setup_logging(__name__)
+
+# Reason codes
+MISSING = 'missing'  # Null or blank in a non-nullable column
+NOT_IN_DOMAIN = 'not_in_domain'  # Not one of the declared values
+BAD_FORMAT = 'bad_format'  # Does not match the pattern / is not an integer
+OUT_OF_RANGE = 'out_of_range'  # Integer outside [min_value, max_value]
+
+ROW_COLUMN = 'row_index'
+REASON_COLUMN = 'reason'
+REASON_SEPARATOR = ';'
+
+
+def _value_failures(uniques: pd.Index, domain: Domain) -> Dict[str, np.ndarray]:
+    """Rule failures of each distinct (non-null) value"""
+    text = pa.array(np.asarray(uniques, dtype=object).astype(str))
+    failures = {}
+    if not domain.nullable:
+        failures[MISSING] = pc.equal(pc.utf8_trim_whitespace(text), '').to_numpy(zero_copy_only=False)
+    if domain.values is not None:
+        failures[NOT_IN_DOMAIN] = ~pc.is_in(text, value_set=pa.array(domain.values)).to_numpy(zero_copy_only=False)
+    if domain.pattern is not None:
+        failures[BAD_FORMAT] = ~pc.match_substring_regex(text, domain.pattern).to_numpy(zero_copy_only=False)
+    if domain.logical_type in ('small_int', 'nullable_int'):
+        numbers = pd.to_numeric(pd.Series(text.to_pylist(), dtype=object), errors='coerce')
+        not_integer = (numbers.isna() | (numbers % 1 != 0)).to_numpy()
+        failures[BAD_FORMAT] = failures.get(BAD_FORMAT, not_integer) | not_integer
+        out_of_range = np.zeros(len(uniques), dtype=bool)
+        if domain.min_value is not None:
+            out_of_range |= (numbers < domain.min_value).to_numpy()
+        if domain.max_value is not None:
+            out_of_range |= (numbers > domain.max_value).to_numpy()
+        failures[OUT_OF_RANGE] = out_of_range
+    return failures
+
+
+def column_failures(values: pd.Series, domain: Domain) -> Dict[str, np.ndarray]:
+    """Row masks of the rules of `domain` that `values` break, keyed by reason code"""
+    codes, uniques = pd.factorize(values)
+    known = codes >= 0
+    failures = {}
+    if len(uniques):
+        for reason, failed in _value_failures(uniques, domain).items():
+            failures[reason] = known & failed[np.where(known, codes, 0)]
+    if not domain.nullable:
+        failures[MISSING] = failures.get(MISSING, False) | ~known
+    return {reason: mask for reason, mask in failures.items() if mask.any()}
+
+
+def validate_rows(df: pd.DataFrame, schema: TableSchema) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split df into clean and quarantined rows by the schema domain rules.
+
+    Returns:
+        (clean rows with a fresh index, quarantined rows with `row_index`
+        and `reason` columns - empty if every row passes)
+    """
+    failures = {}
+    for column, domain in schema.domains.items():
+        if column in df.columns:
+            for reason, mask in column_failures(df[column], domain).items():
+                failures[f"{column}:{reason}"] = mask
+
+    if not failures:
+        return df, df.iloc[:0].assign(**{ROW_COLUMN: pd.Series(dtype='int64'), REASON_COLUMN: pd.Series(dtype=object)})
+
+    failed = reduce(np.logical_or, failures.values())
+    reasons = reduce(np.char.add, (np.where(mask[failed], f"{reason}{REASON_SEPARATOR}", '')
+                                   for reason, mask in failures.items()))
+    quarantined = df[failed].assign(**{ROW_COLUMN: df.index[failed].to_numpy(dtype='int64'),
+                                       REASON_COLUMN: np.char.rstrip(reasons, REASON_SEPARATOR).astype(object)})
+    logger.warning(f"Quarantined {int(failed.sum())} of {len(df)} {schema.name} rows")
+    return df[~failed].reset_index(drop=True), quarantined.reset_index(drop=True)
+
+
+def reason_counts(quarantined: pd.DataFrame) -> Dict[str, int]:
+    """Quarantined rows per reason code (a row can have several)"""
+    if quarantined.empty:
+        return {}
+    counts = quarantined[REASON_COLUMN].str.split(REASON_SEPARATOR).explode().value_counts()
+    return {reason: int(count) for reason, count in counts.items()}
+
+
+def write_quarantine(frames: Dict[str, pd.DataFrame], run_id: str,
+                     output_dir: str | Path = None) -> Dict[str, dict]:
+    """
+    Write the non-empty quarantined frames of a run.
+
+    Returns:
+        {source: {'path', 'rows', 'reasons'}} for every frame, with 'path'
+        None when nothing was quarantined
+    """
+    run_dir = Path(output_dir or QUARANTINE_DIR) / f"run={run_id}"
+    summary = {}
+    for name, df in frames.items():
+        path = None
+        if not df.empty:
+            run_dir.mkdir(parents=True, exist_ok=True)
+            path = run_dir / f"{name}.parquet"
+            df.to_parquet(path, index=False, compression='zstd')
+            logger.warning(f"⚠️  {len(df)} {name} rows quarantined in {path}: {reason_counts(df)}")
+        summary[name] = {'path': str(path) if path else None, 'rows': len(df), 'reasons': reason_counts(df)}
+    return summary
+
+
+def format_quarantine_report(summary: Dict[str, dict]) -> str:
+    """Quarantined rows per source and reason"""
+    lines = [f"{'Quarantined':<24} {'Rows':>10}  Reasons", '-' * 60]
+    for name, entry in summary.items():
+        reasons = ', '.join(f"{reason}={count}" for reason, count in entry['reasons'].items())
+        lines.append(f"{name:<24} {entry['rows']:>10,}  {reasons}")
+    return '\n'.join(lines)
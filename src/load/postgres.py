@@ -0,0 +1,184 @@
+"""COPY-based loading of target tables into PostgreSQL
+
+Each target DataFrame is streamed as CSV through `COPY ... FROM STDIN` into
+a temporary staging table, then moved into the real table inside the same
+transaction:
+
+- `replace`: DELETE + INSERT ... SELECT (readers keep seeing the previous
+  contents until commit, never a half-loaded table)
+- `upsert`: INSERT ... ON CONFLICT (primary key) DO UPDATE
+
+Columns and primary keys come from the target TableSchema; PostgreSQL
+column names are the lower-cased schema column names.
+"""
+import io
+from typing import Iterator, List
+
+import pandas as pd
+
+from src.config.schemas import TableSchema, CONSOMMATION_CSP_SCHEMA, CONSOMMATION_IRIS_SCHEMA
+from src.config.settings import setup_logging
+from src.db.connection import get_engine
+
+logger = setup_logging(__name__)
+
+DEFAULT_CHUNK_ROWS = 100_000
+COPY_BUFFER_SIZE = 1 << 20  # Bytes handed to COPY per read
+
+# Target key -> (PostgreSQL table, schema), see init-db.sql
+TARGET_TABLES = {
+    'csp': ('targets.consommation_csp', CONSOMMATION_CSP_SCHEMA),
+    'iris_paris': ('targets.consommation_iris_paris', CONSOMMATION_IRIS_SCHEMA),
+    'iris_evry': ('targets.consommation_iris_evry', CONSOMMATION_IRIS_SCHEMA),
+}
+
+
+class _CsvStream(io.TextIOBase):
+    """Read-only file object serializing a DataFrame to CSV one chunk at a time"""
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self._chunks = self._serialize(df, chunk_rows)
+        self._current = io.StringIO()
+
+    @staticmethod
+    def _serialize(df: pd.DataFrame, chunk_rows: int) -> Iterator[str]:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            data = self._current.read(remaining if size >= 0 else -1)
+            if data:
+                parts.append(data)
+                remaining -= len(data)
+                continue
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._current = io.StringIO(chunk)
+        return ''.join(parts)
+
+    def readline(self, size: int = -1) -> str:
+        line = self._current.readline(size)
+        while not line.endswith('\n'):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._current = io.StringIO(chunk)
+            line += self._current.readline()
+        return line
+
+
+def _schema_columns(schema: TableSchema) -> List[str]:
+    return [column.lower() for column in schema.columns]
+
+
+def _primary_key(schema: TableSchema) -> List[str]:
+    keys = schema.primary_key if isinstance(schema.primary_key, list) else [schema.primary_key]
+    return [key.lower() for key in keys]
+
+
+def align_to_schema(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """
+    Select the schema columns of df (case-insensitive), in schema order.
+
+    Extra columns (e.g. Source in the IRIS targets) are dropped.
+
+    Raises:
+        ValueError: If a schema column is missing
+    """
+    by_lower = {column.lower(): column for column in df.columns}
+    missing = [column for column in schema.columns if column.lower() not in by_lower]
+    if missing:
+        raise ValueError(f"Missing columns for {schema.name}: {missing}")
+    return df[[by_lower[column.lower()] for column in schema.columns]]
+
+
+def load_dataframe(df: pd.DataFrame, table: str, schema: TableSchema,
+                   mode: str = 'replace', chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """
+    Bulk load a DataFrame into a PostgreSQL table with COPY.
+
+    Args:
+        df: Data to load
+        table: Qualified table name, e.g. 'targets.consommation_csp'
+        schema: TableSchema giving the columns and primary key
+        mode: 'replace' (swap the whole contents) or 'upsert' (merge on primary key)
+        chunk_rows: Rows serialized per CSV chunk fed to COPY
+
+    Returns:
+        Number of rows loaded
+    """
+    if mode not in ('replace', 'upsert'):
+        raise ValueError(f"Unknown load mode: {mode}. Use 'replace' or 'upsert'")
+
+    data = align_to_schema(df, schema)
+    columns = _schema_columns(schema)
+    column_list = ', '.join(columns)
+    staging = f"staging_{table.replace('.', '_')}"
+
+    logger.info(f"Loading {len(data)} rows into {table} ({mode})")
+
+    conn = get_engine().raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            cursor.copy_expert(
+                f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                _CsvStream(data, chunk_rows),
+                size=COPY_BUFFER_SIZE
+            )
+
+            if mode == 'replace':
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(
+                    f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging}"
+                )
+            else:
+                keys = _primary_key(schema)
+                updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column not in keys)
+                conflict_action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+                cursor.execute(
+                    f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+                    f"ON CONFLICT ({', '.join(keys)}) {conflict_action}"
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        logger.error(f"Load into {table} failed, transaction rolled back")
+        raise
+    finally:
+        conn.close()
+
+    logger.info(f"✅ Loaded {len(data)} rows into {table}")
+    return len(data)
+
+
+def load_target(df: pd.DataFrame, target: str, mode: str = 'replace') -> int:
+    """Load a target DataFrame by its key in TARGET_TABLES"""
+    if target not in TARGET_TABLES:
+        raise ValueError(f"Unknown target: {target}. Available: {list(TARGET_TABLES.keys())}")
+    table, schema = TARGET_TABLES[target]
+    return load_dataframe(df, table, schema, mode)
+
+
+def load_consommation_csp(df: pd.DataFrame, mode: str = 'replace') -> int:
+    """Load consommation by CSP into PostgreSQL"""
+    return load_target(df, 'csp', mode)
+
+
+def load_consommation_iris_paris(df: pd.DataFrame, mode: str = 'replace') -> int:
+    """Load consommation by IRIS (Paris) into PostgreSQL"""
+    return load_target(df, 'iris_paris', mode)
+
+
+def load_consommation_iris_evry(df: pd.DataFrame, mode: str = 'replace') -> int:
+    """Load consommation by IRIS (Evry) into PostgreSQL"""
+    return load_target(df, 'iris_evry', mode)
@@ -0,0 +1,235 @@
+"""Atomic, parallel publishing of target files
+
+Targets are written concurrently to a run-scoped staging directory, then
+published into OUTPUT_DIR with atomic renames, so readers only ever see a
+complete previous or complete new file:
+
+    OUTPUT_DIR/.staging/run=<run_id>/<target files>    (written in parallel)
+    OUTPUT_DIR/<target files>                          (os.replace)
+    OUTPUT_DIR/_manifest.json                          (checksums, row counts)
+
+Each target's content hash (data, dtypes, format, compression, partitioning)
+is stored in the manifest. When it matches the published one, the target
+is neither written nor renamed. Renames and manifest updates happen under
+an exclusive file lock, so concurrent DAG runs cannot interleave; the
+manifest is checked again under the lock, and a target skipped before it
+is written there if another run changed or removed it in between.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from src.config.schemas import TableSchema, CONSOMMATION_CSP_SCHEMA, CONSOMMATION_IRIS_SCHEMA
+from src.config.settings import (
+    OUTPUT_DIR,
+    TARGET_FILES,
+    TARGET_FORMAT,
+    TARGET_COMPRESSION,
+    setup_logging
+)
+from src.load.targets import apply_schema_dtypes, save_target
+from src.quality.violations import new_run_id
+
+logger = setup_logging(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+LOCK_FILE = ".publish.lock"
+STAGING_DIR = ".staging"
+
+
+@dataclass(eq=False)
+class PublishTarget:
+    """One target file to publish"""
+    name: str  # File name without extension, e.g. TARGET_FILES['csp']
+    df: pd.DataFrame
+    schema: TableSchema | None = None
+    partition_by: str | None = None
+
+
+def content_hash(target: PublishTarget, fmt: str, compression: str) -> str:
+    """Hash of a target's data and of everything that changes its file bytes"""
+    df = apply_schema_dtypes(target.df, target.schema) if target.schema is not None else target.df
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'columns': list(df.columns),
+        'dtypes': [str(dtype) for dtype in df.dtypes],
+        'format': fmt,
+        'compression': compression,
+        'partition_by': target.partition_by,
+        'schema': target.schema.name if target.schema is not None else None,
+    }).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_checksum(path: Path) -> str:
+    """sha256 of a file, or of a directory's files (sorted by relative path)"""
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        if path.is_dir():
+            digest.update(str(file.relative_to(path)).encode())
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(output_dir: str | Path = None) -> Dict[str, dict]:
+    """Published targets keyed by name (empty if nothing was published yet)"""
+    path = Path(output_dir or OUTPUT_DIR) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(output_dir: Path, manifest: Dict[str, dict]):
+    tmp_path = output_dir / f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_dir / MANIFEST_FILE)
+
+
+@contextmanager
+def publish_lock(output_dir: str | Path = None):
+    """Exclusive lock on the output directory (blocks until acquired)"""
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / LOCK_FILE, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _replace(staged: Path, final: Path):
+    """Atomically move a staged file (or partitioned directory) into place"""
+    if staged.is_dir():
+        # Directories cannot be swapped in one rename: move the old one
+        # aside, rename the new one in, then delete the old one
+        old = final.with_name(f".{final.name}.old-{os.getpid()}")
+        if final.exists():
+            os.replace(final, old)
+        os.replace(staged, final)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(staged, final)
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    elif path.exists():
+        path.unlink()
+
+
+def _is_published(entry: dict | None, digest: str, output_dir: Path) -> bool:
+    return (entry is not None and entry['content_hash'] == digest
+            and (output_dir / entry['path']).exists())
+
+
+def publish_targets(targets: List[PublishTarget], run_id: str = None, output_dir: str | Path = None,
+                    fmt: str = TARGET_FORMAT, compression: str = TARGET_COMPRESSION,
+                    max_workers: int = None) -> Dict[str, dict]:
+    """
+    Write targets in parallel and publish them atomically.
+
+    Args:
+        targets: Targets to publish
+        run_id: Staging directory name (defaults to a new run id)
+        output_dir: Defaults to OUTPUT_DIR
+        fmt, compression: See save_target
+        max_workers: Writer threads (defaults to one per target)
+
+    Returns:
+        Manifest entries of the given targets, with 'skipped' set for
+        targets whose content was already published
+    """
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    run_id = run_id or new_run_id()
+    staging_dir = output_dir / STAGING_DIR / f"run={run_id}"
+
+    hashes = {target.name: content_hash(target, fmt, compression) for target in targets}
+    manifest = read_manifest(output_dir)
+    pending = []
+    for target in targets:
+        if _is_published(manifest.get(target.name), hashes[target.name], output_dir):
+            logger.info(f"Skipping {target.name}: content unchanged")
+        else:
+            pending.append(target)
+
+    def write(target: PublishTarget) -> Path:
+        return save_target(target.df, target.name, target.schema, fmt=fmt,
+                           partition_by=target.partition_by, compression=compression,
+                           output_dir=staging_dir)
+
+    staged = {}
+    try:
+        if pending:
+            with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+                staged = dict(zip([target.name for target in pending], executor.map(write, pending)))
+
+        with publish_lock(output_dir):
+            manifest = read_manifest(output_dir)
+            results = {}
+            for target in targets:
+                digest = hashes[target.name]
+                if _is_published(manifest.get(target.name), digest, output_dir):
+                    results[target.name] = {**manifest[target.name], 'skipped': True}
+                    continue
+                if target.name not in staged:
+                    # Published when checked before the lock, replaced or removed since
+                    staged[target.name] = write(target)
+
+                final = output_dir / staged[target.name].name
+                checksum = file_checksum(staged[target.name])
+                _replace(staged[target.name], final)
+
+                # A format change leaves the previous file behind under another extension
+                previous = manifest.get(target.name)
+                if previous is not None and previous['path'] != final.name:
+                    _remove(output_dir / previous['path'])
+
+                manifest[target.name] = {
+                    'path': final.name,
+                    'format': fmt,
+                    'compression': compression if fmt != 'csv' else None,
+                    'partition_by': target.partition_by,
+                    'rows': len(target.df),
+                    'content_hash': digest,
+                    'checksum': checksum,
+                    'run_id': run_id,
+                    'published_at': datetime.now().isoformat(timespec='seconds'),
+                }
+                results[target.name] = {**manifest[target.name], 'skipped': False}
+            _write_manifest(output_dir, manifest)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    published = [name for name, entry in results.items() if not entry['skipped']]
+    logger.info(f"✅ Published {len(published)} target(s), {len(results) - len(published)} unchanged")
+    return results
+
+
+def publish_consommation_targets(csp: pd.DataFrame, iris_paris: pd.DataFrame,
+                                 iris_evry: pd.DataFrame, run_id: str = None) -> Dict[str, dict]:
+    """Publish the three target tables together"""
+    return publish_targets([
+        PublishTarget(TARGET_FILES['csp'], csp, CONSOMMATION_CSP_SCHEMA),
+        PublishTarget(TARGET_FILES['iris_paris'], iris_paris, CONSOMMATION_IRIS_SCHEMA),
+        PublishTarget(TARGET_FILES['iris_evry'], iris_evry, CONSOMMATION_IRIS_SCHEMA),
+    ], run_id=run_id)
@@ -1,36 +1,204 @@
+import json
+import shutil
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
-from src.config.settings import OUTPUT_DIR, setup_logging, TARGET_FILES
+from src.config.schemas import TableSchema, CONSOMMATION_CSP_SCHEMA, CONSOMMATION_IRIS_SCHEMA
+from src.config.settings import (
+    OUTPUT_DIR,
+    setup_logging,
+    TARGET_FILES,
+    TARGET_FORMAT,
+    TARGET_COMPRESSION
+)
 
 logger = setup_logging(__name__)
 
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
 
-def save_to_csv(df: pd.DataFrame, filename: str) -> Path:
+# Key of the TableSchema stored in the Arrow/Parquet schema metadata
+SCHEMA_METADATA_KEY = b'table_schema'
+
+
+def apply_schema_dtypes(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """
+    Cast columns to the schema dtypes (column names matched case-insensitively).
+
+    Columns outside the schema (e.g. Source) keep their dtype, except
+    categorical ones (compact in-memory encodings) which are decoded, so
+    target files do not depend on them.
+    """
+    dtypes = {column.lower(): dtype for column, dtype in schema.dtypes.items()}
+    casts = {column: dtypes[column.lower()] if column.lower() in dtypes else df[column].cat.categories.dtype
+             for column in df.columns
+             if column.lower() in dtypes or isinstance(df[column].dtype, pd.CategoricalDtype)}
+    return df.astype(casts)
+
+
+def to_arrow_table(df: pd.DataFrame, schema: TableSchema = None) -> pa.Table:
+    """Convert to an Arrow table, with the TableSchema stored as schema metadata"""
+    if schema is not None:
+        df = apply_schema_dtypes(df, schema)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        return table
+
+    table_schema = {
+        'name': schema.name,
+        'columns': schema.columns,
+        'dtypes': schema.dtypes,
+        'required_columns': schema.required_columns,
+        'primary_key': schema.primary_key,
+    }
+    metadata = dict(table.schema.metadata or {})
+    metadata[SCHEMA_METADATA_KEY] = json.dumps(table_schema).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _clear(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def save_target(df: pd.DataFrame, name: str, schema: TableSchema = None,
+                fmt: str = TARGET_FORMAT, partition_by: str = None,
+                compression: str = TARGET_COMPRESSION, output_dir: Path = None) -> Path:
     """
-    Save DataFrame to CSV in output directory.
-    
+    Save a target table in the configured format.
+
     Args:
-        df (pd.DataFrame): The DataFrame to save.
-        filename (str): The name of the output CSV file.
+        df: Target table
+        name: File name without extension (see TARGET_FILES)
+        schema: Target TableSchema; sets dtypes and is stored as metadata
+        fmt: 'parquet', 'arrow' (Arrow IPC) or 'csv'
+        partition_by: Column to partition on (e.g. 'Source'); the target
+            becomes a Hive-style directory of files, one per value
+        compression: Parquet/Arrow codec ('zstd', 'lz4', ... or None)
+        output_dir: Defaults to OUTPUT_DIR
+
+    Returns:
+        Path of the written file (or partitioned directory)
     """
-    output_path = OUTPUT_DIR / filename
-    df.to_csv(output_path, index=False)
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown target format: {fmt}. Available: {list(FORMAT_EXTENSIONS.keys())}")
+
+    output_dir = Path(output_dir or OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if fmt == 'csv':
+        if partition_by is not None:
+            raise ValueError("Partitioning is only supported for parquet and arrow targets")
+        output_path = output_dir / f"{name}.csv"
+        df.to_csv(output_path, index=False)
+        return output_path
+
+    table = to_arrow_table(df, schema)
+
+    if partition_by is not None:
+        output_path = output_dir / name
+        _clear(output_path)
+        if fmt == 'parquet':
+            file_format = ds.ParquetFileFormat()
+            file_options = file_format.make_write_options(compression=compression)
+        else:
+            file_format = ds.IpcFileFormat()
+            file_options = file_format.make_write_options(
+                compression=compression if compression in ('zstd', 'lz4') else None
+            )
+        ds.write_dataset(
+            table, output_path, format=file_format, file_options=file_options,
+            partitioning=[partition_by], partitioning_flavor='hive',
+            basename_template=f"part-{{i}}{FORMAT_EXTENSIONS[fmt]}"
+        )
+        return output_path
+
+    output_path = output_dir / f"{name}{FORMAT_EXTENSIONS[fmt]}"
+    _clear(output_path)
+    if fmt == 'parquet':
+        pq.write_table(table, output_path, compression=compression)
+    else:
+        options = pa.ipc.IpcWriteOptions(
+            compression=compression if compression in ('zstd', 'lz4') else None
+        )
+        with pa.OSFile(str(output_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
     return output_path
 
 
+def read_target(path: str | Path, schema: TableSchema = None, columns: list = None,
+                filters: list = None) -> pd.DataFrame:
+    """
+    Read a target written by save_target.
+
+    Parquet and Arrow targets keep their dtypes (no parsing); uncompressed
+    Arrow files are memory-mapped. Partitioned directories expose the
+    partition column and accept `filters`, e.g. [('Source', '=', 'Paris')].
+    CSV targets are cast to the `schema` dtypes when given.
+    """
+    path = Path(path)
+
+    if path.is_dir():
+        file_format = 'ipc' if any(path.rglob('*.arrow')) else 'parquet'
+        dataset = ds.dataset(path, format=file_format, partitioning='hive')
+        expression = pq.filters_to_expression(filters) if filters else None
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns, filters=filters)
+
+    if path.suffix == '.arrow':
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+    df = pd.read_csv(path, usecols=columns)
+    return apply_schema_dtypes(df, schema) if schema is not None else df
+
+
+def read_target_schema(path: str | Path) -> dict | None:
+    """TableSchema metadata stored in a Parquet/Arrow target, if any"""
+    path = Path(path)
+    if path.is_dir():
+        file_format = 'ipc' if any(path.rglob('*.arrow')) else 'parquet'
+        arrow_schema = ds.dataset(path, format=file_format, partitioning='hive').schema
+    elif path.suffix == '.parquet':
+        arrow_schema = pq.read_schema(path)
+    elif path.suffix == '.arrow':
+        with pa.memory_map(str(path)) as source:
+            arrow_schema = pa.ipc.open_file(source).schema
+    else:
+        return None
+
+    metadata = arrow_schema.metadata or {}
+    if SCHEMA_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[SCHEMA_METADATA_KEY])
+
+
 def save_consommation_csp(df: pd.DataFrame) -> Path:
-    """Save consommation by CSP to CSV"""
+    """Save consommation by CSP"""
     logger.info("Saving consommation by CSP")
-    return save_to_csv(df, TARGET_FILES['csp'])
+    return save_target(df, TARGET_FILES['csp'], CONSOMMATION_CSP_SCHEMA)
 
 
 def save_consommation_iris_paris(df: pd.DataFrame) -> Path:
-    """Save consommation by IRIS (Paris) to CSV"""
+    """Save consommation by IRIS (Paris)"""
     logger.info("Saving consommation by IRIS (Paris)")
-    return save_to_csv(df, TARGET_FILES['iris_paris'])
+    return save_target(df, TARGET_FILES['iris_paris'], CONSOMMATION_IRIS_SCHEMA)
 
 
 def save_consommation_iris_evry(df: pd.DataFrame) -> Path:
-    """Save consommation by IRIS (Evry) to CSV"""
+    """Save consommation by IRIS (Evry)"""
     logger.info("Saving consommation by IRIS (Evry)")
-    return save_to_csv(df, TARGET_FILES['iris_evry'])
\ No newline at end of file
+    return save_target(df, TARGET_FILES['iris_evry'], CONSOMMATION_IRIS_SCHEMA)
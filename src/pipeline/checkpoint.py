@@ -0,0 +1,304 @@
+"""Stage checkpoints: memoized, resumable stage outputs
+
+Each stage output is stored as Parquet files under a key that hashes the
+stage name, its inputs, its parameters and the source code of the modules
+it runs, including the `src.*` modules they import (transitively):
+
+    CHECKPOINT_DIR/<stage>/<key>/<output>.parquet
+    CHECKPOINT_DIR/<stage>/<key>/_meta.json
+
+A stage whose key already exists is skipped and its outputs are read back
+instead, so unchanged inputs are not recomputed and a failed run resumes
+from the last stage that completed. The cache is bounded in bytes; the
+least recently used entries are evicted first.
+"""
+import ast
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import pandas as pd
+
+from src.config.settings import (
+    CHECKPOINTS_ENABLED,
+    CHECKPOINT_DIR,
+    CHECKPOINT_MAX_MB,
+    setup_logging
+)
+
+logger = setup_logging(__name__)
+
+META_FILE = "_meta.json"
+SINGLE_OUTPUT = "output"  # Output name used when a stage returns one DataFrame
+
+_last_call = threading.local()
+
+
+def _update(digest, value):
+    """Feed a stage input or parameter into a hash"""
+    if isinstance(value, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, value.columns)), [str(d) for d in value.dtypes]]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, Path):
+        # Source files are identified by path, size and modification time
+        stat = value.stat() if value.exists() else None
+        digest.update(repr((str(value), stat and stat.st_size, stat and stat.st_mtime_ns)).encode())
+    elif isinstance(value, dict):
+        for name in sorted(value):
+            digest.update(repr(name).encode())
+            _update(digest, value[name])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update(digest, item)
+    elif hasattr(value, '__dataclass_fields__'):
+        _update(digest, {name: getattr(value, name) for name in value.__dataclass_fields__})
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b'\x00')
+
+
+def fingerprint(value) -> str:
+    """Content hash of DataFrames, paths, dataclasses, containers and scalars"""
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+PROJECT_PACKAGE = 'src'  # code_version follows imports of this package only
+
+
+def _module_file(name: str) -> str | None:
+    """Source file of a module name, None if it is not a module (e.g. an imported function)"""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, AttributeError, ValueError):
+        return None
+    return spec.origin if spec and spec.origin and spec.origin.endswith('.py') else None
+
+
+@functools.lru_cache(maxsize=None)
+def _imported_files(file: str, mtime_ns: int) -> frozenset:
+    """Project source files imported by a file (any import statement, top level or not)"""
+    modules = set()
+    for node in ast.walk(ast.parse(Path(file).read_bytes(), filename=file)):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            # `from src.transform import compact` imports the package and the submodule
+            modules.add(node.module)
+            modules.update(f"{node.module}.{alias.name}" for alias in node.names)
+    files = (_module_file(name) for name in modules
+             if name == PROJECT_PACKAGE or name.startswith(f"{PROJECT_PACKAGE}."))
+    return frozenset(path for path in files if path)
+
+
+def _dependency_files(files: Iterable[str]) -> set:
+    """`files` and every project file they import, transitively"""
+    seen = set()
+    pending = list(files)
+    while pending:
+        file = pending.pop()
+        if file in seen:
+            continue
+        seen.add(file)
+        pending.extend(_imported_files(file, Path(file).stat().st_mtime_ns))
+    return seen
+
+
+def code_version(code: Iterable, follow_imports: Iterable = ()) -> str:
+    """
+    Hash of the source files defining the given functions or modules.
+
+    The files of `follow_imports` are hashed together with every `src.*`
+    module they import, directly or not.
+    """
+    digest = hashlib.sha256()
+    files = {inspect.getsourcefile(obj) for obj in code}
+    files |= _dependency_files({inspect.getsourcefile(obj) for obj in follow_imports})
+    for file in sorted(files):
+        digest.update(Path(file).read_bytes())
+    return digest.hexdigest()
+
+
+def _empty_categories(df: pd.DataFrame) -> Dict[str, list]:
+    """Categories of an empty frame's categorical columns, which Parquet only keeps for rows"""
+    return {column: df[column].cat.categories.tolist() for column in df.columns
+            if isinstance(df[column].dtype, pd.CategoricalDtype)}
+
+
+class CheckpointStore:
+    """
+    Stage outputs on disk, keyed by stage inputs, parameters and code.
+
+    Example:
+        >>> store = CheckpointStore()
+        >>> key = store.key('union', inputs, code=[union_population_sources])
+        >>> outputs = store.load('union', key)
+        >>> if outputs is None:
+        ...     outputs = store.save('union', key, compute(inputs))
+    """
+
+    def __init__(self, root: str | Path = None, max_bytes: int = None):
+        self.root = Path(root or CHECKPOINT_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else CHECKPOINT_MAX_MB * 1024 * 1024
+
+    def key(self, stage: str, inputs=None, params=None, code: Iterable = (), follow_imports: Iterable = ()) -> str:
+        return fingerprint({
+            'stage': stage,
+            'inputs': inputs,
+            'params': params,
+            'code': code_version(code, follow_imports),
+        })
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.root / stage / key
+
+    def exists(self, stage: str, key: str) -> bool:
+        return (self.path(stage, key) / META_FILE).exists()
+
+    def load(self, stage: str, key: str) -> Dict[str, pd.DataFrame] | pd.DataFrame | None:
+        """Stored outputs, or None on a miss. A hit marks the entry as recently used"""
+        entry = self.path(stage, key)
+        meta_path = entry / META_FILE
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(meta_path)
+            outputs = {name: pd.read_parquet(entry / f"{name}.parquet") for name in meta['outputs']}
+        except OSError:
+            return None  # Missing, or evicted concurrently by another process
+        for name, categories in meta.get('categories', {}).items():
+            outputs[name] = outputs[name].astype(
+                {column: pd.CategoricalDtype(values) for column, values in categories.items()})
+        return outputs[SINGLE_OUTPUT] if meta['single'] else outputs
+
+    def save(self, stage: str, key: str, outputs: Dict[str, pd.DataFrame] | pd.DataFrame):
+        """Store stage outputs (written to a temp directory, then renamed into place)"""
+        single = isinstance(outputs, pd.DataFrame)
+        frames = {SINGLE_OUTPUT: outputs} if single else outputs
+
+        entry = self.path(stage, key)
+        tmp = entry.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name, df in frames.items():
+            df.to_parquet(tmp / f"{name}.parquet", index=False)
+        with open(tmp / META_FILE, 'w') as f:
+            json.dump({
+                'stage': stage,
+                'outputs': list(frames),
+                'single': single,
+                'rows': {name: len(df) for name, df in frames.items()},
+                'categories': {name: _empty_categories(df) for name, df in frames.items() if len(df) == 0},
+                'created_at': time.time(),
+            }, f)
+
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Another run stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict()
+        return outputs
+
+    def entries(self) -> List[dict]:
+        """All entries with their size and last use time"""
+        entries = []
+        for meta_path in self.root.glob(f"*/*/{META_FILE}"):
+            entry = meta_path.parent
+            try:
+                entries.append({
+                    'stage': entry.parent.name,
+                    'key': entry.name,
+                    'path': entry,
+                    'bytes': sum(p.stat().st_size for p in entry.iterdir()),
+                    'last_used': meta_path.stat().st_mtime,
+                })
+            except FileNotFoundError:
+                continue  # Evicted concurrently
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = sorted(self.entries(), key=lambda entry: entry['last_used'])
+        total = sum(entry['bytes'] for entry in entries)
+        evicted = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            total -= entry['bytes']
+            evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} checkpoint(s), cache size {total / 1024 / 1024:.1f} MB")
+        return evicted
+
+    def clear(self, stage: str = None):
+        shutil.rmtree(self.root / stage if stage else self.root, ignore_errors=True)
+
+
+_store: CheckpointStore | None = None
+
+
+def get_checkpoint_store() -> CheckpointStore | None:
+    """Process-wide checkpoint store, or None when CHECKPOINTS_ENABLED is false"""
+    global _store
+    if not CHECKPOINTS_ENABLED:
+        return None
+    if _store is None:
+        _store = CheckpointStore()
+    return _store
+
+
+def last_call_cached() -> bool:
+    """Whether the last checkpointed stage called in this thread was a checkpoint hit"""
+    return getattr(_last_call, 'hit', False)
+
+
+def checkpointed(stage: str, code: Iterable = ()):
+    """
+    Memoize a stage function returning a DataFrame or a dict of DataFrames.
+
+    The key hashes every argument of the call (DataFrames by content, paths
+    by size and mtime), the source of the stage module, and the source of
+    the `code` modules plus every `src.*` module they import.
+    Pass `store=` to use a specific CheckpointStore; with checkpoints
+    disabled the function simply runs.
+    """
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, store: CheckpointStore = None, **kwargs):
+            store = store or get_checkpoint_store()
+            _last_call.hit = False
+            if store is None:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = store.key(stage, inputs=dict(bound.arguments), code=[func], follow_imports=code)
+
+            outputs = store.load(stage, key)
+            if outputs is not None:
+                _last_call.hit = True
+                logger.info(f"✅ Stage {stage}: checkpoint hit, skipped ({key[:12]})")
+                return outputs
+
+            outputs = func(*args, **kwargs)
+            store.save(stage, key, outputs)
+            logger.info(f"✅ Stage {stage}: checkpoint saved ({key[:12]})")
+            return outputs
+
+        wrapper.stage = stage
+        return wrapper
+    return decorator
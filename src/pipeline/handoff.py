@@ -0,0 +1,103 @@
+"""DataFrame handoff between DAG tasks through local Arrow files
+
+Instead of pushing `to_dict('records')` lists through XCom, a task writes
+each DataFrame once to an uncompressed Arrow IPC file and returns a small
+reference (path, row count, column dtypes). The next task memory-maps the
+file: numeric columns are read without copying, and nothing larger than
+the reference goes through the Airflow metadata database.
+
+    HANDOFF_DIR/<run_id>/<name>-<uuid>.arrow
+
+Files live on the shared data volume, so any worker can read them. They
+are removed by `cleanup` once the run succeeded; older runs are purged
+with `cleanup_older_than`.
+"""
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+import pyarrow as pa
+
+from src.config.settings import HANDOFF_DIR, setup_logging
+
+logger = setup_logging(__name__)
+
+# Reference keys
+PATH = 'path'
+ROWS = 'rows'
+SCHEMA = 'schema'
+
+
+def _run_dir(run_id: str) -> Path:
+    # Airflow run ids contain ':' and '+' (e.g. manual__2025-01-01T00:00:00+00:00)
+    return Path(HANDOFF_DIR) / re.sub(r'[^A-Za-z0-9_.-]', '_', run_id)
+
+
+def put(df: pd.DataFrame, name: str, run_id: str) -> dict:
+    """
+    Write a DataFrame for the next task and return its reference.
+
+    Returns:
+        JSON-serializable dict: {'path', 'rows', 'schema'} (column -> dtype)
+    """
+    run_dir = _run_dir(run_id)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    path = run_dir / f"{name}-{uuid.uuid4().hex[:8]}.arrow"
+    tmp_path = path.with_suffix('.tmp')
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    return {
+        PATH: str(path),
+        ROWS: len(df),
+        SCHEMA: {str(column): str(dtype) for column, dtype in df.dtypes.items()},
+    }
+
+
+def get(ref: dict, columns: list = None) -> pd.DataFrame:
+    """Read a DataFrame from its reference (memory-mapped)"""
+    with pa.memory_map(ref[PATH]) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+def put_frames(frames: Dict[str, pd.DataFrame], run_id: str, prefix: str = '') -> Dict[str, dict]:
+    """put() every DataFrame of a dict, keeping its keys"""
+    return {name: put(df, f"{prefix}{name}", run_id) for name, df in frames.items()}
+
+
+def get_frames(refs: Dict[str, dict]) -> Dict[str, pd.DataFrame]:
+    """get() every reference of a dict, keeping its keys"""
+    return {name: get(ref) for name, ref in refs.items()}
+
+
+def cleanup(run_id: str):
+    """Remove a run's handoff files"""
+    shutil.rmtree(_run_dir(run_id), ignore_errors=True)
+
+
+def cleanup_older_than(days: float) -> int:
+    """Remove handoff directories of runs older than `days` (e.g. failed runs)"""
+    root = Path(HANDOFF_DIR)
+    if not root.exists():
+        return 0
+    cutoff = time.time() - days * 86400
+    removed = 0
+    for run_dir in root.iterdir():
+        if run_dir.is_dir() and run_dir.stat().st_mtime < cutoff:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info(f"Removed handoff files of {removed} old run(s)")
+    return removed
@@ -0,0 +1,214 @@
+"""Memory profiling of pipeline stages and functions
+
+Peak and retained memory per stage (and per transform function), from two
+sources:
+
+- tracemalloc: allocations made through Python's allocator, which includes
+  NumPy/pandas buffers. Peak during the call, what is still allocated after
+  it, and the top allocation sites of that retained memory
+- RSS sampling (`src.pipeline.stats.RssSampler`): what the OS sees,
+  including Arrow and other native allocations tracemalloc does not trace
+
+    with MemoryProfiler() as profiler, profile_functions(profiler, [normalize, unions]):
+        with profiler.measure('union'):
+            unioned = union(...)
+        profiler.add_frames('union', unioned)   # deep memory of the intermediates
+
+Tracing slows allocations down noticeably; only use it to diagnose memory.
+"""
+import functools
+import inspect
+import sysconfig
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List
+
+from src.config.settings import PROJECT_ROOT, setup_logging
+from src.pipeline.stats import RssSampler, current_rss_mb
+
+logger = setup_logging(__name__)
+
+MB = 1024 * 1024
+TOP_ALLOCATIONS = 10  # Allocation sites kept per record
+
+
+@dataclass
+class MemoryStats:
+    name: str
+    kind: str = 'stage'  # stage or function
+    parent: str | None = None  # Enclosing stage or function
+    traced_peak_mb: float = 0.0  # Peak traced memory above the level at the start
+    traced_retained_mb: float = 0.0  # Traced memory still allocated at the end
+    rss_start_mb: float = 0.0
+    rss_peak_mb: float = 0.0
+    rss_end_mb: float = 0.0
+    top_allocations: List[dict] = field(default_factory=list)  # Sites of the retained memory
+    frames: Dict[str, float] = field(default_factory=dict)  # Deep memory of the outputs (MB)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def frame_memory(value, name: str = None) -> Dict[str, float]:
+    """
+    Deep memory usage (MB) of the DataFrames in a value, which can be a
+    DataFrame or a dict of them (nested names joined with '.').
+    """
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+        return {name or 'result': float(value.memory_usage(deep=True).sum()) / MB}
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            result.update(frame_memory(item, f"{name}.{key}" if name else str(key)))
+        return result
+    return {}
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    """file:line, relative to the project, site-packages or stdlib so reports compare across machines"""
+    path = Path(frame.filename)
+    parts = path.parts
+    if 'site-packages' in parts:
+        location = str(Path(*parts[parts.index('site-packages') + 1:]))
+    elif path.is_relative_to(PROJECT_ROOT):
+        location = str(path.relative_to(PROJECT_ROOT))
+    elif path.is_relative_to(sysconfig.get_path('stdlib')):
+        location = str(path.relative_to(sysconfig.get_path('stdlib')))
+    else:
+        location = str(path)
+    return f"{location}:{frame.lineno}"
+
+
+def top_allocation_sites(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                         limit: int = TOP_ALLOCATIONS) -> List[dict]:
+    """Lines that allocated the most memory still alive in `after`"""
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diffs = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), 'lineno')
+    grown = sorted((diff for diff in diffs if diff.size_diff > 0), key=lambda diff: diff.size_diff, reverse=True)
+    return [{'site': _site(diff.traceback[0]), 'size_mb': diff.size_diff / MB, 'count': diff.count_diff}
+            for diff in grown[:limit]]
+
+
+class MemoryProfiler:
+    """
+    Collects MemoryStats of nested stages and functions.
+
+    Starts tracemalloc on enter (and stops it on exit if it started it).
+    Measurements are process-wide: run the measured code on one thread.
+    """
+
+    def __init__(self, top: int = TOP_ALLOCATIONS):
+        self.top = top
+        self.records: List[MemoryStats] = []
+        self._stack: List[dict] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def measure(self, name: str, kind: str = 'stage'):
+        """
+        Record peak/retained memory of the enclosed code. Allocation sites
+        are only kept for stages (snapshots are costly and would themselves
+        show up in the enclosing stage's memory).
+        """
+        # Snapshot first, so its own memory is part of the starting level
+        before = tracemalloc.take_snapshot() if self.top and kind == 'stage' else None
+        with self._lock:
+            parent = self._stack[-1] if self._stack else None
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # Keep the enclosing peak before resetting the counter for this block
+                parent['peak'] = max(parent['peak'], peak)
+            tracemalloc.reset_peak()
+            entry = {'name': name, 'start': current, 'peak': current}
+            self._stack.append(entry)
+
+        stats = MemoryStats(name, kind, parent['name'] if parent else None)
+        self.records.append(stats)  # In start order: a stage before its functions
+        sampler = RssSampler()
+        sampler.start()
+        stats.rss_start_mb = sampler.peak
+        try:
+            yield stats
+        finally:
+            stats.rss_peak_mb = sampler.stop()
+            with self._lock:
+                self._stack.remove(entry)
+                current, peak = tracemalloc.get_traced_memory()
+                entry['peak'] = max(entry['peak'], peak)
+                if parent is not None:
+                    parent['peak'] = max(parent['peak'], entry['peak'])
+            stats.traced_peak_mb = (entry['peak'] - entry['start']) / MB
+            stats.traced_retained_mb = (current - entry['start']) / MB
+            stats.rss_end_mb = current_rss_mb()
+            if before is not None:
+                stats.top_allocations = top_allocation_sites(before, tracemalloc.take_snapshot(), self.top)
+
+    def add_frames(self, name: str, value):
+        """Attach the deep memory of a stage's outputs to its latest record"""
+        for stats in reversed(self.records):
+            if stats.name == name:
+                stats.frames.update(frame_memory(value))
+                return
+
+
+@contextmanager
+def profile_functions(profiler: MemoryProfiler, modules: Iterable[ModuleType]):
+    """
+    Measure every call of the public functions defined in `modules`.
+
+    Functions are swapped on the module, so calls made through the module
+    (`normalize.normalize_population_addresses(...)`) and from within it are
+    measured; the originals are restored on exit.
+    """
+    patched = []
+    for module in modules:
+        prefix = module.__name__.rsplit('.', 1)[-1]
+        for attr, func in inspect.getmembers(module, inspect.isfunction):
+            if attr.startswith('_') or func.__module__ != module.__name__:
+                continue
+
+            def wrapper(*args, __func=func, __name=f"{prefix}.{attr}", **kwargs):
+                with profiler.measure(__name, kind='function') as stats:
+                    result = __func(*args, **kwargs)
+                    stats.frames = frame_memory(result)
+                return result
+
+            functools.update_wrapper(wrapper, func)
+            setattr(module, attr, wrapper)
+            patched.append((module, attr, func))
+    try:
+        yield profiler
+    finally:
+        for module, attr, func in patched:
+            setattr(module, attr, func)
+
+
+def format_memory_report(records: List[MemoryStats], top: int = 3) -> str:
+    """Fixed-width table of memory records (functions indented under their stage)"""
+    header = (f"{'Stage / function':<56} {'Traced peak':>12} {'Retained':>10} "
+              f"{'RSS peak':>10} {'Outputs':>10}")
+    lines = [header + "  (MB)", '-' * len(header)]
+    for stats in records:
+        name = f"  {stats.name}" if stats.kind == 'function' else stats.name
+        lines.append(f"{name:<56} {stats.traced_peak_mb:>12.1f} {stats.traced_retained_mb:>10.1f} "
+                     f"{stats.rss_peak_mb:>10.1f} {sum(stats.frames.values()):>10.1f}")
+        if stats.kind == 'stage':
+            for site in stats.top_allocations[:top]:
+                lines.append(f"      {site['size_mb']:>8.1f} MB  {site['site']}")
+    return '\n'.join(lines)
@@ -0,0 +1,274 @@
+"""In-process pipeline runner
+
+Runs extract -> union -> normalize -> build CSP/IRIS -> load in a single
+process with the same stage functions as the Airflow DAG, passing
+DataFrames in memory. Every stage is measured (wall/CPU time, rows in and
+out, peak RSS) and written to data_quality.performance at the end of the
+run, see `src.pipeline.telemetry`. Source rows breaking their schema domain
+rules are written to quarantine files at extract, see
+`src.extract.validation`. With `quality`, the source files are also run
+through the quality checks (`src.quality.runner`). With `memory_profile`, peak and retained
+memory are also recorded per stage and per transform function, see
+`src.pipeline.memory`.
+
+Used by `main.py` (CLI) and the `etl_pipeline_in_process` DAG.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import pandas as pd
+
+from src.config.schemas import CONSOMMATION_CSP_SCHEMA, CONSOMMATION_IRIS_SCHEMA
+from src.config.settings import (
+    COMPACT_SOURCES,
+    JOIN_CARDINALITY,
+    JOIN_MAX_FANOUT,
+    JOIN_ON_VIOLATION,
+    LOAD_TARGETS_TO_DB,
+    TARGET_FILES,
+    TARGET_LOAD_MODE,
+    TELEMETRY_ENABLED,
+    VALIDATE_SOURCES,
+    setup_logging
+)
+from src.extract import sources as source_readers, validation
+from src.extract.validation import format_quarantine_report, write_quarantine
+from src.load.postgres import load_target
+from src.load.publish import PublishTarget, publish_targets
+from src.pipeline.checkpoint import last_call_cached
+from src.pipeline.memory import (
+    TOP_ALLOCATIONS,
+    MemoryProfiler,
+    MemoryStats,
+    format_memory_report,
+    profile_functions
+)
+from src.pipeline.stages import (
+    DEFAULT_FILES,
+    extract,
+    union,
+    normalize_addresses,
+    build_csp,
+    build_iris,
+    split_quarantine
+)
+from src.pipeline.stats import StageStats, format_report
+from src.pipeline.telemetry import Telemetry, track
+from src.quality.runner import default_quality_jobs, format_quality_report, run_quality_jobs
+from src.quality.violations import new_run_id
+from src.transform import compact, consumption_by_csp, consumption_by_iris, joins, normalize, unions
+from src.transform.joins import CARDINALITIES, ON_VIOLATION
+
+logger = setup_logging(__name__)
+
+ENGINES = ['c', 'pyarrow', 'python']  # pandas CSV parsers
+
+# Functions measured individually in memory profiling mode
+MEMORY_PROFILED_MODULES = [source_readers, validation, compact, unions, normalize, joins,
+                           consumption_by_csp, consumption_by_iris]
+
+TARGET_SCHEMAS = {
+    'csp': CONSOMMATION_CSP_SCHEMA,
+    'iris_paris': CONSOMMATION_IRIS_SCHEMA,
+    'iris_evry': CONSOMMATION_IRIS_SCHEMA,
+}
+
+
+@dataclass
+class PipelineConfig:
+    data_dir: Path | None = None  # Source CSV directory (default: DATA_SOURCE_DIR)
+    output_dir: Path | None = None  # Target files directory (default: OUTPUT_DIR)
+    engine: str = 'c'
+    chunk_size: int | None = None  # Parse source CSVs in chunks of this many rows
+    compact: bool = COMPACT_SOURCES  # Categorical / small integer encodings from the schema domains
+    validate_sources: bool = VALIDATE_SOURCES  # Quarantine rows breaking the schema domain rules
+    quarantine_dir: Path | None = None  # Quarantine files directory (default: QUARANTINE_DIR)
+    join_cardinality: str = JOIN_CARDINALITY  # Population x Consommation join guard, see src.transform.joins
+    join_on_violation: str = JOIN_ON_VIOLATION
+    join_max_fanout: float | None = JOIN_MAX_FANOUT
+    parallelism: int = 4  # Threads for extract and load
+    checkpoints: bool = True
+    load_db: bool = LOAD_TARGETS_TO_DB
+    load_mode: str = TARGET_LOAD_MODE
+    quality: bool = False  # Quality checks of the source files (metrics store, data/violations)
+    telemetry: bool = TELEMETRY_ENABLED  # Save stage stats to data_quality.performance
+    run_id: str | None = None  # Recorded with the stage stats (default: new run id)
+    memory_profile: bool = False  # Peak/retained memory per stage and function (no checkpoints)
+    memory_top: int = TOP_ALLOCATIONS  # Allocation sites per stage (0: skip the costly snapshots)
+
+    def validate(self):
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {self.engine}. Available: {ENGINES}")
+        if self.engine == 'pyarrow' and self.chunk_size:
+            raise ValueError("The pyarrow engine does not support chunked reading (chunk_size)")
+        if self.memory_top < 0:
+            raise ValueError(f"memory_top must be >= 0, got {self.memory_top}")
+        if self.join_cardinality not in CARDINALITIES:
+            raise ValueError(f"Unknown join cardinality: {self.join_cardinality}. Available: {CARDINALITIES}")
+        if self.join_on_violation not in ON_VIOLATION:
+            raise ValueError(f"Unknown join on_violation: {self.join_on_violation}. Available: {ON_VIOLATION}")
+        if self.parallelism < 1:
+            raise ValueError(f"parallelism must be >= 1, got {self.parallelism}")
+
+
+@dataclass
+class PipelineResult:
+    targets: Dict[str, pd.DataFrame]
+    stats: List[StageStats] = field(default_factory=list)
+    published: Dict[str, dict] = field(default_factory=dict)
+    memory: List[MemoryStats] = field(default_factory=list)  # Memory profiling mode only
+    quarantine: Dict[str, dict] = field(default_factory=dict)  # Source -> quarantined rows, reasons, path
+    quality: Dict[tuple, dict] = field(default_factory=dict)  # (table, source) -> quality results
+
+    def report(self) -> str:
+        sections = [format_report(self.stats)]
+        if any(entry['rows'] for entry in self.quarantine.values()):
+            sections.append(format_quarantine_report(self.quarantine))
+        if self.quality:
+            sections.append(format_quality_report(self.quality))
+        if self.memory:
+            sections.append(format_memory_report(self.memory))
+        return '\n\n'.join(sections)
+
+
+def source_files(data_dir: str | Path = None) -> Dict[str, Path]:
+    """Source files, optionally relocated to another directory"""
+    if data_dir is None:
+        return dict(DEFAULT_FILES)
+    return {name: Path(data_dir) / path.name for name, path in DEFAULT_FILES.items()}
+
+
+def _rows(frames: Iterable[pd.DataFrame]) -> int:
+    return sum(len(df) for df in frames)
+
+
+def _run_stage(stage: Callable, *args, config: PipelineConfig, **kwargs):
+    """Call a checkpointed stage; returns (outputs, served from checkpoint)"""
+    if not config.checkpoints or config.memory_profile:
+        return stage.__wrapped__(*args, **kwargs), False
+    outputs = stage(*args, **kwargs)
+    return outputs, last_call_cached()
+
+
+def run_pipeline(config: PipelineConfig = None) -> PipelineResult:
+    """
+    Run the whole ETL in this process.
+
+    Returns:
+        PipelineResult with the 'csp', 'iris_paris' and 'iris_evry' targets
+        and one StageStats per stage
+    """
+    config = config or PipelineConfig()
+    config.validate()
+    telemetry = Telemetry(pipeline='in_process', run_id=config.run_id or new_run_id(),
+                          enabled=config.telemetry)
+
+    if not config.memory_profile:
+        result = _run_stages(config, telemetry)
+    else:
+        with MemoryProfiler(top=config.memory_top) as profiler, \
+                profile_functions(profiler, MEMORY_PROFILED_MODULES):
+            result = _run_stages(config, telemetry, profiler)
+        result.memory = profiler.records
+
+    telemetry.flush()
+    logger.info(f"✅ Pipeline complete in {sum(s.wall_seconds for s in result.stats):.2f}s")
+    return result
+
+
+def _memory(profiler: MemoryProfiler | None, stage: str):
+    return profiler.measure(stage) if profiler else nullcontext()
+
+
+def _run_stages(config: PipelineConfig, telemetry: Telemetry, profiler: MemoryProfiler = None) -> PipelineResult:
+    result = PipelineResult(targets={})
+    # tracemalloc and RSS are process-wide: profile memory on a single thread
+    workers = 1 if profiler else config.parallelism
+
+    # Extract: one checkpoint per source file, read in parallel
+    files = source_files(config.data_dir)
+    with track('extract', telemetry=telemetry) as stats, _memory(profiler, 'extract'):
+        def extract_one(item):
+            return _run_stage(extract, {item[0]: item[1]}, engine=config.engine, chunksize=config.chunk_size,
+                              compact=config.compact, validate=config.validate_sources, config=config)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            extracted_files = list(executor.map(extract_one, files.items()))
+        extracted, quarantined = split_quarantine(
+            {name: df for frames, _ in extracted_files for name, df in frames.items()})
+        stats.rows_in = _rows(extracted.values()) + _rows(quarantined.values())
+        stats.rows_out = _rows(extracted.values())
+        stats.cached = all(cached for _, cached in extracted_files)
+    result.stats.append(stats)
+    _add_frames(profiler, 'extract', extracted)
+    result.quarantine = write_quarantine(quarantined, telemetry.run_id, config.quarantine_dir)
+
+    if config.quality:
+        # Reads the source files again, chunked, in worker processes; violations under this run id
+        with track('quality', telemetry=telemetry) as stats, _memory(profiler, 'quality'):
+            result.quality = run_quality_jobs(default_quality_jobs(files=files), max_workers=workers,
+                                              run_id=telemetry.run_id)
+        result.stats.append(stats)
+
+    sources = [extracted[name] for name in
+               ('population_paris', 'population_evry', 'consommation_paris', 'consommation_evry')]
+    with track('union', rows_in=_rows(sources), telemetry=telemetry) as stats, _memory(profiler, 'union'):
+        unioned, stats.cached = _run_stage(union, *sources, config=config)
+        stats.rows_out = _rows(unioned.values())
+    result.stats.append(stats)
+    _add_frames(profiler, 'union', unioned)
+
+    with track('normalize', rows_in=_rows(unioned.values()) + len(extracted['iris']),
+               telemetry=telemetry) as stats, _memory(profiler, 'normalize'):
+        normalized, stats.cached = _run_stage(normalize_addresses, unioned['population'],
+                                              unioned['consommation'], extracted['iris'], config=config)
+        stats.rows_out = _rows(normalized.values())
+    result.stats.append(stats)
+    _add_frames(profiler, 'normalize', normalized)
+
+    csp_inputs = [normalized['population'], normalized['consommation'], extracted['csp']]
+    with track('build_csp', rows_in=_rows(csp_inputs), telemetry=telemetry) as stats, \
+            _memory(profiler, 'build_csp'):
+        target_csp, stats.cached = _run_stage(build_csp, *csp_inputs, validate=config.join_cardinality,
+                                              on_violation=config.join_on_violation,
+                                              max_fanout=config.join_max_fanout, config=config)
+        stats.rows_out = len(target_csp)
+    result.stats.append(stats)
+    _add_frames(profiler, 'build_csp', target_csp)
+
+    iris_inputs = [normalized['consommation'], normalized['iris']]
+    with track('build_iris', rows_in=_rows(iris_inputs), telemetry=telemetry) as stats, \
+            _memory(profiler, 'build_iris'):
+        targets_iris, stats.cached = _run_stage(build_iris, *iris_inputs, config=config)
+        stats.rows_out = _rows(targets_iris.values())
+    result.stats.append(stats)
+    _add_frames(profiler, 'build_iris', targets_iris)
+
+    result.targets = {
+        'csp': target_csp,
+        'iris_paris': targets_iris['paris'],
+        'iris_evry': targets_iris['evry'],
+    }
+
+    with track('load', rows_in=_rows(result.targets.values()), telemetry=telemetry) as stats, \
+            _memory(profiler, 'load'):
+        result.published = publish_targets(
+            [PublishTarget(TARGET_FILES[name], df, TARGET_SCHEMAS[name]) for name, df in result.targets.items()],
+            output_dir=config.output_dir, max_workers=workers
+        )
+        stats.rows_out = sum(entry['rows'] for entry in result.published.values())
+        if config.load_db:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda item: load_target(item[1], item[0], config.load_mode),
+                                  result.targets.items()))
+    result.stats.append(stats)
+
+    return result
+
+
+def _add_frames(profiler: MemoryProfiler | None, stage: str, outputs):
+    if profiler:
+        profiler.add_frames(stage, outputs)
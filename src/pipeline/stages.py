@@ -0,0 +1,173 @@
+"""ETL stages with checkpoints
+
+extract -> union -> normalize -> build_csp / build_iris
+
+or, partitioned by postal code (`etl_pipeline` DAG, see `src.transform.partitioned`):
+
+extract -> union -> [normalize_partition -> partial_aggregates] * N -> reduce
+
+Every stage is memoized with `checkpointed`: it is skipped when its inputs,
+parameters and code are unchanged, so rerunning the pipeline after a
+failure resumes at the stage that failed. See `src.pipeline.runner` for
+running them in order.
+"""
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from src.config.schemas import POPULATION_SCHEMA, CONSOMMATION_SCHEMA, CSP_SCHEMA, IRIS_SCHEMA
+from src.config.settings import (
+    POPULATION_PARIS_FILE,
+    POPULATION_EVRY_FILE,
+    CONSOMMATION_PARIS_FILE,
+    CONSOMMATION_EVRY_FILE,
+    CSP_FILE,
+    IRIS_FILE,
+    COMPACT_SOURCES,
+    JOIN_CARDINALITY,
+    JOIN_MAX_FANOUT,
+    JOIN_ON_VIOLATION,
+    VALIDATE_SOURCES,
+    setup_logging
+)
+from src.extract import sources, validation
+from src.pipeline.checkpoint import checkpointed
+from src.transform import (
+    compact as compaction,
+    consumption_by_csp,
+    consumption_by_iris,
+    joins,
+    normalize,
+    partitioned,
+    unions
+)
+
+logger = setup_logging(__name__)
+
+SOURCE_FILES = {
+    'population_paris': (POPULATION_PARIS_FILE, POPULATION_SCHEMA),
+    'population_evry': (POPULATION_EVRY_FILE, POPULATION_SCHEMA),
+    'consommation_paris': (CONSOMMATION_PARIS_FILE, CONSOMMATION_SCHEMA),
+    'consommation_evry': (CONSOMMATION_EVRY_FILE, CONSOMMATION_SCHEMA),
+    'csp': (CSP_FILE, CSP_SCHEMA),
+    'iris': (IRIS_FILE, IRIS_SCHEMA),
+}
+DEFAULT_FILES = {name: path for name, (path, _) in SOURCE_FILES.items()}
+QUARANTINE_PREFIX = 'quarantine.'  # extract outputs holding a source's quarantined rows
+
+
+def _prepare(df: pd.DataFrame, schema, compact: bool, validate: bool):
+    """Validate then compact parsed rows; returns (clean, quarantined or None)"""
+    quarantined = None
+    if validate:
+        df, quarantined = validation.validate_rows(df, schema)
+    if compact:
+        df = compaction.compact(df, schema)
+    return df, quarantined
+
+
+def _prepare_chunks(chunks, schema, compact: bool, validate: bool):
+    """_prepare chunk by chunk, with the encodings decided once on the first (clean) chunk"""
+    plan = None
+    for chunk in chunks:
+        quarantined = None
+        if validate:
+            chunk, quarantined = validation.validate_rows(chunk, schema)
+        if compact:
+            plan = plan if plan is not None else compaction.compaction_plan(chunk, schema)
+            chunk = compaction.compact(chunk, schema, plan)
+        yield chunk, quarantined
+
+
+@checkpointed('extract', code=[sources, validation, compaction])
+def extract(files: Dict[str, Path] = DEFAULT_FILES, engine: str = None, chunksize: int = None,
+            compact: bool = COMPACT_SOURCES, validate: bool = VALIDATE_SOURCES) -> Dict[str, pd.DataFrame]:
+    """
+    Read sources (keyed by SOURCE_FILES names, keyed on file size and mtime).
+
+    With `chunksize`, files are parsed in chunks of that many rows, which
+    bounds the parser's own memory on large files. With `validate`, rows
+    breaking their schema domain rules are returned separately under
+    QUARANTINE_PREFIX + name (see `split_quarantine`). With `compact`, clean
+    columns are re-encoded with their schema domains (categorical, small
+    integers). Both happen chunk by chunk when chunked, with the encodings
+    decided once on the first chunk.
+    """
+    frames = {}
+    for name, path in files.items():
+        schema = SOURCE_FILES[name][1]
+        if chunksize:
+            parts = list(_prepare_chunks(sources.iter_csv_with_schema(path, schema, chunksize),
+                                         schema, compact, validate))
+            frames[name] = compaction.concat_compact([clean for clean, _ in parts], ignore_index=True)
+            quarantined = pd.concat([rows for _, rows in parts], ignore_index=True) if validate else None
+        else:
+            frames[name], quarantined = _prepare(sources.read_csv_with_schema(path, schema, engine=engine),
+                                                 schema, compact, validate)
+        if quarantined is not None:
+            frames[f"{QUARANTINE_PREFIX}{name}"] = quarantined
+    return frames
+
+
+def split_quarantine(frames: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """Separate extract outputs into (clean sources, quarantined rows), both keyed by source name"""
+    clean = {name: df for name, df in frames.items() if not name.startswith(QUARANTINE_PREFIX)}
+    quarantined = {name[len(QUARANTINE_PREFIX):]: df for name, df in frames.items()
+                   if name.startswith(QUARANTINE_PREFIX)}
+    return clean, quarantined
+
+
+@checkpointed('union', code=[unions])
+def union(population_paris: pd.DataFrame, population_evry: pd.DataFrame,
+          consommation_paris: pd.DataFrame, consommation_evry: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Union Paris and Evry sources"""
+    return {
+        'population': unions.union_population_sources(population_paris, population_evry),
+        'consommation': unions.union_consommation_sources(consommation_paris, consommation_evry),
+    }
+
+
+@checkpointed('normalize', code=[normalize])
+def normalize_addresses(population: pd.DataFrame, consommation: pd.DataFrame,
+                        iris: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Normalize addresses, streets and postal codes"""
+    return {
+        'population': normalize.normalize_population_addresses(population),
+        'consommation': normalize.normalize_consommation_addresses(consommation),
+        'iris': normalize.normalize_iris_streets_postalcodes(iris),
+    }
+
+
+@checkpointed('build_csp', code=[consumption_by_csp, joins])
+def build_csp(population: pd.DataFrame, consommation: pd.DataFrame, csp: pd.DataFrame,
+              validate: str = JOIN_CARDINALITY, on_violation: str = JOIN_ON_VIOLATION,
+              max_fanout: float | None = JOIN_MAX_FANOUT) -> pd.DataFrame:
+    """Build Consommation_CSP (the join guard settings are part of the checkpoint key)"""
+    return consumption_by_csp.build_consommation_csp(population, consommation, csp, validate=validate,
+                                                     on_violation=on_violation, max_fanout=max_fanout)
+
+
+@checkpointed('build_iris', code=[consumption_by_iris])
+def build_iris(consommation: pd.DataFrame, iris: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Build Consommation_IRIS (Paris and Evry)"""
+    return consumption_by_iris.build_consommation_iris(consommation, iris)
+
+
+@checkpointed('normalize_partition', code=[partitioned])
+def normalize_partition(population: pd.DataFrame, consommation: pd.DataFrame,
+                        iris: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Normalize one postal-code partition"""
+    return partitioned.normalize_partition({'population': population, 'consommation': consommation, 'iris': iris})
+
+
+@checkpointed('partial_aggregates', code=[partitioned])
+def partial_aggregates(population: pd.DataFrame, consommation: pd.DataFrame, iris: pd.DataFrame,
+                       csp: pd.DataFrame, validate: str = JOIN_CARDINALITY, on_violation: str = JOIN_ON_VIOLATION,
+                       max_fanout: float | None = JOIN_MAX_FANOUT) -> Dict[str, pd.DataFrame]:
+    """Partial CSP and IRIS aggregates of one normalized partition (join guard settings in the key)"""
+    return {
+        'csp': partitioned.partial_csp(population, consommation, csp, validate=validate,
+                                       on_violation=on_violation, max_fanout=max_fanout),
+        'iris': partitioned.partial_iris(consommation, iris),
+    }
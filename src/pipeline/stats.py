@@ -0,0 +1,122 @@
+"""Per-stage resource statistics: wall time, CPU time, rows, peak memory"""
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import List
+
+from src.config.settings import setup_logging
+
+logger = setup_logging(__name__)
+
+RSS_SAMPLE_INTERVAL = 0.01  # Seconds
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process (MB)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        # No procfs (e.g. macOS): fall back to the lifetime peak
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process since it started (MB)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return maxrss / 1024 / 1024 if os.uname().sysname == 'Darwin' else maxrss / 1024
+
+
+class RssSampler:
+    """Background thread recording the peak RSS between start() and stop()"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_mb())
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.peak = current_rss_mb()
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_mb())
+        return self.peak
+
+
+@dataclass
+class StageStats:
+    stage: str
+    rows_in: int | None = None
+    rows_out: int | None = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    cached: bool = False
+
+    @property
+    def rows_per_second(self) -> float | None:
+        """Throughput on the stage's input rows (output rows if it has no input)"""
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        if rows is None or self.wall_seconds <= 0:
+            return None
+        return rows / self.wall_seconds
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'rows_per_second': self.rows_per_second}
+
+
+@contextmanager
+def measure(stage: str, rows_in: int = None):
+    """
+    Time a stage and sample its peak memory.
+
+    Example:
+        >>> with measure('union', rows_in=len(a) + len(b)) as stats:
+        ...     df = pd.concat([a, b])
+        ...     stats.rows_out = len(df)
+    """
+    stats = StageStats(stage, rows_in=rows_in)
+    sampler = RssSampler()
+    sampler.start()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield stats
+    finally:
+        stats.wall_seconds = time.perf_counter() - wall_start
+        stats.cpu_seconds = time.process_time() - cpu_start
+        stats.peak_rss_mb = sampler.stop()
+        logger.info(f"✅ Stage {stage}: {stats.wall_seconds:.2f}s wall, "
+                    f"{stats.rows_out if stats.rows_out is not None else '-'} rows out")
+
+
+def format_report(stats: List[StageStats]) -> str:
+    """Fixed-width table of stage statistics"""
+    def fmt_rows(rows):
+        return f"{rows:,}" if rows is not None else '-'
+
+    header = f"{'Stage':<12} {'Wall (s)':>9} {'CPU (s)':>9} {'Rows in':>12} {'Rows out':>12} {'Peak RSS (MB)':>14}"
+    lines = [header, '-' * len(header)]
+    for s in stats:
+        stage = f"{s.stage}*" if s.cached else s.stage
+        lines.append(f"{stage:<12} {s.wall_seconds:>9.2f} {s.cpu_seconds:>9.2f} "
+                     f"{fmt_rows(s.rows_in):>12} {fmt_rows(s.rows_out):>12} {s.peak_rss_mb:>14.1f}")
+    lines.append('-' * len(header))
+    lines.append(f"{'total':<12} {sum(s.wall_seconds for s in stats):>9.2f} "
+                 f"{sum(s.cpu_seconds for s in stats):>9.2f}")
+    if any(s.cached for s in stats):
+        lines.append("* served from checkpoint")
+    return '\n'.join(lines)
@@ -0,0 +1,172 @@
+"""Per-stage performance telemetry
+
+Stages are measured with `src.pipeline.stats.measure` (wall/CPU time, peak
+RSS, rows in/out) and buffered in memory; `flush()` writes the buffer to
+`data_quality.performance` in one bulk insert through the metrics store.
+
+    @instrumented('union')                 # src/ function or DAG task
+    def union(...): ...
+
+    with track('load', rows_in=n) as stats:
+        ...
+        stats.rows_out = m
+
+Each flush also records the database connection checkouts since the
+previous one as a DB_ACQUIRE_STAGE row (rows_in: checkouts, wall_seconds:
+time spent acquiring), and logs their average and max time.
+
+A failing telemetry write is logged and never fails the pipeline.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from src.config.settings import TELEMETRY_ENABLED, setup_logging
+from src.pipeline.stats import StageStats, measure
+
+logger = setup_logging(__name__)
+
+DB_ACQUIRE_STAGE = 'db_connection_acquire'  # Pool checkout timings (src.db.connection)
+
+
+def count_rows(value) -> int | None:
+    """
+    Rows held by a stage input or output: DataFrames, handoff references
+    ({'path', 'rows', ...}) and dicts/lists of them. None if there are none.
+    """
+    if hasattr(value, 'columns') and hasattr(value, '__len__'):
+        return len(value)
+    if isinstance(value, dict):
+        if 'rows' in value and 'path' in value:
+            return value['rows']
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        counts = [count for count in map(count_rows, value) if count is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+class Telemetry:
+    """Buffer of stage statistics for one pipeline run"""
+
+    def __init__(self, pipeline: str = None, run_id: str = None, enabled: bool = TELEMETRY_ENABLED):
+        self.pipeline = pipeline
+        self.run_id = run_id
+        self.enabled = enabled
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, stats: StageStats, run_id: str = None, pipeline: str = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.records.append({
+                'run_id': run_id or self.run_id,
+                'pipeline': pipeline or self.pipeline,
+                'stage': stats.stage,
+                'wall_seconds': stats.wall_seconds,
+                'cpu_seconds': stats.cpu_seconds,
+                'peak_rss_mb': stats.peak_rss_mb,
+                'rows_in': stats.rows_in,
+                'rows_out': stats.rows_out,
+                'rows_per_second': stats.rows_per_second,
+                'timestamp': datetime.now(),
+            })
+
+    def flush(self) -> int:
+        """Write buffered records in one bulk insert; returns the number written"""
+        with self._lock:
+            records, self.records = self.records, []
+        if not records:
+            return 0
+        pool_record = _pool_record(records[-1])
+        if pool_record is not None:
+            records.append(pool_record)
+        try:
+            from src.db.store import get_metrics_store
+            get_metrics_store().save_performance(records)
+        except Exception as e:
+            logger.warning(f"Could not save {len(records)} performance records: {e}")
+            return 0
+        return len(records)
+
+
+def _pool_record(last: Dict) -> Dict | None:
+    """Connection checkouts since the previous flush, as a performance record (None if there were none)"""
+    try:
+        from src.db.connection import get_pool_metrics
+    except ImportError:
+        return None
+    pool = get_pool_metrics(reset=True)
+    if not pool['acquire_count']:
+        return None
+    logger.info(f"DB connections: {pool['acquire_count']} checkouts, avg {pool['acquire_avg_ms']:.1f} ms, "
+                f"max {pool['acquire_max_ms']:.1f} ms")
+    return {
+        'run_id': last['run_id'],
+        'pipeline': last['pipeline'],
+        'stage': DB_ACQUIRE_STAGE,
+        'wall_seconds': pool['acquire_total_ms'] / 1000,
+        'cpu_seconds': None,
+        'peak_rss_mb': None,
+        'rows_in': pool['acquire_count'],
+        'rows_out': None,
+        'rows_per_second': None,
+        'timestamp': datetime.now(),
+    }
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry buffer"""
+    return _telemetry
+
+
+@contextmanager
+def track(stage: str, rows_in: int = None, telemetry: Telemetry = None, run_id: str = None):
+    """measure() a stage and buffer its statistics"""
+    telemetry = telemetry or get_telemetry()
+    with measure(stage, rows_in=rows_in) as stats:
+        yield stats
+    telemetry.record(stats, run_id)
+
+
+def instrumented(stage: str = None, pipeline: str = None, run_id: Callable[[], str] | str = None,
+                 flush: bool = False):
+    """
+    Track every call of a function as a stage.
+
+    Rows in/out are counted from the DataFrames (or handoff references)
+    among its arguments and in its return value.
+
+    Args:
+        stage: Stage name (default: function name)
+        pipeline: Pipeline name recorded with each call
+        run_id: Run id, or a callable returning it at call time
+            (e.g. the Airflow run id of the current task)
+        flush: Write the record right away (DAG tasks: one process per task)
+    """
+    def decorator(func: Callable):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            telemetry = get_telemetry()
+            if not telemetry.enabled:
+                return func(*args, **kwargs)
+
+            rows_in = count_rows(list(args) + list(kwargs.values()))
+            with measure(name, rows_in=rows_in) as stats:
+                result = func(*args, **kwargs)
+                stats.rows_out = count_rows(result)
+
+            telemetry.record(stats, run_id() if callable(run_id) else run_id, pipeline)
+            if flush:
+                telemetry.flush()
+            return result
+        return wrapper
+    return decorator
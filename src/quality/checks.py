@@ -1,12 +1,174 @@
-"""Data quality check functions
-Note: This version was used to test database integration.
-Needs to be changed once we work on the data quality.
-"""
+"""Data quality checks: completeness, format conformity and duplicates"""
 import pandas as pd
-from typing import Dict, List
-from src.db.queries import save_quality_metric, save_quality_issue
+from datetime import datetime
+from typing import Dict, List, Tuple
+from src.config.schemas import POPULATION_ID_PATTERNS
+from src.db.store import get_metrics_store
+from src.quality.violations import ViolationWriter
 
-def check_completeness(df: pd.DataFrame, table_name: str, source: str = None) -> Dict[str, float]:
+# Default format rules applied by run_quality_checks
+FORMAT_RULES = {
+    'ID': POPULATION_ID_PATTERNS['Paris'],  # Pattern: P followed by 4 or more digits
+    'CSP': r'^\d{1,2}$',  # Pattern: 1 or 2 digits
+}
+
+COMPLETENESS_THRESHOLD = 90
+CONFORMITY_THRESHOLD = 95
+ISSUE_SAMPLE_SIZE = 5  # Offending rows logged per column when violations are not captured
+DUPLICATE_RULE = 'duplicate'
+
+
+class DatabaseRecorder:
+    """Writes each metric and issue to the metrics store as it is recorded"""
+    
+    def metric(self, **record):
+        get_metrics_store().save_quality_metric(**record)
+    
+    def issue(self, **record):
+        get_metrics_store().save_quality_issue(**record)
+
+
+class BufferedRecorder:
+    """
+    Collects metrics and issues in memory for a single bulk write.
+    
+    Used by workers that must not open their own database connections:
+    the records are picklable and written once by `flush()`.
+    """
+    
+    def __init__(self):
+        self.metrics: List[Dict] = []
+        self.issues: List[Dict] = []
+    
+    def metric(self, **record):
+        self.metrics.append({**record, 'timestamp': datetime.now()})
+    
+    def issue(self, **record):
+        self.issues.append({**record, 'timestamp': datetime.now()})
+    
+    def extend(self, other: "BufferedRecorder"):
+        self.metrics.extend(other.metrics)
+        self.issues.extend(other.issues)
+    
+    def flush(self):
+        """Write all buffered records in one transaction per table"""
+        store = get_metrics_store()
+        store.save_quality_metrics(self.metrics)
+        store.save_quality_issues(self.issues)
+        self.metrics = []
+        self.issues = []
+
+
+def _record_completeness(table_name: str, column: str, completeness_pct: float,
+                         source: str = None, recorder=None):
+    """Save a completeness metric and flag low completeness"""
+    recorder = recorder or DatabaseRecorder()
+    recorder.metric(
+        table_name=table_name,
+        column_name=column,
+        metric_type='completeness',
+        metric_value=completeness_pct,
+        source=source
+    )
+    
+    print(f"  {column}: {completeness_pct:.2f}% complete")
+    
+    # Log issues for columns with low completeness
+    if completeness_pct < COMPLETENESS_THRESHOLD:
+        recorder.issue(
+            table_name=table_name,
+            row_id=None,
+            issue_type='low_completeness',
+            issue_description=f"Column {column} is only {completeness_pct:.2f}% complete",
+            severity='medium' if completeness_pct >= 80 else 'high',
+            source=source
+        )
+
+
+def _record_conformity(table_name: str, column: str, conformity_pct: float,
+                       samples: List[Tuple[str, str]], source: str = None, recorder=None,
+                       pattern: str = None, violations=None):
+    """
+    Save a format conformity metric and log non-conforming rows.
+    
+    With a violation sink, a single summary issue points to the captured
+    rows; otherwise the sample rows are logged one by one.
+    """
+    recorder = recorder or DatabaseRecorder()
+    recorder.metric(
+        table_name=table_name,
+        column_name=column,
+        metric_type='format_conformity',
+        metric_value=conformity_pct,
+        source=source
+    )
+    
+    print(f"  {column}: {conformity_pct:.2f}% conform to pattern")
+    
+    # Log non-conforming values
+    if conformity_pct < CONFORMITY_THRESHOLD and violations is not None:
+        violation_count = violations.count(column, pattern)
+        recorder.issue(
+            table_name=table_name,
+            row_id=None,
+            issue_type='format_violation',
+            issue_description=(f"Column {column} has {violation_count} values with invalid format "
+                               f"(all rows in {violations.path})"),
+            severity='low',
+            source=source
+        )
+    elif conformity_pct < CONFORMITY_THRESHOLD:
+        for row_id, value in samples[:ISSUE_SAMPLE_SIZE]:
+            recorder.issue(
+                table_name=table_name,
+                row_id=row_id,
+                issue_type='format_violation',
+                issue_description=f"Column {column} has invalid format: '{value}'",
+                severity='low',
+                source=source
+            )
+
+
+def _record_duplicates(table_name: str, id_column: str, duplicate_count: int,
+                       duplicate_pct: float, duplicate_ids: List[object],
+                       source: str = None, recorder=None, violations=None):
+    """Save a duplicate metric and log duplicate IDs (summary only with a violation sink)"""
+    recorder = recorder or DatabaseRecorder()
+    recorder.metric(
+        table_name=table_name,
+        column_name=id_column,
+        metric_type='duplicates',
+        metric_value=duplicate_pct,
+        source=source
+    )
+    
+    print(f"  {duplicate_count} duplicate IDs found ({duplicate_pct:.2f}%)")
+    
+    # Log duplicate issues
+    if duplicate_count > 0 and violations is not None:
+        recorder.issue(
+            table_name=table_name,
+            row_id=None,
+            issue_type='duplicate',
+            issue_description=(f"{duplicate_count} duplicate values in {id_column} "
+                               f"(all rows in {violations.path})"),
+            severity='high',
+            source=source
+        )
+        return
+    for dup_id in duplicate_ids[:ISSUE_SAMPLE_SIZE]:
+        recorder.issue(
+            table_name=table_name,
+            row_id=str(dup_id),
+            issue_type='duplicate',
+            issue_description=f"Duplicate ID found: {dup_id}",
+            severity='high',
+            source=source
+        )
+
+
+def check_completeness(df: pd.DataFrame, table_name: str, source: str = None,
+                       recorder=None) -> Dict[str, float]:
     """Check completeness (non-null percentage) for each column"""
     completeness_metrics = {}
     
@@ -18,33 +180,20 @@ def check_completeness(df: pd.DataFrame, table_name: str, source: str = None) ->
         completeness_metrics[column] = completeness_pct
         
         # Save to database
-        save_quality_metric(
-            table_name=table_name,
-            column_name=column,
-            metric_type='completeness',
-            metric_value=completeness_pct,
-            source=source
-        )
-        
-        print(f"  {column}: {completeness_pct:.2f}% complete")
-        
-        # Log issues for columns with low completeness
-        if completeness_pct < 90:
-            save_quality_issue(
-                table_name=table_name,
-                row_id=None,
-                issue_type='low_completeness',
-                issue_description=f"Column {column} is only {completeness_pct:.2f}% complete",
-                severity='medium' if completeness_pct >= 80 else 'high',
-                source=source
-            )
+        _record_completeness(table_name, column, completeness_pct, source, recorder)
     
     return completeness_metrics
 
 def check_format_conformity(df: pd.DataFrame, table_name: str, 
-                           column_rules: Dict[str, str], source: str = None) -> Dict[str, float]:
-    """Check format conformity based on regex patterns"""
+                           column_rules: Dict[str, str], source: str = None,
+                           recorder=None, violations: ViolationWriter = None) -> Dict[str, float]:
+    """
+    Check format conformity based on regex patterns.
+    
+    With `violations`, every non-conforming row is captured to file.
+    """
     conformity_metrics = {}
+    sink = violations.table(table_name, source) if violations is not None else None
     
     for column, pattern in column_rules.items():
         if column not in df.columns:
@@ -58,93 +207,80 @@ def check_format_conformity(df: pd.DataFrame, table_name: str,
             continue
         
         # Check pattern match
-        matching_count = non_null_series.astype(str).str.match(pattern).sum()
+        matches = non_null_series.astype(str).str.match(pattern)
+        matching_count = matches.sum()
         conformity_pct = (matching_count / len(non_null_series)) * 100
         
         conformity_metrics[column] = conformity_pct
         
-        # Save to database
-        save_quality_metric(
-            table_name=table_name,
-            column_name=column,
-            metric_type='format_conformity',
-            metric_value=conformity_pct,
-            source=source
-        )
-        
-        print(f"  {column}: {conformity_pct:.2f}% conform to pattern")
-        
-        # Log non-conforming values
-        if conformity_pct < 95:
-            non_conforming = non_null_series[~non_null_series.astype(str).str.match(pattern)]
-            for idx, value in non_conforming.head(5).items():  # Log first 5
-                save_quality_issue(
-                    table_name=table_name,
-                    row_id=str(df.loc[idx, 'ID']) if 'ID' in df.columns else str(idx),
-                    issue_type='format_violation',
-                    issue_description=f"Column {column} has invalid format: '{value}'",
-                    severity='low',
-                    source=source
-                )
+        # Capture offending rows, save metric and issues to database
+        non_conforming = non_null_series[~matches]
+        if sink is not None:
+            row_keys = df.loc[non_conforming.index, 'ID'] if 'ID' in df.columns else non_conforming.index
+            sink.add(column, pattern, non_conforming.index, row_keys, non_conforming)
+        samples = [
+            (str(df.loc[idx, 'ID']) if 'ID' in df.columns else str(idx), value)
+            for idx, value in non_conforming.head(ISSUE_SAMPLE_SIZE).items()
+        ]
+        _record_conformity(table_name, column, conformity_pct, samples, source, recorder,
+                           pattern, sink)
     
     return conformity_metrics
 
 def check_duplicates(df: pd.DataFrame, table_name: str, 
-                    id_column: str = 'ID', source: str = None) -> int:
-    """Check for duplicate IDs"""
+                    id_column: str = 'ID', source: str = None, recorder=None,
+                    violations: ViolationWriter = None) -> int:
+    """
+    Check for duplicate IDs.
+    
+    With `violations`, every repeated occurrence is captured to file.
+    """
     if id_column not in df.columns:
         print(f"  ⚠️  ID column '{id_column}' not found")
         return 0
     
-    duplicate_count = df[id_column].duplicated().sum()
+    duplicated = df[id_column].duplicated()
+    duplicate_count = duplicated.sum()
     total_count = len(df)
     duplicate_pct = (duplicate_count / total_count) * 100 if total_count > 0 else 0
     
-    # Save metric
-    save_quality_metric(
-        table_name=table_name,
-        column_name=id_column,
-        metric_type='duplicates',
-        metric_value=duplicate_pct,
-        source=source
-    )
-    
-    print(f"  {duplicate_count} duplicate IDs found ({duplicate_pct:.2f}%)")
-    
-    # Log duplicate issues
+    # Save metric and log duplicate issues
+    duplicate_ids = []
+    sink = violations.table(table_name, source) if violations is not None else None
     if duplicate_count > 0:
         duplicates = df[df[id_column].duplicated(keep=False)]
-        for dup_id in duplicates[id_column].unique()[:5]:  # Log first 5
-            save_quality_issue(
-                table_name=table_name,
-                row_id=str(dup_id),
-                issue_type='duplicate',
-                issue_description=f"Duplicate ID found: {dup_id}",
-                severity='high',
-                source=source
-            )
+        duplicate_ids = list(duplicates[id_column].unique()[:ISSUE_SAMPLE_SIZE])
+        if sink is not None:
+            repeated = df.loc[duplicated, id_column]
+            sink.add(id_column, DUPLICATE_RULE, repeated.index, repeated, repeated)
+    _record_duplicates(table_name, id_column, duplicate_count, duplicate_pct, duplicate_ids,
+                       source, recorder, sink)
     
     return duplicate_count
 
-def run_quality_checks(df: pd.DataFrame, table_name: str, source: str = None):
-    """Run all quality checks on a dataframe"""
+def run_quality_checks(df: pd.DataFrame, table_name: str, source: str = None, recorder=None,
+                       violations: ViolationWriter = None):
+    """
+    Run all quality checks on a dataframe.
+    
+    Metrics and issues go to `recorder` (default: written to the database
+    one by one); pass a BufferedRecorder to batch them. Violating rows are
+    written to file only with a `violations` writer; without one, a sample
+    of them is logged as issues.
+    """
     print(f"\n🔍 Running quality checks on {table_name}...")
     
     # Completeness check
     print("\n📊 Completeness Check:")
-    completeness = check_completeness(df, table_name, source)
+    completeness = check_completeness(df, table_name, source, recorder)
     
     # Format conformity check
     print("\n📋 Format Conformity Check:")
-    format_rules = {
-        'ID': r'^P\d{4}$',  # Pattern: P followed by 4 digits
-        'CSP': r'^\d{1,2}$',  # Pattern: 1 or 2 digits
-    }
-    conformity = check_format_conformity(df, table_name, format_rules, source)
+    conformity = check_format_conformity(df, table_name, FORMAT_RULES, source, recorder, violations)
     
     # Duplicate check
     print("\n🔄 Duplicate Check:")
-    duplicates = check_duplicates(df, table_name, 'ID', source)
+    duplicates = check_duplicates(df, table_name, 'ID', source, recorder, violations)
     
     print(f"\n✅ Quality checks complete for {table_name}")
     
@@ -0,0 +1,325 @@
+"""Streaming duplicate detection over chunked inputs
+
+Keys are reduced to 64-bit hashes with pandas' vectorized hashing, so the
+same key hashes identically across chunks, files and worker processes.
+Up to `exact_threshold` distinct keys are tracked exactly (hash -> key);
+beyond that the detector switches to a Bloom filter (membership) plus a
+HyperLogLog sketch (distinct count), so memory stays fixed whatever the
+table size. Bloom hits are only *suspected* duplicates: `confirm_duplicates`
+re-reads the data and counts just those keys exactly.
+"""
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_EXACT_THRESHOLD = 500_000
+DEFAULT_CAPACITY = 50_000_000
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_HLL_PRECISION = 14
+DEFAULT_MAX_SUSPECTS = 10_000
+
+
+def hash_keys(chunk: pd.DataFrame | pd.Series, key_columns: List[str] | str | None = None) -> np.ndarray:
+    """
+    Hash one key per row into uint64.
+
+    Composite keys (e.g. N, Nom_Rue, Code_Postal for D001) are combined
+    column-wise, so no intermediate tuple or string is built.
+    """
+    if isinstance(chunk, pd.DataFrame):
+        if key_columns is not None:
+            columns = [key_columns] if isinstance(key_columns, str) else list(key_columns)
+            chunk = chunk[columns[0]] if len(columns) == 1 else chunk[columns]
+    # Cast to object so "string", categorical and object columns hash alike
+    chunk = chunk.astype(object)
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over uint64 hashes (double hashing)"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Bit positions, shape (len(hashes), num_hashes)"""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            combined = h1[:, None] + steps[None, :] * h2[:, None]
+        return combined % np.uint64(self.num_bits)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Vectorized membership test (may return false positives)"""
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(hashes)
+        bytes_ = self.bits[positions >> np.uint64(3)]
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        return np.all(bytes_ & masks, axis=1)
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Insert hashes"""
+        if len(hashes) == 0:
+            return
+        positions = self._positions(hashes).ravel()
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.int64), masks)
+
+    def merge(self, other: "BloomFilter") -> None:
+        """Union with a filter of identical geometry"""
+        if (self.num_bits, self.num_hashes) != (other.num_bits, other.num_hashes):
+            raise ValueError("Cannot merge Bloom filters with different capacity/error_rate")
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over uint64 hashes"""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be in [4, 18], got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Insert hashes"""
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+        # frexp per 32-bit half: exact whatever the precision (remainders
+        # can exceed 2**53 below precision 11)
+        high = remainder >> np.uint64(32)
+        low = remainder & np.uint64(0xFFFFFFFF)
+        _, high_bits = np.frexp(high.astype(np.float64))
+        _, low_bits = np.frexp(low.astype(np.float64))
+        bit_length = np.where(high > 0, high_bits + 32, low_bits)
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> float:
+        """Estimated number of distinct hashes"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small ranges
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Union with a sketch of identical precision"""
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class DuplicateDetector:
+    """
+    Mergeable duplicate detector for streamed tables.
+
+    Feed chunks with `update()`, combine per-worker detectors with
+    `merge()`. `exact` tells whether `duplicate_count` is exact or an
+    estimate (Bloom/HyperLogLog mode).
+
+    Example:
+        >>> detector = DuplicateDetector(key_columns=['N', 'Nom_Rue', 'Code_Postal'])
+        >>> for chunk in pd.read_csv(path, chunksize=100_000):
+        ...     detector.update(chunk)
+        >>> detector.duplicate_count, detector.suspected_keys[:5]
+    """
+
+    def __init__(self, key_columns: List[str] | str | None = None,
+                 exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+                 capacity: int = DEFAULT_CAPACITY,
+                 error_rate: float = DEFAULT_ERROR_RATE,
+                 hll_precision: int = DEFAULT_HLL_PRECISION,
+                 max_suspects: int = DEFAULT_MAX_SUSPECTS):
+        self.key_columns = key_columns
+        self.exact_threshold = exact_threshold
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_suspects = max_suspects
+
+        self.total_count = 0
+        self.suspected_count = 0
+        self.cross_estimate = 0.0  # Duplicates across merged approximate states
+        self.hll = HyperLogLog(hll_precision)
+        self.seen: Optional[Dict[int, object]] = {}  # hash -> key, exact mode only
+        self.bloom: Optional[BloomFilter] = None
+        self.suspects: Dict[int, object] = {}  # hash -> key
+
+    @property
+    def exact(self) -> bool:
+        """True while keys are tracked in the exact hash set"""
+        return self.seen is not None
+
+    @property
+    def duplicate_count(self) -> int:
+        """Rows whose key was already seen (estimate in approximate mode)"""
+        if self.exact:
+            return self.total_count - len(self.seen)
+        return int(round(self.suspected_count + self.cross_estimate))
+
+    @property
+    def distinct_count(self) -> float:
+        """Distinct keys (HyperLogLog estimate in approximate mode)"""
+        if self.exact:
+            return len(self.seen)
+        return self.hll.count()
+
+    @property
+    def suspected_keys(self) -> List[object]:
+        """Suspected duplicate keys seen so far (bounded by max_suspects)"""
+        return list(self.suspects.values())
+
+    def _keys_for(self, chunk: pd.DataFrame | pd.Series, mask: np.ndarray) -> List[object]:
+        """Materialize key values for the rows selected by mask"""
+        if isinstance(chunk, pd.DataFrame) and self.key_columns is not None:
+            columns = [self.key_columns] if isinstance(self.key_columns, str) else list(self.key_columns)
+            selected = chunk.loc[mask, columns]
+            if len(columns) == 1:
+                return selected[columns[0]].tolist()
+            return list(selected.itertuples(index=False, name=None))
+        return chunk[mask].tolist()
+
+    def _record_suspects(self, hashes: np.ndarray, keys: List[object]) -> None:
+        for hash_value, key in zip(hashes.tolist(), keys):
+            if len(self.suspects) >= self.max_suspects:
+                break
+            if hash_value not in self.suspects:
+                self.suspects[hash_value] = key
+
+    def _switch_to_approximate(self) -> None:
+        """Move the exact set into a Bloom filter once it outgrows the threshold"""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.bloom.add(np.fromiter(self.seen, dtype=np.uint64, count=len(self.seen)))
+        # Exact-mode duplicates are real; keep counting them in the estimate
+        self.suspected_count = self.total_count - len(self.seen)
+        self.seen = None
+
+    def update(self, chunk: pd.DataFrame | pd.Series) -> "DuplicateDetector":
+        """Add one chunk of keys"""
+        self.observe(chunk)
+        return self
+
+    def observe(self, chunk: pd.DataFrame | pd.Series) -> np.ndarray:
+        """
+        Add one chunk of keys and return the mask of its duplicate rows.
+
+        A row is flagged when its key already occurred earlier in the stream
+        (first occurrences are not flagged); in approximate mode the mask
+        may include Bloom false positives.
+        """
+        hashes = hash_keys(chunk, self.key_columns)
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=bool)
+        self.total_count += len(hashes)
+        self.hll.add(hashes)
+
+        # Duplicates inside the chunk
+        in_chunk = pd.Series(hashes).duplicated().to_numpy()
+        first = ~in_chunk
+
+        if self.exact:
+            seen_before = pd.Series(hashes).isin(self.seen.keys()).to_numpy() & first
+            new = first & ~seen_before
+            self.seen.update(zip(hashes[new].tolist(), self._keys_for(chunk, new)))
+        else:
+            seen_before = np.zeros(len(hashes), dtype=bool)
+            seen_before[first] = self.bloom.contains(hashes[first])
+            self.bloom.add(hashes[first & ~seen_before])
+            self.suspected_count += int(np.count_nonzero(in_chunk | seen_before))
+
+        suspect_mask = in_chunk | seen_before
+        if suspect_mask.any() and len(self.suspects) < self.max_suspects:
+            self._record_suspects(hashes[suspect_mask], self._keys_for(chunk, suspect_mask))
+
+        if self.exact and len(self.seen) > self.exact_threshold:
+            self._switch_to_approximate()
+        return suspect_mask
+
+    def merge(self, other: "DuplicateDetector") -> "DuplicateDetector":
+        """
+        Merge another detector's state into this one (associative).
+
+        Exact states stay exact while the union fits the threshold. For
+        approximate states, cross-state duplicates are estimated from the
+        HyperLogLog union and can be confirmed with `confirm_duplicates`.
+        """
+        hll_before = self.hll.count() + other.hll.count()
+        if self.exact and other.exact:
+            cross = [hash_value for hash_value in other.seen if hash_value in self.seen]
+            self._record_suspects(np.array(cross, dtype=np.uint64), [other.seen[h] for h in cross])
+            self.seen.update(other.seen)
+            self.total_count += other.total_count
+            self.hll.merge(other.hll)
+        else:
+            if self.exact:
+                self._switch_to_approximate()
+            other_suspected = other.suspected_count if not other.exact else other.duplicate_count
+            if other.exact:
+                other_bloom = BloomFilter(self.capacity, self.error_rate)
+                other_bloom.add(np.fromiter(other.seen, dtype=np.uint64, count=len(other.seen)))
+            else:
+                other_bloom = other.bloom
+            self.bloom.merge(other_bloom)
+            self.hll.merge(other.hll)
+            self.total_count += other.total_count
+            self.suspected_count += other_suspected
+            self.cross_estimate += other.cross_estimate + max(0.0, hll_before - self.hll.count())
+
+        for hash_value, key in other.suspects.items():
+            if len(self.suspects) >= self.max_suspects:
+                break
+            if hash_value not in self.suspects:
+                self.suspects[hash_value] = key
+
+        if self.exact and len(self.seen) > self.exact_threshold:
+            self._switch_to_approximate()
+        return self
+
+
+def detect_duplicates(chunks: Iterable[pd.DataFrame | pd.Series],
+                      key_columns: List[str] | str | None = None,
+                      **kwargs) -> DuplicateDetector:
+    """Run a DuplicateDetector over an iterable of chunks"""
+    detector = DuplicateDetector(key_columns=key_columns, **kwargs)
+    for chunk in chunks:
+        detector.update(chunk)
+    return detector
+
+
+def confirm_duplicates(chunks: Iterable[pd.DataFrame | pd.Series],
+                       detector: DuplicateDetector) -> pd.Series:
+    """
+    Exact second pass over the data for the detector's suspected keys.
+
+    Only rows whose hash is suspected are kept, so memory is bounded by the
+    number of suspects, not the table size.
+
+    Returns:
+        Series of occurrence counts indexed by key, restricted to keys
+        that really occur more than once
+    """
+    suspect_hashes = np.fromiter(detector.suspects.keys(), dtype=np.uint64, count=len(detector.suspects))
+    counts: Dict[object, int] = {}
+    for chunk in chunks:
+        hashes = hash_keys(chunk, detector.key_columns)
+        mask = np.isin(hashes, suspect_hashes)
+        if not mask.any():
+            continue
+        for key in detector._keys_for(chunk, mask):
+            counts[key] = counts.get(key, 0) + 1
+
+    confirmed = pd.Series(counts, dtype='int64')
+    return confirmed[confirmed > 1].sort_values(ascending=False)
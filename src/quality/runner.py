@@ -0,0 +1,193 @@
+"""Parallel quality check execution across tables and sources
+
+Each job (table, source, DataFrame or CSV path) is evaluated in a worker
+process with the chunk-aware checks of `src.quality.streaming`. Workers
+never touch the database: they send back their result dict and buffered
+metric/issue records, and the parent writes everything in one bulk write.
+Jobs are submitted largest first, so the total wall time is bounded by the
+largest table rather than the sum of all tables.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from src.config.schemas import (
+    TableSchema,
+    POPULATION_SCHEMA,
+    CONSOMMATION_SCHEMA,
+    CSP_SCHEMA,
+    IRIS_SCHEMA,
+    POPULATION_ID_PATTERNS
+)
+from src.config.settings import (
+    POPULATION_PARIS_FILE,
+    POPULATION_EVRY_FILE,
+    CONSOMMATION_PARIS_FILE,
+    CONSOMMATION_EVRY_FILE,
+    CSP_FILE,
+    IRIS_FILE,
+    setup_logging
+)
+from src.extract.sources import iter_csv_with_schema
+from src.quality.checks import FORMAT_RULES, BufferedRecorder
+from src.quality.streaming import evaluate_chunks, record_quality_state
+from src.quality.violations import ViolationWriter, new_run_id
+
+logger = setup_logging(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Source files by extract name, as in src.pipeline.stages.SOURCE_FILES
+SOURCE_FILES = {
+    'population_paris': POPULATION_PARIS_FILE,
+    'population_evry': POPULATION_EVRY_FILE,
+    'consommation_paris': CONSOMMATION_PARIS_FILE,
+    'consommation_evry': CONSOMMATION_EVRY_FILE,
+    'csp': CSP_FILE,
+    'iris': IRIS_FILE,
+}
+
+
+@dataclass
+class QualityJob:
+    """One table/source to check. `data` is a DataFrame or a CSV path"""
+    table_name: str
+    source: str | None
+    data: pd.DataFrame | str | Path
+    schema: TableSchema | None = None  # dtypes used when reading a path
+    format_rules: Dict[str, str] = field(default_factory=lambda: dict(FORMAT_RULES))
+    id_column: str | List[str] = 'ID'  # Duplicate check key (list: composite key)
+    chunksize: int = DEFAULT_CHUNKSIZE
+
+    @property
+    def key(self) -> Tuple[str, str | None]:
+        return self.table_name, self.source
+
+    def size_bytes(self) -> int:
+        """Rough job size, used to schedule the largest jobs first"""
+        if isinstance(self.data, pd.DataFrame):
+            return int(self.data.memory_usage(deep=False).sum())
+        path = Path(self.data)
+        return path.stat().st_size if path.exists() else 0
+
+    def chunks(self):
+        if isinstance(self.data, pd.DataFrame):
+            for start in range(0, max(len(self.data), 1), self.chunksize):
+                yield self.data.iloc[start:start + self.chunksize]
+        elif self.schema is not None:
+            yield from iter_csv_with_schema(self.data, self.schema, self.chunksize)
+        else:
+            with pd.read_csv(self.data, chunksize=self.chunksize) as reader:
+                yield from reader
+
+
+def evaluate_job(job: QualityJob, run_id: str = None) -> Tuple[dict, BufferedRecorder]:
+    """
+    Worker entry point: compute one job's results without database access.
+    
+    Violations go to the job's own partition of the run directory.
+    """
+    recorder = BufferedRecorder()
+    with ViolationWriter(run_id) as violations:
+        sink = violations.table(job.table_name, job.source)
+        state = evaluate_chunks(job.chunks(), job.format_rules, job.id_column, sink)
+        results = record_quality_state(state, job.table_name, job.source, recorder, sink)
+    return results, recorder
+
+
+def run_quality_jobs(jobs: List[QualityJob], max_workers: int = None,
+                     run_id: str = None) -> Dict[Tuple[str, str | None], dict]:
+    """
+    Evaluate quality jobs concurrently and write all results once.
+
+    Args:
+        jobs: Tables to check. Prefer CSV paths over DataFrames, which
+            have to be pickled to the workers.
+        max_workers: Process pool size (default: one per job, capped at CPU count)
+        run_id: Violation export run (default: a new run)
+
+    Returns:
+        Result dict of each job, keyed by (table_name, source). A job that
+        fails gets {'error': message} and a 'check_failed' issue; the
+        results of the other jobs are still written.
+    """
+    if not jobs:
+        return {}
+
+    max_workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    run_id = run_id or new_run_id()
+    ordered = sorted(jobs, key=lambda job: job.size_bytes(), reverse=True)
+    logger.info(f"Running quality checks on {len(jobs)} tables with {max_workers} workers")
+
+    results = {}
+    writer = BufferedRecorder()
+
+    def collect(job: QualityJob, outcome: Callable[[], Tuple[dict, BufferedRecorder]]):
+        try:
+            results[job.key], recorder = outcome()
+        except Exception as e:
+            logger.error(f"❌ Quality checks failed for {job.table_name} ({job.source}): {e!r}")
+            results[job.key] = {'error': repr(e)}
+            writer.issue(table_name=job.table_name, row_id=None, issue_type='check_failed',
+                         issue_description=f"Quality checks failed: {e!r}", severity='high', source=job.source)
+            return
+        writer.extend(recorder)
+        logger.info(f"✅ Quality checks done for {job.table_name} ({job.source})")
+
+    if max_workers == 1:
+        for job in ordered:
+            collect(job, lambda: evaluate_job(job, run_id))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(evaluate_job, job, run_id): job for job in ordered}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    # Single writer: one connection, one transaction per record type
+    logger.info(f"Saving {len(writer.metrics)} metrics and {len(writer.issues)} issues")
+    writer.flush()
+    return results
+
+
+def default_quality_jobs(chunksize: int = DEFAULT_CHUNKSIZE,
+                         files: Dict[str, str | Path] = None) -> List[QualityJob]:
+    """
+    Quality jobs for every source file: Paris, Evry, CSP and IRIS.
+
+    `files` overrides source paths by extract name (population_paris,
+    population_evry, consommation_paris, consommation_evry, csp, iris).
+    """
+    files = {**SOURCE_FILES, **(files or {})}
+    consommation_rules = {'Code_Postal': r'^\d{5}$'}
+    return [
+        QualityJob('Population', 'Paris', files['population_paris'], POPULATION_SCHEMA,
+                   {'ID': POPULATION_ID_PATTERNS['Paris'], 'CSP': r'^\d{1,2}$'}, 'ID', chunksize),
+        QualityJob('Population', 'Evry', files['population_evry'], POPULATION_SCHEMA,
+                   {'ID': POPULATION_ID_PATTERNS['Evry'], 'CSP': r'^\d{1,2}$'}, 'ID', chunksize),
+        QualityJob('Consommation', 'Paris', files['consommation_paris'], CONSOMMATION_SCHEMA,
+                   consommation_rules, 'ID_Adr', chunksize),
+        QualityJob('Consommation', 'Evry', files['consommation_evry'], CONSOMMATION_SCHEMA,
+                   consommation_rules, 'ID_Adr', chunksize),
+        QualityJob('CSP', None, files['csp'], CSP_SCHEMA, {'ID_CSP': r'^\d{1,2}$'}, 'ID_CSP', chunksize),
+        # Several streets share an IRIS zone: duplicates are checked on the table's primary key
+        QualityJob('IRIS', None, files['iris'], IRIS_SCHEMA, {'ID_Ville': r'^\d{5}$'},
+                   IRIS_SCHEMA.primary_key, chunksize),
+    ]
+
+
+def format_quality_report(results: Dict[Tuple[str, str | None], dict]) -> str:
+    """Lowest completeness/conformity and duplicates per checked table"""
+    lines = [f"{'Quality':<24} {'Completeness':>13} {'Conformity':>11} {'Duplicates':>11}", '-' * 62]
+    for (table_name, source), result in results.items():
+        name = f"{table_name} ({source})" if source else table_name
+        if 'error' in result:
+            lines.append(f"{name:<24} failed: {result['error']}")
+            continue
+        completeness = min(result['completeness'].values(), default=100.0)
+        conformity = min(result['conformity'].values(), default=100.0)
+        lines.append(f"{name:<24} {completeness:>12.1f}% {conformity:>10.1f}% {result['duplicates']:>11,}")
+    return '\n'.join(lines)
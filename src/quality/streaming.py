@@ -0,0 +1,235 @@
+"""Chunk-aware quality checks with mergeable metric state
+
+Each check keeps a small partial state (counts, bounded samples, a
+duplicate detector) that is updated chunk by chunk and merged with
+`merge()`. Merging is associative, so states built over a chunk iterator,
+over several files or in separate worker processes combine into the same
+metrics as the in-memory functions of `src.quality.checks`.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from src.quality.checks import (
+    DUPLICATE_RULE,
+    FORMAT_RULES,
+    ISSUE_SAMPLE_SIZE,
+    _record_completeness,
+    _record_conformity,
+    _record_duplicates,
+)
+from src.quality.duplicates import DuplicateDetector
+from src.quality.violations import TableViolations, ViolationWriter
+
+
+@dataclass
+class CompletenessState:
+    """Partial completeness: total rows and non-null count per column"""
+    total_count: int = 0
+    non_null_counts: Dict[str, int] = field(default_factory=dict)
+
+    def update(self, chunk: pd.DataFrame) -> "CompletenessState":
+        self.total_count += len(chunk)
+        for column, count in chunk.notna().sum().items():
+            self.non_null_counts[column] = self.non_null_counts.get(column, 0) + int(count)
+        return self
+
+    def merge(self, other: "CompletenessState") -> "CompletenessState":
+        self.total_count += other.total_count
+        for column, count in other.non_null_counts.items():
+            self.non_null_counts[column] = self.non_null_counts.get(column, 0) + count
+        return self
+
+    def result(self) -> Dict[str, float]:
+        """Completeness percentage per column"""
+        return {
+            column: (count / self.total_count) * 100 if self.total_count > 0 else 0
+            for column, count in self.non_null_counts.items()
+        }
+
+
+@dataclass
+class ConformityState:
+    """Partial format conformity: checked and matching counts per column"""
+    column_rules: Dict[str, str] = field(default_factory=lambda: dict(FORMAT_RULES))
+    checked_counts: Dict[str, int] = field(default_factory=dict)
+    matching_counts: Dict[str, int] = field(default_factory=dict)
+    samples: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+
+    def update(self, chunk: pd.DataFrame, violations: TableViolations = None) -> "ConformityState":
+        for column, pattern in self.column_rules.items():
+            if column not in chunk.columns:
+                continue
+
+            non_null_series = chunk[column].dropna()
+            matches = non_null_series.astype(str).str.match(pattern)
+            self.checked_counts[column] = self.checked_counts.get(column, 0) + len(non_null_series)
+            self.matching_counts[column] = self.matching_counts.get(column, 0) + int(matches.sum())
+
+            if violations is not None and not matches.all():
+                non_conforming = non_null_series[~matches]
+                row_keys = chunk.loc[non_conforming.index, 'ID'] if 'ID' in chunk.columns else non_conforming.index
+                violations.add(column, pattern, non_conforming.index, row_keys, non_conforming)
+
+            # Keep only the first offending rows, like the in-memory check
+            samples = self.samples.setdefault(column, [])
+            if len(samples) < ISSUE_SAMPLE_SIZE:
+                non_conforming = non_null_series[~matches].head(ISSUE_SAMPLE_SIZE - len(samples))
+                for idx, value in non_conforming.items():
+                    row_id = str(chunk.loc[idx, 'ID']) if 'ID' in chunk.columns else str(idx)
+                    samples.append((row_id, value))
+        return self
+
+    def merge(self, other: "ConformityState") -> "ConformityState":
+        if other.column_rules != self.column_rules:
+            raise ValueError("Cannot merge conformity states built with different rules")
+        for column, count in other.checked_counts.items():
+            self.checked_counts[column] = self.checked_counts.get(column, 0) + count
+            self.matching_counts[column] = self.matching_counts.get(column, 0) + other.matching_counts[column]
+            samples = self.samples.setdefault(column, [])
+            samples.extend(other.samples.get(column, [])[:ISSUE_SAMPLE_SIZE - len(samples)])
+        return self
+
+    def result(self) -> Dict[str, float]:
+        """Conformity percentage per checked column (0.0 when all values are null)"""
+        return {
+            column: (self.matching_counts[column] / checked) * 100 if checked > 0 else 0.0
+            for column, checked in self.checked_counts.items()
+        }
+
+
+@dataclass
+class DuplicateState:
+    """Partial duplicate check on one ID column or a composite key (list of columns)"""
+    id_column: str | List[str] = 'ID'
+    detector: DuplicateDetector = None
+    found: bool = False  # Whether the ID column(s) appeared in any chunk
+
+    def __post_init__(self):
+        if self.detector is None:
+            self.detector = DuplicateDetector(key_columns=self.id_column)
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.id_column] if isinstance(self.id_column, str) else list(self.id_column)
+
+    @property
+    def label(self) -> str:
+        """Key name in metrics and violations, e.g. 'ID_Rue+ID_Ville'"""
+        return '+'.join(self.columns)
+
+    def update(self, chunk: pd.DataFrame, violations: TableViolations = None) -> "DuplicateState":
+        if set(self.columns) <= set(chunk.columns):
+            self.found = True
+            keys = chunk[self.columns]
+            duplicated = self.detector.observe(keys)
+            if violations is not None and duplicated.any():
+                repeated = keys[duplicated].astype(str)
+                # Composite keys as one 'a|b' value per row
+                values = repeated.iloc[:, 0].str.cat(repeated.iloc[:, 1:], sep='|') if len(self.columns) > 1 \
+                    else repeated.iloc[:, 0]
+                violations.add(self.label, DUPLICATE_RULE, repeated.index, values, values)
+        return self
+
+    def merge(self, other: "DuplicateState") -> "DuplicateState":
+        if other.id_column != self.id_column:
+            raise ValueError("Cannot merge duplicate states on different ID columns")
+        self.found = self.found or other.found
+        self.detector.merge(other.detector)
+        return self
+
+    def result(self) -> Tuple[int, float]:
+        """Duplicate count and percentage"""
+        total_count = self.detector.total_count
+        duplicate_count = self.detector.duplicate_count
+        duplicate_pct = (duplicate_count / total_count) * 100 if total_count > 0 else 0
+        return duplicate_count, duplicate_pct
+
+
+@dataclass
+class QualityState:
+    """Combined partial state of all checks run by run_quality_checks"""
+    completeness: CompletenessState = field(default_factory=CompletenessState)
+    conformity: ConformityState = field(default_factory=ConformityState)
+    duplicates: DuplicateState = field(default_factory=DuplicateState)
+
+    def update(self, chunk: pd.DataFrame, violations: TableViolations = None) -> "QualityState":
+        self.completeness.update(chunk)
+        self.conformity.update(chunk, violations)
+        self.duplicates.update(chunk, violations)
+        return self
+
+    def merge(self, other: "QualityState") -> "QualityState":
+        self.completeness.merge(other.completeness)
+        self.conformity.merge(other.conformity)
+        self.duplicates.merge(other.duplicates)
+        return self
+
+
+def evaluate_chunks(chunks: Iterable[pd.DataFrame], format_rules: Dict[str, str] = None,
+                    id_column: str | List[str] = 'ID', violations: TableViolations = None) -> QualityState:
+    """
+    Build the partial quality state of an iterable of chunks.
+
+    No database access happens here, so this is safe to run in workers.
+    Violating rows are captured by `violations` when given.
+    """
+    state = QualityState(
+        conformity=ConformityState(column_rules=dict(format_rules or FORMAT_RULES)),
+        duplicates=DuplicateState(id_column=id_column),
+    )
+    for chunk in chunks:
+        state.update(chunk, violations)
+    return state
+
+
+def record_quality_state(state: QualityState, table_name: str, source: str = None,
+                         recorder=None, violations: TableViolations = None) -> dict:
+    """
+    Save the final metrics of a (merged) state.
+
+    Writes the same metrics and issues as run_quality_checks and returns
+    the same result dict.
+    """
+    print(f"\n🔍 Recording quality checks on {table_name}...")
+
+    print("\n📊 Completeness Check:")
+    completeness = state.completeness.result()
+    for column, completeness_pct in completeness.items():
+        _record_completeness(table_name, column, completeness_pct, source, recorder)
+
+    print("\n📋 Format Conformity Check:")
+    conformity = state.conformity.result()
+    for column, conformity_pct in conformity.items():
+        if state.conformity.checked_counts[column] == 0:
+            continue
+        _record_conformity(table_name, column, conformity_pct,
+                           state.conformity.samples.get(column, []), source, recorder,
+                           state.conformity.column_rules[column], violations)
+
+    print("\n🔄 Duplicate Check:")
+    duplicates = 0
+    if not state.duplicates.found:
+        print(f"  ⚠️  ID column '{state.duplicates.label}' not found")
+    else:
+        duplicates, duplicate_pct = state.duplicates.result()
+        _record_duplicates(table_name, state.duplicates.label, duplicates, duplicate_pct,
+                           state.duplicates.detector.suspected_keys, source, recorder, violations)
+
+    print(f"\n✅ Quality checks complete for {table_name}")
+
+    return {
+        'completeness': completeness,
+        'conformity': conformity,
+        'duplicates': duplicates
+    }
+
+
+def run_quality_checks_chunked(chunks: Iterable[pd.DataFrame], table_name: str,
+                               source: str = None, recorder=None,
+                               violations: ViolationWriter = None) -> dict:
+    """Chunk-aware equivalent of run_quality_checks (violations exported only with a writer)"""
+    sink = violations.table(table_name, source) if violations is not None else None
+    state = evaluate_chunks(chunks, violations=sink)
+    return record_quality_state(state, table_name, source, recorder, sink)
@@ -0,0 +1,153 @@
+"""Full violation capture to partitioned Parquet files
+
+Every violating row (row index, row key, column, rule, value) is buffered
+in memory and appended in large row groups to one compressed Parquet file
+per (table, source) partition of the run:
+
+    VIOLATIONS_DIR/run=<run_id>/table=<table>/source=<source>/part-<pid>.parquet
+
+Only summary counts go to `data_quality.issues`. The directory layout is
+Hive-style, so `read_violations` (or any Parquet reader) can filter on
+table and source without opening other partitions.
+"""
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config.settings import VIOLATIONS_DIR, setup_logging
+
+logger = setup_logging(__name__)
+
+VIOLATION_SCHEMA = pa.schema([
+    ('row_index', pa.int64()),
+    ('row_key', pa.string()),
+    ('column', pa.string()),
+    ('rule', pa.string()),
+    ('value', pa.string()),
+])
+
+DEFAULT_BATCH_ROWS = 500_000
+DEFAULT_COMPRESSION = 'zstd'
+
+
+def new_run_id() -> str:
+    """Sortable, unique run identifier"""
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+class TableViolations:
+    """Violations of one (table, source) partition"""
+
+    def __init__(self, writer: "ViolationWriter", table_name: str, source: str = None):
+        self.writer = writer
+        self.table_name = table_name
+        self.source = source
+        self.path = (writer.run_dir / f"table={table_name}" / f"source={source or 'all'}"
+                     / f"part-{os.getpid()}.parquet")
+        self.counts: Dict[Tuple[str, str], int] = {}  # (column, rule) -> violations
+        self._buffer = []
+        self._buffered_rows = 0
+        self._parquet_writer = None
+
+    def add(self, column: str, rule: str, row_index: pd.Index, row_keys: pd.Series, values: pd.Series):
+        """Capture violating rows (vectorized, no per-row work)"""
+        if len(row_index) == 0:
+            return
+        batch = pd.DataFrame({
+            'row_index': pd.Series(row_index, dtype='int64').to_numpy(),
+            'row_key': pd.Series(row_keys).astype(str).to_numpy(),
+            'column': column,
+            'rule': rule,
+            'value': pd.Series(values).astype(str).to_numpy(),
+        })
+        self.counts[(column, rule)] = self.counts.get((column, rule), 0) + len(batch)
+        self._buffer.append(batch)
+        self._buffered_rows += len(batch)
+        if self._buffered_rows >= self.writer.batch_rows:
+            self.flush()
+
+    def count(self, column: str, rule: str) -> int:
+        return self.counts.get((column, rule), 0)
+
+    def flush(self):
+        """Append buffered rows as one row group"""
+        if not self._buffer:
+            return
+        table = pa.Table.from_pandas(pd.concat(self._buffer, ignore_index=True),
+                                     schema=VIOLATION_SCHEMA, preserve_index=False)
+        if self._parquet_writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._parquet_writer = pq.ParquetWriter(self.path, VIOLATION_SCHEMA,
+                                                    compression=self.writer.compression)
+        self._parquet_writer.write_table(table)
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def close(self):
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+class ViolationWriter:
+    """
+    Collects violations of one quality run.
+
+    Example:
+        >>> with ViolationWriter() as violations:
+        ...     run_quality_checks(df, 'Population', 'Paris', violations=violations)
+        >>> read_violations(violations.run_dir)
+    """
+
+    def __init__(self, run_id: str = None, output_dir: str | Path = None,
+                 compression: str = DEFAULT_COMPRESSION, batch_rows: int = DEFAULT_BATCH_ROWS):
+        self.run_id = run_id or new_run_id()
+        self.run_dir = Path(output_dir or VIOLATIONS_DIR) / f"run={self.run_id}"
+        self.compression = compression
+        self.batch_rows = batch_rows
+        self._tables: Dict[Tuple[str, str], TableViolations] = {}
+
+    def table(self, table_name: str, source: str = None) -> TableViolations:
+        """Violation sink for one table/source (created on first use)"""
+        key = (table_name, source)
+        if key not in self._tables:
+            self._tables[key] = TableViolations(self, table_name, source)
+        return self._tables[key]
+
+    def summary(self) -> Dict[Tuple[str, str, str, str], int]:
+        """Violation counts keyed by (table, source, column, rule)"""
+        return {
+            (table_name, source, column, rule): count
+            for (table_name, source), sink in self._tables.items()
+            for (column, rule), count in sink.counts.items()
+        }
+
+    def close(self):
+        for sink in self._tables.values():
+            sink.close()
+        total = sum(self.summary().values())
+        if total:
+            logger.info(f"✅ Captured {total} violations in {self.run_dir}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_violations(run_dir: str | Path, table_name: str = None, source: str = None) -> pd.DataFrame:
+    """Read a run's violations, optionally for one table/source only"""
+    filters = []
+    if table_name is not None:
+        filters.append(('table', '=', table_name))
+    if source is not None:
+        filters.append(('source', '=', source))
+    return pd.read_parquet(run_dir, filters=filters or None)
@@ -0,0 +1,226 @@
+"""Compact in-memory encodings driven by TableSchema domains
+
+Source columns are parsed as Python strings. `compact()` re-encodes the
+columns that declare a Domain in their TableSchema:
+
+- category: pandas Categorical (one small integer code per row); declared
+  values come first, values outside the domain are kept as extra categories
+- small_int / nullable_int: smallest integer dtype holding the values
+- string: left as is
+
+Encodings are lossless: a column whose values do not fit its logical type
+(e.g. '12bis' as a street number) is left unchanged. Categorical columns
+only stay categorical through concat and merge when their categories match;
+`concat_compact` and `match_categories` take care of that.
+
+Chunked reads decide the encodings once, on the first chunk, and apply the
+same plan to every chunk, so dtypes do not depend on chunk boundaries:
+
+    plan = None
+    for chunk in chunks:
+        plan = plan if plan is not None else compaction_plan(chunk, schema)
+        parts.append(compact(chunk, schema, plan))
+    df = concat_compact(parts, ignore_index=True)
+"""
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.config.schemas import Domain, TableSchema
+from src.config.settings import setup_logging
+
+logger = setup_logging(__name__)
+
+MB = 1024 * 1024
+MAX_CATEGORY_RATIO = 0.5  # Undeclared categories: skip columns with more distinct values than this per row
+
+
+def _categorical(values: pd.Series, domain: Domain, force: bool = False) -> pd.Series | None:
+    declared = list(domain.values or [])
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        extra = sorted(set(values.cat.categories) - set(declared))
+        return values.cat.set_categories(declared + extra)
+
+    codes, uniques = pd.factorize(values)
+    if not force and not declared and len(uniques) > MAX_CATEGORY_RATIO * len(values):
+        return None
+    extra = sorted(set(uniques) - set(declared))
+    categories = pd.Index(declared + extra, dtype=object)
+    # Codes of the factorized uniques in the declared order; -1 stays missing
+    new_codes = np.where(codes >= 0, categories.get_indexer(uniques)[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories),
+                     index=values.index, name=values.name)
+
+
+def _int_dtype(low: int, high: int, nullable: bool) -> str:
+    """Smallest integer dtype holding [low, high]"""
+    for bits in (8, 16, 32, 64):
+        dtype = np.dtype(f"uint{bits}" if low >= 0 else f"int{bits}")
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            break
+    if not nullable:
+        return dtype.name
+    return f"UInt{bits}" if low >= 0 else f"Int{bits}"
+
+
+def _integer(values: pd.Series, domain: Domain) -> pd.Series | None:
+    # Parse the distinct values only, then check they print back unchanged ('007', '12bis' do not)
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0 or ((codes < 0).any() and domain.logical_type == 'small_int'):
+        return None
+    numbers = pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce')
+    if numbers.isna().any() or not (numbers % 1 == 0).all():
+        return None
+    numbers = numbers.astype('int64')
+    if not (numbers.astype(str).to_numpy() == np.asarray(uniques, dtype=object).astype(str)).all():
+        return None
+
+    bounds = [int(numbers.min()), int(numbers.max())]
+    bounds += [bound for bound in (domain.min_value, domain.max_value) if bound is not None]
+    dtype = _int_dtype(min(bounds), max(bounds), nullable=domain.logical_type == 'nullable_int')
+    result = pd.array(numbers.to_numpy()[codes], dtype=dtype)
+    if domain.logical_type == 'nullable_int':
+        result[codes < 0] = pd.NA
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def compaction_plan(df: pd.DataFrame, schema: TableSchema) -> Dict[str, str]:
+    """
+    Columns of df that compact() re-encodes, with their logical type.
+
+    Computed on the first chunk of a chunked read and passed to compact()
+    for every chunk.
+    """
+    plan = {}
+    for column, domain in schema.domains.items():
+        if column not in df.columns or domain.logical_type == 'string':
+            continue
+        encode = _categorical if domain.logical_type == 'category' else _integer
+        if encode(df[column], domain) is not None:
+            plan[column] = domain.logical_type
+    return plan
+
+
+def compact(df: pd.DataFrame, schema: TableSchema, plan: Dict[str, str] = None) -> pd.DataFrame:
+    """
+    Re-encode the columns of df that have a Domain in `schema`.
+
+    Columns outside the schema domains, or whose values do not fit their
+    logical type, are returned unchanged. With a `plan` (see
+    compaction_plan), only its columns are re-encoded, and its categorical
+    columns are re-encoded whatever their number of distinct values.
+    """
+    columns = {}
+    for column, domain in schema.domains.items():
+        if column not in df.columns or domain.logical_type == 'string':
+            continue
+        if plan is not None and column not in plan:
+            continue
+        if domain.logical_type == 'category':
+            encoded = _categorical(df[column], domain, force=plan is not None)
+        else:
+            encoded = _integer(df[column], domain)
+        if encoded is None:
+            logger.debug(f"{schema.name}.{column} does not fit {domain.logical_type}, left as {df[column].dtype}")
+            continue
+        columns[column] = encoded
+    return df.assign(**columns) if columns else df
+
+
+def match_categories(values: pd.Series, reference: pd.Series) -> pd.Series:
+    """
+    `values` with the categories of `reference` when both are categorical
+    and that loses nothing. Merges compare matching categoricals by their
+    codes; otherwise pandas converts both key columns to Python objects.
+    """
+    if not (isinstance(values.dtype, pd.CategoricalDtype) and isinstance(reference.dtype, pd.CategoricalDtype)):
+        return values
+    if values.cat.categories.equals(reference.cat.categories):
+        return values
+    if not values.cat.categories.isin(reference.cat.categories).all():
+        return values
+    return values.cat.set_categories(reference.cat.categories)
+
+
+def _decode_integers(values: pd.Series) -> pd.Series:
+    """Integer column back to its source strings (compact() only encodes values that print back unchanged)"""
+    if not pd.api.types.is_integer_dtype(values.dtype):
+        return values
+    return pd.Series(np.where(values.isna(), None, values.astype(str)), index=values.index,
+                     name=values.name, dtype=object)
+
+
+def concat_compact(frames: List[pd.DataFrame], **kwargs) -> pd.DataFrame:
+    """
+    pd.concat keeping categorical columns categorical.
+
+    Categories are unioned (in order of appearance) first; a column that is
+    categorical in only some frames is decoded in those. A column that is
+    integer in some frames and strings in others (a chunk whose values did
+    not fit) is decoded back to strings.
+    """
+    frames = list(frames)
+    for column in frames[0].columns:
+        dtypes = [df[column].dtype for df in frames if column in df.columns]
+        integer = [pd.api.types.is_integer_dtype(dtype) for dtype in dtypes]
+        if any(integer) and not all(integer):
+            frames = [df.assign(**{column: _decode_integers(df[column])}) if column in df.columns else df
+                      for df in frames]
+            continue
+        categorical = [isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes]
+        if not any(categorical):
+            continue
+        if all(categorical):
+            categories = pd.Index([]).append([dtype.categories for dtype in dtypes]).unique()
+            encode = lambda values: values.cat.set_categories(categories)
+        else:
+            plain = dtypes[categorical.index(False)]
+            encode = lambda values: values.astype(plain) if isinstance(values.dtype, pd.CategoricalDtype) else values
+        frames = [df.assign(**{column: encode(df[column])}) if column in df.columns else df for df in frames]
+    return pd.concat(frames, **kwargs)
+
+
+@dataclass
+class CompactionStats:
+    table: str
+    rows: int
+    before_mb: float  # Deep memory usage
+    after_mb: float
+    columns: Dict[str, dict] = field(default_factory=dict)  # Re-encoded columns: dtypes and MB
+
+    @property
+    def saved_mb(self) -> float:
+        return self.before_mb - self.after_mb
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'saved_mb': self.saved_mb}
+
+
+def compaction_stats(table: str, before: pd.DataFrame, after: pd.DataFrame) -> CompactionStats:
+    """Memory saved by compact() on a table, in total and per re-encoded column"""
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+    stats = CompactionStats(table, len(after), float(before_usage.sum()) / MB, float(after_usage.sum()) / MB)
+    for column in after.columns:
+        if column in before.columns and after[column].dtype != before[column].dtype:
+            stats.columns[column] = {
+                'dtype_before': str(before[column].dtype), 'dtype_after': str(after[column].dtype),
+                'before_mb': float(before_usage[column]) / MB, 'after_mb': float(after_usage[column]) / MB,
+            }
+    return stats
+
+
+def format_compaction_report(stats: List[CompactionStats]) -> str:
+    """Fixed-width table of memory saved per table (re-encoded columns below each table)"""
+    header = f"{'Table / column':<32} {'Rows':>10} {'Before':>10} {'After':>10} {'Saved':>8}"
+    lines = [header + "  (MB)", '-' * len(header)]
+    for table in stats:
+        saved = table.saved_mb / table.before_mb if table.before_mb else 0.0
+        lines.append(f"{table.table:<32} {table.rows:>10,} {table.before_mb:>10.1f} "
+                     f"{table.after_mb:>10.1f} {saved:>8.0%}")
+        for column, entry in table.columns.items():
+            name = f"  {column} ({entry['dtype_before']} -> {entry['dtype_after']})"
+            lines.append(f"{name:<43} {entry['before_mb']:>10.1f} {entry['after_mb']:>10.1f}")
+    return '\n'.join(lines)
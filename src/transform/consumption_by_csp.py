@@ -1,6 +1,8 @@
 """Generate Consommation_CSP target table"""
 import pandas as pd
-from src.config.settings import setup_logging
+from src.config.settings import JOIN_CARDINALITY, JOIN_MAX_FANOUT, JOIN_ON_VIOLATION, setup_logging
+from src.transform.compact import match_categories
+from src.transform import joins
 
 logger = setup_logging(__name__)
 
@@ -13,8 +15,11 @@ def join_population_with_csp(population_df: pd.DataFrame, csp_df: pd.DataFrame)
     """
     logger.info(f"Joining {len(population_df)} population records with CSP reference")
     
+    csp_df = csp_df[['ID_CSP', 'Salaire_Moyen']]
+    # Same categories on both keys: the merge compares codes and CSP stays categorical
+    csp_df = csp_df.assign(ID_CSP=match_categories(csp_df['ID_CSP'], population_df['CSP']))
     result = population_df.merge(
-        csp_df[['ID_CSP', 'Salaire_Moyen']],
+        csp_df,
         left_on='CSP',
         right_on='ID_CSP',
         how='inner'
@@ -28,17 +33,29 @@ def join_population_with_csp(population_df: pd.DataFrame, csp_df: pd.DataFrame)
     return result
 
 
-def join_population_with_consumption(population_df: pd.DataFrame, 
-                                     consommation_df: pd.DataFrame) -> pd.DataFrame:
+def join_population_with_consumption(population_df: pd.DataFrame,
+                                     consommation_df: pd.DataFrame,
+                                     validate: str = JOIN_CARDINALITY,
+                                     on_violation: str = JOIN_ON_VIOLATION,
+                                     max_fanout: float | None = JOIN_MAX_FANOUT) -> pd.DataFrame:
     """
     Join Population with Consommation on normalized address.
     
-    INNER JOIN on Adresse
+    INNER JOIN on Adresse. Consumption addresses can repeat (many-to-many
+    matches multiply rows): the keys are profiled first and `validate` /
+    `on_violation` / `max_fanout` applied, see `src.transform.joins.guard_join`.
     """
     logger.info(f"Joining population with consumption data on address")
     
+    population_df, consommation_df, estimate = joins.guard_join(
+        population_df, consommation_df[['Adresse', 'NB_KW_Jour']], 'Adresse',
+        validate=validate, on_violation=on_violation, max_fanout=max_fanout,
+        name='Population x Consommation on Adresse'
+    )
+    logger.info(f"Expecting {estimate.output_rows} rows ({estimate.matched_keys} matching addresses)")
+    
     result = population_df.merge(
-        consommation_df[['Adresse', 'NB_KW_Jour']],
+        consommation_df,
         on='Adresse',
         how='inner'
     )
@@ -61,7 +78,7 @@ def aggregate_consumption_by_csp(merged_df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info("Aggregating consumption by CSP category")
     
-    result = merged_df.groupby('CSP').agg({
+    result = merged_df.groupby('CSP', observed=True).agg({
         'NB_KW_Jour': lambda x: (x * 365).mean(),  # Annual average
         'Salaire_Moyen': 'max'  # Reference value (same for all)
     }).reset_index()
@@ -74,13 +91,17 @@ def aggregate_consumption_by_csp(merged_df: pd.DataFrame) -> pd.DataFrame:
 
 def build_consommation_csp(population_df: pd.DataFrame,
                            consommation_df: pd.DataFrame,
-                           csp_df: pd.DataFrame) -> pd.DataFrame:
+                           csp_df: pd.DataFrame,
+                           validate: str = JOIN_CARDINALITY,
+                           on_violation: str = JOIN_ON_VIOLATION,
+                           max_fanout: float | None = JOIN_MAX_FANOUT) -> pd.DataFrame:
     """
     Main function to build Consommation_CSP target table.
     
     Pipeline:
     1. Enrich population with CSP salary data
-    2. Join population with consumption on address
+    2. Join population with consumption on address (join guard settings:
+       `validate` / `on_violation` / `max_fanout`)
     3. Aggregate by CSP category
     
     Returns:
@@ -92,7 +113,8 @@ def build_consommation_csp(population_df: pd.DataFrame,
     population_enriched = join_population_with_csp(population_df, csp_df)
     
     # Step 2: Join with consumption
-    merged = join_population_with_consumption(population_enriched, consommation_df)
+    merged = join_population_with_consumption(population_enriched, consommation_df, validate=validate,
+                                              on_violation=on_violation, max_fanout=max_fanout)
     
     # Step 3: Aggregate
     target = aggregate_consumption_by_csp(merged)
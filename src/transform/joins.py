@@ -0,0 +1,156 @@
+"""Join cardinality guard
+
+Profiles the join keys of both sides before a merge: key multiplicities
+from one factorization of both key columns and a bincount per side, so the
+exact inner join size (sum over keys of left count x right count) is known
+before pandas allocates anything. Null keys count as a key, as pandas merge
+matches them.
+
+    left, right, estimate = guard_join(population, consommation, 'Adresse',
+                                       validate='many_to_one', on_violation='dedupe')
+    merged = left.merge(right, on='Adresse')
+
+A side expected to be unique (right for many_to_one, both for one_to_one)
+that is not either raises JoinCardinalityError, is deduplicated on its keys
+(first row kept) or only logs a warning. Estimated outputs above
+`max_fanout` rows per input row always raise.
+"""
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import setup_logging
+
+logger = setup_logging(__name__)
+
+CARDINALITIES = ['one_to_one', 'many_to_one', 'many_to_many']  # many_to_many: no uniqueness check
+ON_VIOLATION = ['raise', 'dedupe', 'warn']
+
+
+class JoinCardinalityError(ValueError):
+    """A join breaks its declared cardinality or would produce too many rows"""
+
+
+@dataclass
+class KeyProfile:
+    rows: int
+    distinct_keys: int
+    duplicated_keys: int  # Keys found on more than one row
+    duplicated_rows: int  # Rows whose key is duplicated
+    max_multiplicity: int  # Rows of the most frequent key
+
+    @property
+    def unique(self) -> bool:
+        return self.duplicated_keys == 0
+
+
+@dataclass
+class JoinEstimate:
+    left: KeyProfile
+    right: KeyProfile
+    matched_keys: int  # Keys present on both sides
+    output_rows: int  # Inner join rows
+
+    @property
+    def fanout(self) -> float:
+        """Output rows per row of the larger input"""
+        return self.output_rows / max(self.left.rows, self.right.rows, 1)
+
+
+def _as_list(on: str | List[str]) -> List[str]:
+    return [on] if isinstance(on, str) else list(on)
+
+
+def _key_codes(left: pd.DataFrame, right: pd.DataFrame, left_on: List[str],
+               right_on: List[str]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Dense key codes shared by both sides (multi-column keys combined column by column)"""
+    codes = np.zeros(len(left) + len(right), dtype=np.int64)
+    distinct = 1
+    for left_column, right_column in zip(left_on, right_on):
+        values = pd.concat([left[left_column], right[right_column]], ignore_index=True)
+        column_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        codes, combined = pd.factorize(codes * len(uniques) + column_codes)
+        distinct = len(combined)
+    return codes[:len(left)], codes[len(left):], distinct
+
+
+def _profile(counts: np.ndarray, rows: int) -> KeyProfile:
+    present = counts[counts > 0]
+    duplicated = present[present > 1]
+    return KeyProfile(rows=rows, distinct_keys=len(present), duplicated_keys=len(duplicated),
+                      duplicated_rows=int(duplicated.sum()),
+                      max_multiplicity=int(present.max()) if len(present) else 0)
+
+
+def estimate_join(left: pd.DataFrame, right: pd.DataFrame, left_on: str | List[str],
+                  right_on: str | List[str] = None) -> JoinEstimate:
+    """Key statistics of both sides and the exact inner join size, without joining"""
+    left_on = _as_list(left_on)
+    right_on = _as_list(right_on) if right_on is not None else left_on
+    left_codes, right_codes, distinct = _key_codes(left, right, left_on, right_on)
+    left_counts = np.bincount(left_codes, minlength=distinct)
+    right_counts = np.bincount(right_codes, minlength=distinct)
+    return JoinEstimate(
+        left=_profile(left_counts, len(left)),
+        right=_profile(right_counts, len(right)),
+        matched_keys=int(((left_counts > 0) & (right_counts > 0)).sum()),
+        output_rows=int(np.dot(left_counts, right_counts)),
+    )
+
+
+def guard_join(left: pd.DataFrame, right: pd.DataFrame, left_on: str | List[str],
+               right_on: str | List[str] = None, validate: str = 'many_to_many',
+               on_violation: str = 'raise', max_fanout: float = None,
+               name: str = 'join') -> Tuple[pd.DataFrame, pd.DataFrame, JoinEstimate]:
+    """
+    Check a join's cardinality before running it.
+
+    Args:
+        validate: one_to_one, many_to_one or many_to_many (no check)
+        on_violation: raise, dedupe (keep the first row per key) or warn
+        max_fanout: Raise if the join would produce more rows than this
+            many per row of the larger input (None: no limit)
+
+    Returns:
+        (left, right, estimate), deduplicated if requested
+
+    Raises:
+        JoinCardinalityError: On a violation with on_violation='raise', or
+            an estimated output above max_fanout
+    """
+    if validate not in CARDINALITIES:
+        raise ValueError(f"Unknown cardinality: {validate}. Available: {CARDINALITIES}")
+    if on_violation not in ON_VIOLATION:
+        raise ValueError(f"Unknown on_violation: {on_violation}. Available: {ON_VIOLATION}")
+    right_on = right_on if right_on is not None else left_on
+
+    estimate = estimate_join(left, right, left_on, right_on)
+    checked = {'one_to_one': ['left', 'right'], 'many_to_one': ['right'], 'many_to_many': []}[validate]
+    for side in checked:
+        profile = getattr(estimate, side)
+        if profile.unique:
+            continue
+        message = (f"{name} is not {validate}: {profile.duplicated_keys} {side} keys repeat on "
+                   f"{profile.duplicated_rows} rows (up to {profile.max_multiplicity} per key), "
+                   f"{estimate.output_rows} rows expected for {estimate.left.rows} x {estimate.right.rows}")
+        if on_violation == 'raise':
+            raise JoinCardinalityError(message)
+        if on_violation == 'warn':
+            logger.warning(message)
+            continue
+        logger.warning(f"{message}; keeping the first row per key")
+        if side == 'left':
+            left = left.drop_duplicates(subset=_as_list(left_on), keep='first')
+        else:
+            right = right.drop_duplicates(subset=_as_list(right_on), keep='first')
+
+    if on_violation == 'dedupe' and checked:
+        estimate = estimate_join(left, right, left_on, right_on)
+    if max_fanout is not None and estimate.fanout > max_fanout:
+        raise JoinCardinalityError(
+            f"{name} would produce {estimate.output_rows} rows ({estimate.fanout:.1f} per input row, "
+            f"limit {max_fanout:g}): keys repeat up to {estimate.left.max_multiplicity} times on the left "
+            f"and {estimate.right.max_multiplicity} on the right")
+    return left, right, estimate
@@ -1,6 +1,7 @@
 """Address and string normalization functions"""
 import pandas as pd
 import re
+from typing import Callable
 
 def _normalize_string(text: str) -> str:
     """
@@ -57,6 +58,20 @@ def _normalize_population_address(address: str) -> str | None:
     return f"{street}, {postal}"
 
 
+def _map_values(values: pd.Series, func: Callable) -> pd.Series:
+    """
+    values.apply(func), evaluated once per category for categorical columns
+    (the result stays categorical).
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.apply(func)
+    # Missing values have code -1: the last mapped entry
+    mapped = [func(value) for value in values.cat.categories] + [func(None)]
+    codes, uniques = pd.factorize(pd.Index(mapped, dtype=object))  # Normalized categories may collide
+    return pd.Series(pd.Categorical.from_codes(codes[values.cat.codes.to_numpy()], categories=uniques),
+                     index=values.index, name=values.name)
+
+
 def normalize_consommation_addresses(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add normalized 'Adresse' column to Consommation dataframe.
@@ -65,8 +80,8 @@ def normalize_consommation_addresses(df: pd.DataFrame) -> pd.DataFrame:
     Output: DataFrame with additional 'Adresse' column
     """
     df = df.copy()
-    df['Code_Postal'] = df['Code_Postal'].apply(_normalize_string)
-    df['Nom_Rue'] = df['Nom_Rue'].apply(_normalize_string)
+    df['Code_Postal'] = _map_values(df['Code_Postal'], _normalize_string)
+    df['Nom_Rue'] = _map_values(df['Nom_Rue'], _normalize_string)
     df['Adresse'] = df.apply(_create_full_address, axis=1)
     return df
 
@@ -91,6 +106,6 @@ def normalize_iris_streets_postalcodes(df: pd.DataFrame) -> pd.DataFrame:
     """
 
     df = df.copy()
-    df['ID_Rue'] = df['ID_Rue'].apply(_normalize_string)
-    df['ID_Ville'] = df['ID_Ville'].apply(_normalize_string)
+    df['ID_Rue'] = _map_values(df['ID_Rue'], _normalize_string)
+    df['ID_Ville'] = _map_values(df['ID_Ville'], _normalize_string)
     return df
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""Partitioned transform: split by postal code, partial aggregates, reduce
+
+The unioned sources are split into postal-code partitions so each one can
+be normalized and aggregated independently (e.g. one mapped Airflow task
+per partition), then the partial aggregates are combined:
+
+    partition_sources -> [normalize + partial_csp + partial_iris] * N -> reduce_csp / reduce_iris
+
+Rows are assigned by a stable hash of the postal code as it appears in the
+normalized join keys (Population Adresse suffix, Consommation Code_Postal,
+IRIS ID_Ville). Rows that can join always land in the same partition, so
+the partitioned result equals `build_consommation_csp` /
+`build_consommation_iris`. Cities are separated by their postal codes;
+rows without a postal code go to a dedicated 'null' partition.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import JOIN_CARDINALITY, JOIN_MAX_FANOUT, JOIN_ON_VIOLATION, setup_logging
+from src.transform.consumption_by_csp import join_population_with_csp, join_population_with_consumption
+from src.transform.consumption_by_iris import join_consommation_with_iris
+from src.transform.normalize import (
+    normalize_population_addresses,
+    normalize_consommation_addresses,
+    normalize_iris_streets_postalcodes
+)
+
+logger = setup_logging(__name__)
+
+NULL_PARTITION = 'null'
+ROW_COLUMN = '_row'  # Consommation row position, keeps IRIS 'first' Source deterministic
+
+
+def _normalized_postal(values: pd.Series) -> pd.Series:
+    """Vectorized equivalent of normalize._normalize_string (missing -> '')"""
+    return (values.astype('string').str.strip().str.lower()
+            .str.replace(r'\s+', ' ', regex=True).fillna(''))
+
+
+def population_postal_keys(population: pd.DataFrame) -> pd.Series:
+    """Postal code of the normalized Adresse ('street, postal'); '' if it has none"""
+    parts = population['Adresse'].astype('string').str.split(',')
+    postal = parts.str[1].str.strip()
+    return postal.where(parts.str.len() == 2).fillna('')
+
+
+def consommation_postal_keys(consommation: pd.DataFrame) -> pd.Series:
+    return _normalized_postal(consommation['Code_Postal'])
+
+
+def iris_postal_keys(iris: pd.DataFrame) -> pd.Series:
+    return _normalized_postal(iris['ID_Ville'])
+
+
+def partition_ids(keys: pd.Series, partitions: int) -> np.ndarray:
+    """Stable partition label per row: 'pNN', or NULL_PARTITION for empty keys"""
+    buckets = pd.util.hash_array(keys.to_numpy(dtype=object)) % np.uint64(partitions)
+    labels = np.array([f"p{i:02d}" for i in range(partitions)], dtype=object)[buckets.astype(np.int64)]
+    return np.where(keys.to_numpy(dtype=object) == '', NULL_PARTITION, labels)
+
+
+def partition_sources(population: pd.DataFrame, consommation: pd.DataFrame, iris: pd.DataFrame,
+                      partitions: int) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Split unioned Population/Consommation and IRIS reference by postal code.
+
+    Returns:
+        {partition label: {'population', 'consommation', 'iris'}}, non-empty
+        partitions only
+    """
+    if partitions < 1:
+        raise ValueError(f"partitions must be >= 1, got {partitions}")
+
+    consommation = consommation.assign(**{ROW_COLUMN: np.arange(len(consommation))})
+    frames = {
+        'population': (population, partition_ids(population_postal_keys(population), partitions)),
+        'consommation': (consommation, partition_ids(consommation_postal_keys(consommation), partitions)),
+        'iris': (iris, partition_ids(iris_postal_keys(iris), partitions)),
+    }
+
+    labels = sorted(set().union(*(np.unique(ids) for _, ids in frames.values())))
+    result = {}
+    for label in labels:
+        result[label] = {name: df[ids == label].reset_index(drop=True) for name, (df, ids) in frames.items()}
+
+    logger.info(f"✅ Split sources into {len(result)} partitions")
+    return result
+
+
+def normalize_partition(partition: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    return {
+        'population': normalize_population_addresses(partition['population']),
+        'consommation': normalize_consommation_addresses(partition['consommation']),
+        'iris': normalize_iris_streets_postalcodes(partition['iris']),
+    }
+
+
+def partial_csp(population: pd.DataFrame, consommation: pd.DataFrame, csp: pd.DataFrame,
+                validate: str = JOIN_CARDINALITY, on_violation: str = JOIN_ON_VIOLATION,
+                max_fanout: float | None = JOIN_MAX_FANOUT) -> pd.DataFrame:
+    """
+    Partial Consommation_CSP of one normalized partition (join guard
+    settings as in `join_population_with_consumption`).
+
+    Columns: ID_CSP, Conso_annuelle_sum, Count, Salaire_Moyen
+    """
+    merged = join_population_with_consumption(join_population_with_csp(population, csp), consommation,
+                                              validate=validate, on_violation=on_violation, max_fanout=max_fanout)
+    merged = merged.assign(Conso_annuelle=merged['NB_KW_Jour'] * 365)
+    return merged.groupby('CSP', as_index=False, observed=True).agg(
+        Conso_annuelle_sum=pd.NamedAgg(column='Conso_annuelle', aggfunc='sum'),
+        Count=pd.NamedAgg(column='Conso_annuelle', aggfunc='count'),
+        Salaire_Moyen=pd.NamedAgg(column='Salaire_Moyen', aggfunc='max'),
+    ).rename(columns={'CSP': 'ID_CSP'})
+
+
+def reduce_csp(partials: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine partial CSP aggregates into Consommation_CSP"""
+    combined = pd.concat(partials, ignore_index=True).groupby('ID_CSP', as_index=False, observed=True).agg(
+        Conso_annuelle_sum=pd.NamedAgg(column='Conso_annuelle_sum', aggfunc='sum'),
+        Count=pd.NamedAgg(column='Count', aggfunc='sum'),
+        Salaire_Moyen=pd.NamedAgg(column='Salaire_Moyen', aggfunc='max'),
+    )
+    combined['Conso_moyenne_annuelle'] = combined['Conso_annuelle_sum'] / combined['Count']
+
+    logger.info(f"✅ Reduced {len(partials)} partial CSP aggregates to {len(combined)} categories")
+    return combined[['ID_CSP', 'Conso_moyenne_annuelle', 'Salaire_Moyen']]
+
+
+def partial_iris(consommation: pd.DataFrame, iris: pd.DataFrame) -> pd.DataFrame:
+    """
+    Partial Consommation_IRIS of one normalized partition.
+
+    Columns: ID_Iris, Conso_moyenne_annuelle (partial sum), Source, _row
+    """
+    merged = join_consommation_with_iris(consommation, iris)
+    merged = merged.assign(Conso_annuelle=merged['NB_KW_Jour'] * 365)
+    return merged.groupby('ID_Iris', as_index=False).agg(
+        Conso_moyenne_annuelle=pd.NamedAgg(column='Conso_annuelle', aggfunc='sum'),
+        Source=pd.NamedAgg(column='Source', aggfunc='first'),
+        **{ROW_COLUMN: pd.NamedAgg(column=ROW_COLUMN, aggfunc='min')},
+    )
+
+
+def reduce_iris(partials: List[pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Combine partial IRIS aggregates; returns dict with keys 'paris' and 'evry'"""
+    combined = pd.concat(partials, ignore_index=True).sort_values(ROW_COLUMN, kind='stable')
+    result = combined.groupby('ID_Iris', as_index=False).agg(
+        Conso_moyenne_annuelle=pd.NamedAgg(column='Conso_moyenne_annuelle', aggfunc='sum'),
+        Source=pd.NamedAgg(column='Source', aggfunc='first'),
+    )
+
+    paris_df = result[result['Source'] == 'Paris']
+    evry_df = result[result['Source'] == 'Evry']
+
+    logger.info(f"✅ Reduced {len(partials)} partial IRIS aggregates - "
+                f"Paris rows: {len(paris_df)}, Evry rows: {len(evry_df)}")
+    return {
+        'paris': paris_df,
+        'evry': evry_df
+    }
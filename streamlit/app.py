@@ -1,7 +1,10 @@
 import streamlit as st
-import psycopg2
 import pandas as pd
 import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from psycopg2.pool import ThreadedConnectionPool
 
 # Database connection parameters
 DB_CONFIG = {
@@ -12,16 +15,128 @@ DB_CONFIG = {
     'password': os.getenv('POSTGRES_PASSWORD', 'airflow')
 }
 
+# Connections shared by all sessions (each query borrows one)
+POOL_SIZE = int(os.getenv('DASHBOARD_POOL_SIZE', '5'))
+# Seconds a query waits for a free pooled connection before failing
+POOL_TIMEOUT = float(os.getenv('DASHBOARD_POOL_TIMEOUT', '30'))
+# Seconds query results are cached, per filter combination
+CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '60'))
+
+SOURCES = ["Paris", "Evry"]
+TIME_WINDOWS = {
+    "Last 24 hours": timedelta(days=1),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30),
+    "All time": None,
+}
+PAGE_SIZES = [50, 100, 500, 1000]
+
+# Live mode: seconds between polls, rows kept in memory per table
+LIVE_REFRESH_SECONDS = int(os.getenv('DASHBOARD_LIVE_REFRESH', '5'))
+LIVE_WINDOW = int(os.getenv('DASHBOARD_LIVE_WINDOW', '5000'))
+# Seconds re-read below the newest timestamp seen: rows are stamped when recorded
+# (or at transaction start) but committed later, so they can arrive out of order
+LIVE_OVERLAP = timedelta(seconds=int(os.getenv('DASHBOARD_LIVE_OVERLAP', '900')))
+LIVE_COLUMNS = {
+    'metrics': "table_name, column_name, metric_type, metric_value, source",
+    'issues': "table_name, row_id, issue_type, issue_description, severity, source",
+}
+
 @st.cache_resource
+def get_pool():
+    """
+    Create the connection pool (one per server process, thread-safe) and
+    a semaphore with one slot per connection: getconn raises instead of
+    waiting when the pool is exhausted, so queries queue on the semaphore.
+    """
+    return ThreadedConnectionPool(1, POOL_SIZE, **DB_CONFIG), threading.BoundedSemaphore(POOL_SIZE)
+
+@contextmanager
 def get_connection():
-    """Create database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Borrow a pooled connection, waiting up to POOL_TIMEOUT; broken connections are discarded"""
+    pool, slots = get_pool()
+    if not slots.acquire(timeout=POOL_TIMEOUT):
+        raise TimeoutError(f"No database connection free after {POOL_TIMEOUT:g}s ({POOL_SIZE} in use)")
+    try:
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            # The pool rolls back the open transaction; closed connections are dropped
+            pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        slots.release()
+
+def run_query(query, params=None):
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            return pd.DataFrame(cur.fetchall(), columns=[col.name for col in cur.description])
+
+def filter_params(sources, window):
+    """
+    Query parameters for the sidebar filters.
+
+    sources: tuple of sources, empty for all; window: key of TIME_WINDOWS
+    """
+    delta = TIME_WINDOWS[window]
+    return {
+        'sources': list(sources) or None,
+        'since': datetime.now() - delta if delta else None,
+    }
+
+# Cached functions take the filters as arguments, so each filter combination
+# has its own cache entry, shared across sessions until the TTL expires.
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_metrics_summary(sources, window):
+    """
+    Metric count, last update and tables monitored, from the rollups: the
+    count sums metrics_daily (whole days from the window start), the rest
+    reads metrics_latest. Never scans data_quality.metrics.
+    """
+    query = """
+        SELECT
+            (SELECT COALESCE(SUM(metric_count), 0)
+             FROM data_quality.metrics_daily
+             WHERE (%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))
+               AND (%(since)s::timestamp IS NULL OR day >= %(since)s::date)) as total,
+            MAX(timestamp) as last_updated,
+            COUNT(DISTINCT table_name) as tables
+        FROM data_quality.metrics_latest
+        WHERE (%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))
+          AND (%(since)s::timestamp IS NULL OR timestamp >= %(since)s::timestamp)
+    """
+    return run_query(query, filter_params(sources, window)).iloc[0].to_dict()
 
-def load_metrics():
-    """Load quality metrics from database"""
-    conn = get_connection()
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_latest_metrics(sources, window):
+    """Latest value per table / column / metric / source (metrics_latest rollup)"""
     query = """
-        SELECT 
+        SELECT
+            table_name,
+            NULLIF(column_name, '') as column_name,
+            metric_type,
+            metric_value,
+            NULLIF(source, '') as source,
+            timestamp
+        FROM data_quality.metrics_latest
+        WHERE (%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))
+          AND (%(since)s::timestamp IS NULL OR timestamp >= %(since)s::timestamp)
+        ORDER BY table_name, column_name, metric_type, source
+    """
+    return run_query(query, filter_params(sources, window))
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_metrics_page(sources, window, after, page_size):
+    """
+    One page of raw metrics, newest first, after the (timestamp, id) cursor
+    of the previous page (None: first page). Keyset pagination: each page
+    is an index range scan, however deep it is.
+    """
+    query = """
+        SELECT
+            id,
             table_name,
             column_name,
             metric_type,
@@ -29,24 +144,155 @@ def load_metrics():
             source,
             timestamp
         FROM data_quality.metrics
-        ORDER BY timestamp DESC
+        WHERE (%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))
+          AND (%(since)s::timestamp IS NULL OR timestamp >= %(since)s::timestamp)
+          AND (%(after_id)s::bigint IS NULL OR (timestamp, id) < (%(after_timestamp)s::timestamp, %(after_id)s::bigint))
+        ORDER BY timestamp DESC, id DESC
+        LIMIT %(limit)s
     """
-    return pd.read_sql(query, conn)
+    after_timestamp, after_id = after or (None, None)
+    params = {**filter_params(sources, window), 'limit': page_size,
+              'after_timestamp': after_timestamp, 'after_id': after_id}
+    return run_query(query, params)
+
+def page_cursor(df_page, page_size):
+    """(timestamp, id) of the last row of a full page, None on the last page"""
+    if len(df_page) < page_size:
+        return None
+    last = df_page.iloc[-1]
+    return (last['timestamp'].to_pydatetime(), int(last['id']))
 
-def load_issues():
-    """Load quality issues from database"""
-    conn = get_connection()
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_issues(sources, window):
+    """Load quality issue counts from the daily rollup"""
     query = """
-        SELECT 
+        SELECT
             table_name,
             issue_type,
-            severity,
-            COUNT(*) as count
-        FROM data_quality.issues
+            NULLIF(severity, '') as severity,
+            SUM(issue_count) as count
+        FROM data_quality.issues_daily
+        WHERE (%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))
+          AND (%(since)s::timestamp IS NULL OR day >= %(since)s::date)
         GROUP BY table_name, issue_type, severity
         ORDER BY count DESC
     """
-    return pd.read_sql(query, conn)
+    return run_query(query, filter_params(sources, window))
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_performance(window):
+    """Load per-stage latency and throughput, one row per (run, stage)"""
+    query = """
+        SELECT
+            run_id,
+            pipeline,
+            stage,
+            MIN(timestamp) as started,
+            MAX(wall_seconds) as wall_seconds,
+            SUM(cpu_seconds) as cpu_seconds,
+            MAX(peak_rss_mb) as peak_rss_mb,
+            SUM(rows_in) as rows_in,
+            SUM(rows_out) as rows_out,
+            SUM(rows_in) / NULLIF(MAX(wall_seconds), 0) as rows_per_second
+        FROM data_quality.performance
+        WHERE (%(since)s::timestamp IS NULL OR timestamp >= %(since)s::timestamp)
+        GROUP BY run_id, pipeline, stage
+        ORDER BY started
+    """
+    return run_query(query, filter_params((), window))
+
+def fetch_after(table, sources, since, seen_ids, limit):
+    """
+    Rows of data_quality.<table> stamped at or after `since` whose id is
+    not in `seen_ids`, oldest first. Without `since`: the latest `limit` rows.
+    """
+    where = "(%(sources)s::text[] IS NULL OR source = ANY(%(sources)s::text[]))"
+    columns = f"id, {LIVE_COLUMNS[table]}, timestamp"
+    params = {'sources': list(sources) or None, 'limit': limit}
+    if since is None:
+        query = f"""
+            SELECT * FROM (
+                SELECT {columns} FROM data_quality.{table}
+                WHERE {where}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT %(limit)s
+            ) latest
+            ORDER BY timestamp, id
+        """
+    else:
+        # Range scan on the (timestamp, id) index over the overlap window only
+        query = f"""
+            SELECT {columns} FROM data_quality.{table}
+            WHERE {where} AND timestamp >= %(since)s AND NOT (id = ANY(%(seen)s::bigint[]))
+            ORDER BY timestamp, id
+            LIMIT %(limit)s
+        """
+        params.update(since=since, seen=list(seen_ids))
+    return run_query(query, params)
+
+def poll_live(table, sources):
+    """
+    Append rows not seen yet to this session's in-memory frame (last
+    LIVE_WINDOW rows kept). Each poll re-reads LIVE_OVERLAP below the newest
+    timestamp seen and skips known ids, so rows committed late with an older
+    timestamp still show up. Returns (frame, new row count).
+    """
+    state = st.session_state.setdefault(f"live_{table}", {})
+    if state.get('sources') != sources:
+        # Filter changed: start over
+        state.clear()
+        state.update(sources=sources, frame=None, newest=None, seen={})
+
+    since = state['newest'] - LIVE_OVERLAP if state['newest'] is not None else None
+    new_rows = fetch_after(table, sources, since, state['seen'], LIVE_WINDOW)
+    if state['frame'] is None:
+        state['frame'] = new_rows
+    elif not new_rows.empty:
+        frame = pd.concat([state['frame'], new_rows], ignore_index=True)
+        state['frame'] = frame.tail(LIVE_WINDOW).reset_index(drop=True)
+    if not new_rows.empty:
+        newest = new_rows['timestamp'].max().to_pydatetime()
+        state['newest'] = max(state['newest'], newest) if state['newest'] is not None else newest
+        state['seen'].update(zip(new_rows['id'].astype(int), new_rows['timestamp']))
+    if state['newest'] is not None:
+        # Only ids inside the overlap window can be returned again
+        cutoff = state['newest'] - LIVE_OVERLAP
+        state['seen'] = {row_id: stamp for row_id, stamp in state['seen'].items() if stamp >= cutoff}
+    return state['frame'], len(new_rows)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_view(sources):
+    """Re-runs on its own every LIVE_REFRESH_SECONDS, without rerunning the page"""
+    try:
+        df_metrics, new_metrics = poll_live('metrics', sources)
+        df_issues, new_issues = poll_live('issues', sources)
+    except Exception as e:
+        st.error(f"Error polling live data: {e}")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Metrics (live window)", f"{len(df_metrics):,}", delta=f"+{new_metrics:,}")
+    with col2:
+        st.metric("Issues (live window)", f"{len(df_issues):,}", delta=f"+{new_issues:,}", delta_color="inverse")
+    with col3:
+        last_seen = df_metrics['timestamp'].max() if not df_metrics.empty else None
+        st.metric("Last Metric", last_seen.strftime("%H:%M:%S") if last_seen is not None else "-")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Newest Metrics")
+        st.dataframe(df_metrics.iloc[::-1].head(100), use_container_width=True, hide_index=True)
+    with col2:
+        st.subheader("Issues in Window")
+        if df_issues.empty:
+            st.success("No quality issues in the live window")
+        else:
+            counts = df_issues.groupby(['table_name', 'issue_type']).size().rename('count').reset_index()
+            st.dataframe(counts.sort_values('count', ascending=False), use_container_width=True, hide_index=True)
+
+    st.caption(f"Polling every {LIVE_REFRESH_SECONDS}s for rows not seen yet "
+               f"(re-reading the last {LIVE_OVERLAP.total_seconds():g}s), keeping the last {LIVE_WINDOW:,} per table")
 
 # Streamlit UI
 st.set_page_config(page_title="Data Quality Dashboard", layout="wide")
@@ -58,76 +304,147 @@ st.markdown("Energy Consumption Data - Quality Metrics")
 st.sidebar.header("Filters")
 selected_source = st.sidebar.multiselect(
     "Select Source",
-    options=["Paris", "Evry", "All"],
+    options=SOURCES + ["All"],
     default=["All"]
 )
+selected_window = st.sidebar.selectbox("Time Range", options=list(TIME_WINDOWS), index=1)
+
+# Sorted tuple: hashable, and the same cache entry whatever the selection order
+sources = () if "All" in selected_source or not selected_source else tuple(sorted(selected_source))
+
+if st.sidebar.button("🔄 Refresh data"):
+    st.cache_data.clear()
+st.sidebar.caption(f"Results are cached for {CACHE_TTL}s")
+
+st.sidebar.header("Live Mode")
+live_mode = st.sidebar.toggle("🔴 Watch new metrics and issues", value=False)
+
+if live_mode:
+    st.header("🔴 Live")
+    live_view(sources)
+    st.markdown("---")
 
 # Main content
-tab1, tab2, tab3 = st.tabs(["📈 Metrics Overview", "⚠️ Issues", "📋 Raw Data"])
+tab1, tab2, tab3, tab4 = st.tabs(["📈 Metrics Overview", "⚠️ Issues", "📋 Raw Data", "⏱️ Performance"])
 
 with tab1:
     st.header("Quality Metrics")
-    
+
     try:
-        df_metrics = load_metrics()
-        
-        if df_metrics.empty:
+        summary = load_metrics_summary(sources, selected_window)
+
+        if not summary['total']:
             st.info("No metrics available yet. Run the ETL pipeline first.")
         else:
             # Display metrics summary
             col1, col2, col3 = st.columns(3)
-            
+
             with col1:
-                st.metric("Total Metrics Collected", len(df_metrics))
-            
+                st.metric("Total Metrics Collected", f"{summary['total']:,}")
+
             with col2:
-                latest_metric = df_metrics.iloc[0]['timestamp']
-                st.metric("Last Updated", latest_metric.strftime("%Y-%m-%d %H:%M"))
-            
+                st.metric("Last Updated", summary['last_updated'].strftime("%Y-%m-%d %H:%M"))
+
             with col3:
-                unique_tables = df_metrics['table_name'].nunique()
-                st.metric("Tables Monitored", unique_tables)
-            
-            # Metrics by table
-            st.subheader("Metrics by Table")
-            st.dataframe(df_metrics, use_container_width=True)
-            
+                st.metric("Tables Monitored", summary['tables'])
+
+            # Latest value of every metric
+            st.subheader("Latest Metrics by Table")
+            st.dataframe(load_latest_metrics(sources, selected_window), use_container_width=True)
+
     except Exception as e:
         st.error(f"Error loading metrics: {e}")
 
 with tab2:
     st.header("Quality Issues")
-    
+
     try:
-        df_issues = load_issues()
-        
+        df_issues = load_issues(sources, selected_window)
+
         if df_issues.empty:
             st.success("No quality issues detected!")
         else:
             st.dataframe(df_issues, use_container_width=True)
-            
+
     except Exception as e:
         st.error(f"Error loading issues: {e}")
 
 with tab3:
     st.header("Raw Metrics Data")
-    
+
     try:
-        df_metrics = load_metrics()
-        st.dataframe(df_metrics, use_container_width=True)
-        
+        total = load_metrics_summary(sources, selected_window)['total']
+
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            page_size = st.selectbox("Rows per page", options=PAGE_SIZES, index=1)
+        pages = max(1, -(-total // page_size))
+
+        # Cursors of the pages visited so far: cursors[i] starts page i + 1
+        paging = st.session_state.setdefault('metrics_paging', {})
+        if paging.get('filters') != (sources, selected_window, page_size):
+            paging.clear()
+            paging.update(filters=(sources, selected_window, page_size), cursors=[None])
+        cursors = paging['cursors']
+        with col2:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+        after = cursors[-1]
+        page = len(cursors)
+
+        df_page = load_metrics_page(sources, selected_window, after, page_size)
+        next_cursor = page_cursor(df_page, page_size)
+        with col3:
+            if st.button("Next ➡️", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
+        st.dataframe(df_page.drop(columns='id'), use_container_width=True)
+        # The count covers whole days: approximate when the window starts mid-day
+        approx = '~' if TIME_WINDOWS[selected_window] else ''
+        st.caption(f"Page {page:,} of {approx}{pages:,} - {approx}{total:,} metrics")
+
         # Download button
-        csv = df_metrics.to_csv(index=False)
+        csv = df_page.drop(columns='id').to_csv(index=False)
         st.download_button(
-            label="Download Metrics CSV",
+            label="Download Page CSV",
             data=csv,
-            file_name="quality_metrics.csv",
+            file_name=f"quality_metrics_page_{int(page)}.csv",
             mime="text/csv"
         )
-        
+
     except Exception as e:
         st.error(f"Error: {e}")
 
+with tab4:
+    st.header("Pipeline Performance")
+
+    try:
+        df_perf = load_performance(selected_window)
+
+        if df_perf.empty:
+            st.info("No performance data yet. Run the ETL pipeline with telemetry enabled.")
+        else:
+            # Run start time per run, so runs line up on one axis
+            df_perf['run_started'] = df_perf.groupby('run_id')['started'].transform('min')
+
+            st.subheader("Stage Latency Over Runs (s)")
+            latency = df_perf.pivot_table(index='run_started', columns='stage',
+                                          values='wall_seconds', aggfunc='sum')
+            st.line_chart(latency)
+
+            st.subheader("Throughput (rows/s)")
+            throughput = df_perf.pivot_table(index='run_started', columns='stage',
+                                             values='rows_per_second', aggfunc='sum')
+            st.line_chart(throughput)
+
+            st.subheader("Latest Runs")
+            st.dataframe(df_perf.sort_values('started', ascending=False).drop(columns='run_started'),
+                         use_container_width=True)
+
+    except Exception as e:
+        st.error(f"Error loading performance data: {e}")
+
 # Footer
 st.markdown("---")
-st.markdown("**M2 DataScale 2025/2026**")
\ No newline at end of file
+st.markdown("**M2 DataScale 2025/2026**")